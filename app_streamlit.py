@@ -1,4 +1,9 @@
 
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import streamlit as st
 import pandas as pd
 
@@ -6,7 +11,10 @@ from core.agents import (
     get_reconciliation_dashboard,
     run_concierge_on_invoice_text,
     get_global_anomalies,
+    stream_reconciliation_dashboard,
+    stream_global_anomalies,
 )
+from core.models import AnomalyCard, DashboardRow
 
 
 import logging
@@ -16,6 +24,39 @@ logging.basicConfig(level=logging.DEBUG)
 
 st.set_page_config(page_title="Finance Guardian Agents", layout="wide")
 
+# Seconds a loaded panel is served from Streamlit's cache before it is fetched again.
+PANEL_TTL_S = int(os.environ.get("PANEL_CACHE_TTL", "300"))
+# Sessions that can load their panels at the same time; each one needs a worker per panel.
+PANEL_SESSIONS = int(os.environ.get("PANEL_SESSIONS", "8"))
+
+
+@st.cache_resource
+def _backend():
+    """Cognee bridge, once per server process; the pipeline itself loads on a background thread."""
+    import core.cognee_client as cognee_client
+
+    cognee_client.prewarm()
+    return cognee_client
+
+
+@st.cache_resource
+def _panel_executor() -> ThreadPoolExecutor:
+    """Shared by all sessions, so one session's slow panels don't queue every other session's."""
+    return ThreadPoolExecutor(max_workers=2 * PANEL_SESSIONS, thread_name_prefix="panel")
+
+
+@st.cache_data(ttl=PANEL_TTL_S, show_spinner=False)
+def _dashboard_rows(limit: int, use_cache: bool = True) -> list:
+    return [r.to_dict() for r in get_reconciliation_dashboard(limit=limit, use_cache=use_cache)]
+
+
+@st.cache_data(ttl=PANEL_TTL_S, show_spinner=False)
+def _anomaly_cards(limit: int, use_cache: bool = True) -> list:
+    return [c.to_dict() for c in get_global_anomalies(limit=limit, use_cache=use_cache)]
+
+
+_backend()
+
 st.title("🛡️ Finance Guardian Agents")
 st.caption(
     "Built on top of Cognee + distil SLM: "
@@ -48,75 +89,188 @@ st.markdown("---")
 
 left_col, right_col = st.columns([2, 1])
 
-with left_col:
-    st.subheader("Reconciliation Dashboard")
-
-    if st.button("Refresh dashboard"):
-        st.session_state["dashboard_rows"] = get_reconciliation_dashboard(limit=50)
-
-    rows = st.session_state.get("dashboard_rows", None)
-    if rows is None:
-        with st.spinner("Loading reconciliation dashboard from Cognee..."):
-            rows = get_reconciliation_dashboard(limit=50)
-            st.session_state["dashboard_rows"] = rows
 
+def render_dashboard(rows, interactive=True):
     if not rows:
         st.warning("No dashboard rows received from Cognee yet.")
-    else:
-        df = pd.DataFrame([r.to_dict() for r in rows])
-        st.dataframe(df, use_container_width=True)
+        return
+    df = pd.DataFrame([r.to_dict() for r in rows])
+    st.dataframe(df, use_container_width=True)
+    if not interactive:
+        return
+
+    st.markdown("### Focus on an invoice")
+    invoice_ids = [r.invoice_id for r in rows]
+    selected_invoice_id = st.selectbox("Select invoice ID", options=invoice_ids)
 
-        st.markdown("### Focus on an invoice")
-        invoice_ids = [r.invoice_id for r in rows]
-        selected_invoice_id = st.selectbox("Select invoice ID", options=invoice_ids)
+    if selected_invoice_id:
+        focused = [r for r in rows if r.invoice_id == selected_invoice_id]
+        if focused:
+            st.markdown("**Selected invoice row**")
+            st.json(focused[0].to_dict())
 
-        if selected_invoice_id:
-            focused = [r for r in rows if r.invoice_id == selected_invoice_id]
-            if focused:
-                st.markdown("**Selected invoice row**")
-                st.json(focused[0].to_dict())
 
+def render_anomalies(cards):
+    if not cards:
+        st.info("No anomalies reported by Cognee yet.")
+        return
+    for card in cards:
+        severity = card.severity.upper()
+        color = {
+            "HIGH": "#ff4b4b",
+            "MEDIUM": "#ffb000",
+            "LOW": "#1f8b4c",
+        }.get(severity, "#444444")
+
+        with st.container():
+            st.markdown(
+                f"<div style='border:1px solid {color}; padding:0.5rem 0.75rem; border-radius:0.5rem;'>"
+                f"<div style='font-size:0.8rem; color:{color}; font-weight:600;'>"
+                f"{severity} • Invoice {card.invoice_id} • {card.vendor_name}"
+                f"</div>"
+                f"<div style='margin-top:0.25rem; font-size:0.9rem;'>"
+                f"{card.human_explanation}"
+                f"</div>"
+                f"<div style='margin-top:0.25rem; font-size:0.8rem; color:#666;'>"
+                f"<b>Recommendation:</b> {card.recommendation}"
+                f"</div>"
+                f"<div style='margin-top:0.25rem; font-size:0.75rem; color:#888;'>"
+                f"Reason codes: {', '.join(card.reason_codes)}"
+                f"</div>"
+                f"</div>",
+                unsafe_allow_html=True,
+            )
+            st.markdown("")  # spacer
+
+
+with left_col:
+    st.subheader("Reconciliation Dashboard")
+    refresh_dashboard = st.button("Refresh dashboard")
+    dashboard_slot = st.empty()
 
 with right_col:
     st.subheader("Financial Anomaly Mini-Detective")
+    refresh_anomalies = st.button("Refresh anomalies")
+    anomalies_slot = st.empty()
 
-    if st.button("Refresh anomalies"):
-        st.session_state["anomaly_cards"] = get_global_anomalies(limit=20)
+_status = _backend().readiness()
+if _status["state"] == "failed":
+    st.sidebar.error(f"Cognee backend failed to load: {_status['error']}")
+    if st.sidebar.button("Retry loading the backend"):
+        _backend().reset()
+        _backend().prewarm()
+        st.rerun()
+elif not _status["ready"]:
+    st.sidebar.info("Loading the Cognee backend; the first answers wait for it (cached ones don't).")
+else:
+    st.sidebar.caption(f"Cognee backend ready (loaded in {_status['load_s']:.1f}s)")
 
-    cards = st.session_state.get("anomaly_cards", None)
-    # Always try to fetch at first render or when empty
-    if cards is None or cards == []:
-        with st.spinner("Loading anomaly cards from Cognee..."):
-            cards = get_global_anomalies(limit=20)
-            st.session_state["anomaly_cards"] = cards
+stream_panels = st.sidebar.checkbox(
+    "Stream panel results",
+    value=os.environ.get("STREAM_PANELS", "false").lower() in ("1", "true", "yes"),
+    help="Render rows and cards while the model is still writing them.",
+)
 
-    if not cards:
-        st.info("No anomalies reported by Cognee yet.")
-    else:
-        for card in cards:
-            severity = card.severity.upper()
-            color = {
-                "HIGH": "#ff4b4b",
-                "MEDIUM": "#ffb000",
-                "LOW": "#1f8b4c",
-            }.get(severity, "#444444")
-
-            with st.container():
-                st.markdown(
-                    f"<div style='border:1px solid {color}; padding:0.5rem 0.75rem; border-radius:0.5rem;'>"
-                    f"<div style='font-size:0.8rem; color:{color}; font-weight:600;'>"
-                    f"{severity} • Invoice {card.invoice_id} • {card.vendor_name}"
-                    f"</div>"
-                    f"<div style='margin-top:0.25rem; font-size:0.9rem;'>"
-                    f"{card.human_explanation}"
-                    f"</div>"
-                    f"<div style='margin-top:0.25rem; font-size:0.8rem; color:#666;'>"
-                    f"<b>Recommendation:</b> {card.recommendation}"
-                    f"</div>"
-                    f"<div style='margin-top:0.25rem; font-size:0.75rem; color:#888;'>"
-                    f"Reason codes: {', '.join(card.reason_codes)}"
-                    f"</div>"
-                    f"</div>",
-                    unsafe_allow_html=True,
-                )
-                st.markdown("")  # spacer
+
+def _pump(panel, items, out, cancel):
+    """Worker thread: forward a panel generator's items to the script thread until `cancel` is set."""
+    try:
+        for item in items:
+            if cancel.is_set():
+                # The script run that wanted these items is gone; stop the model stream too.
+                getattr(items, "close", lambda: None)()
+                break
+            out.put((panel, item))
+    except Exception as exc:
+        out.put((panel, exc))
+    finally:
+        out.put((panel, None))
+
+
+def load_panels_streaming():
+    """Fill both panels progressively; finished results are kept in the session until refreshed."""
+    for panel, refresh in (("dashboard", refresh_dashboard), ("anomalies", refresh_anomalies)):
+        if refresh:
+            st.session_state.pop(f"streamed_{panel}", None)
+    slots = {"dashboard": dashboard_slot, "anomalies": anomalies_slot}
+    results = {panel: st.session_state.get(f"streamed_{panel}") for panel in slots}
+    sources = {
+        "dashboard": lambda: stream_reconciliation_dashboard(limit=50, use_cache=not refresh_dashboard),
+        "anomalies": lambda: stream_global_anomalies(limit=20, use_cache=not refresh_anomalies),
+    }
+
+    # A rerun interrupts this script run mid-loop; its workers must not keep streaming.
+    st.session_state.pop("panel_cancel", threading.Event()).set()
+    cancel = st.session_state["panel_cancel"] = threading.Event()
+    out = queue.Queue()
+    running, failed = set(), set()
+    for panel, items in results.items():
+        if items is None:
+            results[panel] = {}
+            running.add(panel)
+            _panel_executor().submit(_pump, panel, sources[panel](), out, cancel)
+            slots[panel].info(f"Streaming {panel} from Cognee...")
+
+    try:
+        while running:
+            panel, item = out.get()
+            if item is None:
+                running.discard(panel)
+                if panel not in failed:
+                    st.session_state[f"streamed_{panel}"] = results[panel]
+                continue
+            if isinstance(item, Exception):
+                failed.add(panel)
+                slots[panel].error(f"Failed to load {panel}: {item}")
+                continue
+            results[panel][item.invoice_id] = item  # later versions replace earlier ones
+            with slots[panel].container():
+                if panel == "dashboard":
+                    render_dashboard(list(results[panel].values()), interactive=False)
+                else:
+                    render_anomalies(list(results[panel].values()))
+    finally:
+        cancel.set()
+
+    if "dashboard" not in failed:
+        with dashboard_slot.container():
+            render_dashboard(list(results["dashboard"].values()))
+    if "anomalies" not in failed:
+        with anomalies_slot.container():
+            render_anomalies(list(results["anomalies"].values()))
+
+
+if stream_panels:
+    load_panels_streaming()
+    st.stop()
+
+if refresh_dashboard:
+    _dashboard_rows.clear()
+if refresh_anomalies:
+    _anomaly_cards.clear()
+
+# Both panels load concurrently; each one renders as soon as its own data arrives.
+executor = _panel_executor()
+panels = {
+    executor.submit(_dashboard_rows, 50, not refresh_dashboard): "dashboard",
+    executor.submit(_anomaly_cards, 20, not refresh_anomalies): "anomalies",
+}
+dashboard_slot.info("Loading reconciliation dashboard from Cognee...")
+anomalies_slot.info("Loading anomaly cards from Cognee...")
+
+for future in as_completed(panels):
+    panel = panels[future]
+    slot = dashboard_slot if panel == "dashboard" else anomalies_slot
+    try:
+        data = future.result()
+    except Exception as exc:
+        slot.error(f"Failed to load {panel}: {exc}")
+        continue
+    if not data:
+        # Don't pin an empty answer for the whole TTL; retry on the next rerun.
+        (_dashboard_rows if panel == "dashboard" else _anomaly_cards).clear()
+    with slot.container():
+        if panel == "dashboard":
+            render_dashboard([DashboardRow(**r) for r in data])
+        else:
+            render_anomalies([AnomalyCard(**c) for c in data])
@@ -0,0 +1,100 @@
+"""Recall@10, latency and memory of the IVF index against the exact (brute-force) scan.
+
+Generates --rows clustered 768-dim embeddings (a Gaussian mixture, so the
+neighbourhood structure resembles real text embeddings more than uniform noise
+does) and builds cognee-minihack/ann_index.py's IVFIndex once per
+--quantization (none, int8, binary; the k-means lists are shared). Each index is
+saved and re-loaded memory-mapped, as the retriever loads it, and for each
+--nprobe the script reports recall@10 against the exact cosine top-10, mean
+query latency and the bytes a query scans from memory (codes, or float vectors
+without quantization). "flat" rows scan every vector (one list), i.e. the
+two-stage search without the IVF lists. The exact scan is the same full matrix
+product brute_force_triplet_search amounts to per collection. No Cognee needed.
+
+Usage:
+    python benchmarks/bench_ann_index.py [--rows 50000] [--queries 200] [--noise 1.5]
+        [--nprobe 1 2 4 8 16 32] [--quantization none int8 binary]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cognee-minihack"))
+
+from ann_index import IVFIndex, _normalize, _top  # noqa: E402
+from quantization import QUANTIZERS  # noqa: E402
+
+DIMENSIONS = 768
+K = 10
+
+
+def clustered_vectors(rows: int, clusters: int, noise: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, DIMENSIONS)).astype(np.float32)
+    labels = rng.integers(clusters, size=rows)
+    return _normalize(centers[labels] + noise * rng.standard_normal((rows, DIMENSIONS)).astype(np.float32))
+
+
+def variant(base: IVFIndex, quantization: str, directory: Path) -> IVFIndex:
+    """`base`'s lists with `quantization` codes, saved and re-loaded memory-mapped."""
+    index = IVFIndex(base.ids, base.vectors, base.centroids, base.trained_rows, base.order, base.offsets)
+    if quantization != "none":
+        index.quantizer = QUANTIZERS[quantization]().fit(base.vectors)
+        index.codes = index.quantizer.encode(base.vectors)
+    index.save(directory)
+    return IVFIndex.load(directory)
+
+
+def measure(index: IVFIndex, queries, exact, nprobe: int):
+    start = time.perf_counter()
+    found = [index.search(q, K, nprobe) for q in queries]
+    ms = (time.perf_counter() - start) * 1000 / len(queries)
+    recall = np.mean([len(truth & {row_id for row_id, _ in hits}) / K for truth, hits in zip(exact, found)])
+    return recall, ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=1.5, help="per-dimension within-cluster spread, relative to the centres")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--quantization", nargs="+", default=["none", "int8", "binary"], choices=["none", *QUANTIZERS])
+    args = parser.parse_args()
+
+    vectors = clustered_vectors(args.rows + args.queries, args.clusters, args.noise)
+    data, queries = vectors[:args.rows], vectors[args.rows:]
+    ids = [str(i) for i in range(args.rows)]
+
+    start = time.perf_counter()
+    ivf = IVFIndex.build(ids, data, quantization="none")
+    print(f"{args.rows:,} rows x {DIMENSIONS} dims: built {len(ivf.centroids)} lists in {time.perf_counter() - start:.1f}s")
+    flat = IVFIndex.build(ids, data, nlist=1, quantization="none")
+
+    start = time.perf_counter()
+    exact = [set(str(i) for i in _top(data @ q, K)) for q in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / args.queries
+    print(f"{'search':<12} {'codes':<7} {'scanned MiB':>11} {'recall@10':>9} {'ms/query':>9} {'speedup':>8}")
+    print(f"{'exact':<12} {'none':<7} {data.nbytes / 2**20:>11.1f} {1.0:>9.3f} {exact_ms:>9.3f} {1.0:>7.1f}x")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for quantization in args.quantization:
+            runs = [("flat", variant(flat, quantization, Path(tmp) / f"flat-{quantization}"), 1)]
+            ivf_q = variant(ivf, quantization, Path(tmp) / f"ivf-{quantization}")
+            runs += [(f"nprobe={n}", ivf_q, n) for n in args.nprobe]
+            for label, index, nprobe in runs:
+                if label == "flat" and quantization == "none":
+                    continue  # identical to the exact scan
+                recall, ms = measure(index, queries, exact, nprobe)
+                print(f"{label:<12} {quantization:<7} {index.resident_bytes / 2**20:>11.1f} "
+                      f"{recall:>9.3f} {ms:>9.3f} {exact_ms / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
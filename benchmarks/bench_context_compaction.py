@@ -0,0 +1,95 @@
+"""Context tokens before and after compaction, and the time compaction takes.
+
+Builds --triplets ranked triplets shaped like a Vendor 2 question's retrieval
+(documents issued_by/paid_to the same vendor, line items pointing at shared
+"Quantity N" nodes, duplicated entities from separate cognify runs) and runs
+cognee-minihack/context_compaction.py's compact_context at several budgets.
+Tokens are counted with HUGGINGFACE_TOKENIZER when transformers is installed,
+else approximately. With --store, each budget is also run against a
+fragment_store.FragmentStore synced from the same nodes (a temporary SQLite
+file), i.e. with node text and token counts looked up instead of recomputed.
+No Cognee needed.
+
+Usage:
+    python benchmarks/bench_context_compaction.py [--triplets 60] [--budget 500 1000 2000 4000] [--store]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cognee-minihack"))
+
+from context_compaction import compact_context, token_counter  # noqa: E402
+from fragment_store import FragmentStore  # noqa: E402
+
+
+def _node(node_id, name, description):
+    return SimpleNamespace(id=node_id, attributes={"name": name, "description": description})
+
+
+def _edge(a, b, relation):
+    return SimpleNamespace(node1=a, node2=b, attributes={"relationship_type": relation})
+
+
+def sample_triplets(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    vendors = [_node(f"vendor-{run}", "vendor 2", "Vendor 2, supplier of laptops, monitors and storage.") for run in range(2)]
+    quantities = {q: _node(f"quantity-{q}", f"quantity {q}", f"Quantity of {q} units ordered.") for q in range(1, 6)}
+    triplets = []
+    while len(triplets) < n:
+        d = len(triplets)
+        kind = rng.choice(["inv", "tx"])
+        doc = _node(
+            f"{kind}-{d}", f"{kind}-v2-m0{rng.randint(1, 9)}-{rng.randint(100000, 999999)}",
+            f"{'Invoice' if kind == 'inv' else 'Transaction'} for Vendor 2 dated 2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)} "
+            f"with total {rng.uniform(100, 9000):.2f} EUR.",
+        )
+        vendor = rng.choice(vendors)
+        relations = ["issued_by", "billed_by"] if kind == "inv" else ["paid_to"]
+        triplets.extend(_edge(doc, vendor, r) for r in relations)
+        item = _node(f"item-{d}", f"lineitem {doc.attributes['name']}_ptd-lap-00{rng.randint(1, 5)}",
+                     "Line item: one laptop model on this document.")
+        triplets.append(_edge(doc, item, "contains_item"))
+        triplets.append(_edge(item, quantities[rng.randint(1, 5)], "has_quantity"))
+    return triplets[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--triplets", type=int, default=60)
+    parser.add_argument("--budget", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--store", action="store_true", help="also time compaction against a synced fragment store")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    count = token_counter()
+    triplets = sample_triplets(args.triplets)
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = [("live", {"count": count})]
+        if args.store:
+            store = FragmentStore(Path(tmp) / "fragments.sqlite", count=count)
+            nodes = {str(n.id): n for t in triplets for n in (t.node1, t.node2)}
+            edges = [(t.node1.id, t.node2.id, t.attributes["relationship_type"], {}) for t in triplets]
+            start = time.perf_counter()
+            changes = store.sync(((i, n.attributes) for i, n in nodes.items()), edges)
+            print(f"store sync: {changes} in {(time.perf_counter() - start) * 1000:.1f} ms")
+            variants.append(("store", {"count": store.count, "entry": store.entry}))
+
+        print(f"{'budget':>7} {'source':<6} {'tokens in':>9} {'kept':>6} {'edges':>9} {'ms':>7}")
+        for budget in args.budget:
+            for label, hooks in variants:
+                start = time.perf_counter()
+                for _ in range(args.repeat):
+                    result = compact_context(triplets, budget=budget, **hooks)
+                ms = (time.perf_counter() - start) * 1000 / args.repeat
+                print(f"{budget:>7} {label:<6} {result.tokens_in:>9} {result.tokens_kept:>6} "
+                      f"{result.edges_kept:>4}/{result.edges_in:<4} {ms:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Memory and expansion latency of the in-memory CSR graph projection.
+
+Builds a synthetic graph shaped like the cognify output (documents issued by
+vendors, each containing line items that refer to products and quantities)
+with about --edges edges, projects it with cognee-minihack/graph_projection.py
+and reports build time, array memory and the latency of the retriever's
+two-hop expansion (document -contains_item-> LineItem -refers_to/has_quantity->
+...) from --seeds random documents. A dict-of-lists adjacency is timed on the
+same expansion as the baseline. No Cognee needed.
+
+Usage:
+    python benchmarks/bench_graph_projection.py [--edges 1000000] [--seeds 10] [--repeat 200]
+
+On a 1M-edge graph the expansion from 100+ seeds is 2-3x faster than the dict
+baseline and the projection retains about a third of the dict's memory; from a
+handful of seeds both take well under a millisecond.
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cognee-minihack"))
+
+from graph_projection import DEFAULT_HOPS, GraphProjection  # noqa: E402
+
+ITEMS_PER_DOCUMENT = 4
+PRODUCTS = 500
+
+
+def synthetic_graph(target_edges: int, seed: int = 0):
+    """Nodes and edges in get_graph_data() shape; ~2 + 3 * ITEMS_PER_DOCUMENT edges per document."""
+    rng = random.Random(seed)
+    nodes = [(f"vendor-{v}", {"name": f"vendor {v}", "type": "Vendor"}) for v in range(1, 21)]
+    nodes += [(f"product-{p}", {"name": f"product sku-{p:03d}", "type": "Product"}) for p in range(PRODUCTS)]
+    nodes += [(f"quantity-{q}", {"name": f"quantity {q}", "type": "Quantity"}) for q in range(1, 51)]
+    edges = []
+    n_docs = target_edges // (2 + 3 * ITEMS_PER_DOCUMENT)
+    for d in range(n_docs):
+        doc = f"doc-{d}"
+        nodes.append((doc, {"name": f"inv-v{d % 20 + 1}-{d:07d}", "type": "Invoice", "description": "invoice"}))
+        edges.append((doc, f"vendor-{d % 20 + 1}", "issued_by", {}))
+        edges.append((doc, f"total-{d}", "has_total", {}))
+        nodes.append((f"total-{d}", {"name": f"total {rng.uniform(10, 9000):.2f}", "type": "Total"}))
+        for i in range(ITEMS_PER_DOCUMENT):
+            item = f"item-{d}-{i}"
+            nodes.append((item, {"name": f"lineitem {d}_{i}", "type": "LineItem"}))
+            edges.append((doc, item, "contains_item", {}))
+            edges.append((item, f"product-{rng.randrange(PRODUCTS)}", "refers_to", {}))
+            edges.append((item, f"quantity-{rng.randint(1, 50)}", "has_quantity", {}))
+    return nodes, edges, n_docs
+
+
+def dict_adjacency(edges):
+    adjacency = defaultdict(list)
+    for src, dst, rel, _ in edges:
+        adjacency[src].append((rel, dst))
+        adjacency[dst].append((rel, src))
+    return adjacency
+
+
+def dict_expand(adjacency, seeds, hops):
+    frontier, visited, out = set(seeds), set(seeds), []
+    for relations in hops:
+        reached = set()
+        for node in frontier:
+            for rel, other in adjacency[node]:
+                if rel in relations:
+                    out.append((node, rel, other))
+                    if other not in visited:
+                        reached.add(other)
+        visited |= reached
+        frontier = reached
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    nodes, edges, n_docs = synthetic_graph(args.edges)
+    print(f"graph: {len(nodes):,} nodes, {len(edges):,} edges")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    projection = GraphProjection.from_graph_data(nodes, edges)
+    build_s = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"projection build {build_s:.2f} s, retained {retained / 2**20:.0f} MiB (peak {peak / 2**20:.0f}), "
+          f"CSR/edge arrays {projection.nbytes / 2**20:.1f} MiB (+ node-ID index and name strings)")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    adjacency = dict_adjacency(edges)
+    build_s = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"dict adjacency build {build_s:.2f} s, retained {retained / 2**20:.0f} MiB (peak {peak / 2**20:.0f})")
+
+    rng = random.Random(1)
+    seed_sets = [[f"doc-{rng.randrange(n_docs)}" for _ in range(args.seeds)] for _ in range(args.repeat)]
+    hops = [set(h) for h in DEFAULT_HOPS]
+
+    start = time.perf_counter()
+    for seeds in seed_sets:
+        csr_result = projection.expand(seeds, DEFAULT_HOPS)
+    csr_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+    start = time.perf_counter()
+    for seeds in seed_sets:
+        dict_result = dict_expand(adjacency, seeds, hops)
+    dict_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+    print(f"{args.seeds}-seed two-hop expansion: csr {csr_ms:.3f} ms ({len(csr_result)} edges), "
+          f"dict {dict_ms:.3f} ms ({len(dict_result)} edges)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Import cost of the app's entry modules, from `python -X importtime`.
+
+Imports each --module in a fresh interpreter (--runs times, best run kept) and
+reports the cumulative import time, the number of modules loaded, whether the
+Cognee pipeline (solution_q_and_a, cognee) was imported, and the top-level
+packages that took the most (self) import time. Point --root at another
+checkout (e.g. a `git worktree` of an older commit) to compare before/after.
+
+Usage:
+    python benchmarks/bench_import_time.py [--module core.agents core.cognee_client] [--root .] [--runs 5] [--top 8]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+_PROBE = "import sys; print(int('solution_q_and_a' in sys.modules), int('cognee' in sys.modules))"
+
+
+def measure(root: Path, module: str):
+    """(cumulative µs of `module`, {top-level package: self µs}, modules loaded, pipeline flags)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}; {_PROBE}"],
+        cwd=root, capture_output=True, text=True,
+    )
+    total = 0
+    packages = {}
+    loaded = 0
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        loaded += 1
+        own, cumulative, name = int(match.group(1)), int(match.group(2)), match.group(3)
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + own
+        if name == module:
+            total = cumulative
+    flags = proc.stdout.split() if proc.returncode == 0 else ["?", "?"]
+    return total, packages, loaded, flags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", nargs="+", default=["core.agents", "core.cognee_client"])
+    parser.add_argument("--root", type=Path, default=Path(__file__).resolve().parent.parent)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"root: {args.root.resolve()}")
+    for module in args.module:
+        runs = [measure(args.root, module) for _ in range(args.runs)]
+        total, packages, loaded, (pipeline, cognee) = min(runs, key=lambda run: run[0])
+        print(f"\n{module}: {total / 1000:.1f} ms cumulative, {loaded} modules, "
+              f"solution_q_and_a imported={pipeline == '1'}, cognee imported={cognee == '1'}")
+        for name, micros in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+            print(f"  {name:<28} {micros / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Benchmark core.json_extract against the previous multi-try parse of ask_cognee_json.
+
+Cases:
+- every captured answer in cognee-minihack/responses.txt (chatty prose, no JSON),
+- those answers wrapped around a dashboard JSON array (prose before/after, fences),
+- synthetic ~1 MB outputs: clean, with SLM mistakes (single quotes, trailing commas,
+  unquoted keys), and truncated mid-row.
+
+Usage:
+    python benchmarks/bench_json_extract.py [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.json_extract import extract_json  # noqa: E402
+
+
+def legacy_parse(text: str):
+    """The parse ask_cognee_json used before: fences, full parse, then '[..]' and '{..}' slices."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+        if text.lower().startswith("json"):
+            text = text[4:].strip()
+    try:
+        return json.loads(text)
+    except Exception:
+        for opener, closer in (("[", "]"), ("{", "}")):
+            start, end = text.find(opener), text.rfind(closer)
+            if start != -1 and end > start:
+                try:
+                    return json.loads(text[start:end + 1])
+                except Exception:
+                    pass
+        return None
+
+
+def captured_answers():
+    path = ROOT / "cognee-minihack" / "responses.txt"
+    answers = [line[len("Answer: "):] for line in path.read_text().splitlines() if line.startswith("Answer: ")]
+    return answers
+
+
+def dashboard_rows(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            "invoice_id": f"INV-V{rng.randint(1, 20)}-M{rng.randint(1, 12):02d}-{rng.randint(100000, 999999)}",
+            "vendor_name": f"Vendor {rng.randint(1, 20)}",
+            "amount": round(rng.uniform(10, 30000), 2),
+            "currency": "EUR",
+            "match_status": rng.choice(["MATCHED", "UNMATCHED", "PARTIAL", "SUSPICIOUS"]),
+            "match_type": rng.choice(["EXACT", "APPROX", "NONE"]),
+            "anomaly_severity": rng.choice(["NONE", "LOW", "MEDIUM", "HIGH"]),
+            "short_explanation": "Paid by TX-V3-M03-535592 [after discount]; see {details}.",
+        }
+        for _ in range(n)
+    ]
+
+
+def sloppy(rows) -> str:
+    """Python-repr style objects with unquoted keys and trailing commas."""
+    parts = []
+    for row in rows:
+        members = ", ".join(f"{k}: {v!r}" for k, v in row.items())
+        parts.append("{" + members + ",}")
+    return "[" + ",\n".join(parts) + ",]"
+
+
+def cases():
+    answers = captured_answers()
+    rows = dashboard_rows(20)
+    wrapped = [
+        f"{a}\nHere is the table [as requested]:\n```json\n{json.dumps(rows, indent=2)}\n```\nLet me know {{if}} needed."
+        for a in answers
+    ]
+    big_rows = dashboard_rows(3500)
+    clean = json.dumps(big_rows)
+    return [
+        ("responses.txt prose", answers),
+        ("prose + fenced array", wrapped),
+        (f"clean array {len(clean) / 1e6:.1f} MB", [clean]),
+        (f"chatty clean array {len(clean) / 1e6:.1f} MB", ["Sure [as requested]! Here it is:\n" + clean + "\nDone (see [2])."]),
+        ("sloppy array 1 MB", [sloppy(big_rows)]),
+        ("truncated array 1 MB", [clean[: int(len(clean) * 0.97)]]),
+    ]
+
+
+def _time(fn, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(t) for t in texts]
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts), results
+
+
+def _rows(value):
+    if isinstance(value, list):
+        return len(value)
+    return 1 if isinstance(value, dict) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<28} {'legacy ms':>10} {'legacy rows':>11} {'new ms':>8} {'new rows':>9}  repairs")
+    for name, texts in cases():
+        legacy_s, legacy = _time(legacy_parse, texts, args.repeat)
+        new_s, new = _time(extract_json, texts, args.repeat)
+        repairs = sorted({r for e in new if e is not None for r in e.repairs})
+        print(
+            f"{name:<28} {legacy_s * 1e3:>10.3f} {sum(map(_rows, legacy)):>11} "
+            f"{new_s * 1e3:>8.3f} {sum(_rows(e.value) for e in new if e is not None):>9}  {', '.join(repairs) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Time to first token against the live Ollama endpoint: prompt layout and warm-up.
+
+Layouts (each run as one session of --turns questions, streamed, one at a time):
+
+- before: the conversation history in front of the system prompt
+  (`history + "\\nTASK:" + system_prompt`) and the retrieved context in front of
+  the question, as custom_generate_completion used to build messages;
+- after: cognee-minihack/prompt_templates.py's layout: system prompt, template
+  instructions and question first, history after the system prompt, context last.
+
+Each turn gets a different retrieved context (bench_context_compaction's
+synthetic triplets) and the previous answers as history, so what Ollama can
+reuse from its KV cache is exactly the shared prefix of the layout. With --cold
+the model is unloaded first and the first request's TTFT is measured without,
+then with, llm_client.warm_up_llm. Needs Ollama serving LLM_MODEL at
+LLM_ENDPOINT (default http://localhost:11434/v1).
+
+Usage:
+    python benchmarks/bench_prompt_prefix.py [--turns 6] [--question "..."] [--cold]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "cognee-minihack"))
+
+from bench_context_compaction import sample_triplets  # noqa: E402
+from context_compaction import compact_context  # noqa: E402
+from llm_client import _native_endpoint, get_llm_client, get_llm_config, warm_up_llm  # noqa: E402
+from prompt_templates import PROMPTS_DIR, build_messages, render_user_prompt, system_prompt_text  # noqa: E402
+
+QUESTION = "Summarize payments to Vendor 2 and list any invoices without a matching payment."
+
+
+def before_messages(question: str, context: str, system_prompt: str, history: str):
+    template = (PROMPTS_DIR / "user_prompt.txt").read_text()
+    instructions = template[: template.index("<")]
+    user_prompt = f"{instructions}<context>`{context}`</context>\n<question>`{question}`</question>"
+    if history:
+        system_prompt = history + "\nTASK:" + system_prompt
+    return [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}]
+
+
+def after_messages(question: str, context: str, system_prompt: str, history: str):
+    return build_messages(render_user_prompt("user_prompt.txt", question, context), system_prompt, history)
+
+
+async def ttft(messages) -> tuple:
+    """(seconds to the first content delta, full answer)."""
+    config = get_llm_config()
+    start = time.perf_counter()
+    first = None
+    parts = []
+    stream = await get_llm_client().chat.completions.create(
+        model=config.model, messages=messages, stream=True, max_tokens=64
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            if first is None:
+                first = time.perf_counter() - start
+            parts.append(chunk.choices[0].delta.content)
+    return (first if first is not None else time.perf_counter() - start), "".join(parts)
+
+
+async def session(build, turns: int, question: str, system_prompt: str):
+    history = ""
+    times = []
+    for turn in range(turns):
+        context = compact_context(sample_triplets(60, seed=turn), budget=1000).text
+        seconds, answer = await ttft(build(question, context, system_prompt, history))
+        times.append(seconds)
+        history += f"Question: {question}\nContext summary: {len(context)} chars\nAnswer: {answer}\n"
+    return times
+
+
+async def unload():
+    config = get_llm_config()
+    async with httpx.AsyncClient(timeout=config.timeout) as http:
+        await http.post(f"{_native_endpoint(config.endpoint)}/api/generate", json={"model": config.model, "keep_alive": 0})
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=6)
+    parser.add_argument("--question", default=QUESTION)
+    parser.add_argument("--cold", action="store_true", help="also measure the first request after unloading the model")
+    args = parser.parse_args()
+
+    system_prompt = system_prompt_text(str(PROMPTS_DIR / "system_prompt.txt"))
+    context = compact_context(sample_triplets(60), budget=1000).text
+
+    if args.cold:
+        await unload()
+        cold, _ = await ttft(after_messages(args.question, context, system_prompt, ""))
+        await unload()
+        warm_s = await warm_up_llm(system_prompt)
+        warmed, _ = await ttft(after_messages(args.question, context, system_prompt, ""))
+        print(f"first request TTFT: {cold:.2f}s cold, {warmed:.2f}s after warm-up (warm-up took {warm_s:.2f}s)")
+
+    await warm_up_llm(system_prompt)
+    print(f"{'layout':<8} {'turn TTFTs (s)':<48} {'mean':>6} {'median':>6}")
+    for label, build in (("before", before_messages), ("after", after_messages)):
+        times = await session(build, args.turns, args.question, system_prompt)
+        print(f"{label:<8} {' '.join(f'{t:.2f}' for t in times):<48} "
+              f"{statistics.mean(times):>6.2f} {statistics.median(times):>6.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""Search-space size and retrieval latency with and without vendor scoping.
+
+Runs the same questions through GraphCompletionRetrieverWithUserPrompt.get_triplets
+twice, once with query routing (vendor NodeSet subgraphs, see
+cognee-minihack/query_routing.py) and once with the global search, and prints the
+projected nodes/edges and the projection/search time per mode. Needs Cognee
+installed and the graph imported (cognee-minihack/setup.py); graphs built before
+records were added under vendor node sets show up as "fallback".
+
+Usage:
+    python benchmarks/bench_query_routing.py [--repeat 3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+MINIHACK = Path(__file__).resolve().parent.parent / "cognee-minihack"
+sys.path.insert(0, str(MINIHACK))
+os.chdir(MINIHACK)
+
+import solution_q_and_a  # noqa: E402,F401  (sets the LLM/embedding environment first)
+from custom_retriever import GraphCompletionRetrieverWithUserPrompt  # noqa: E402
+from query_routing import vendor_scope  # noqa: E402
+
+QUESTIONS = [
+    "Vendor 2 says they received a wrong payment, can you check whether all payments to Vendor 2 are correct?",
+    "We ordered a new laptop from Vendor 3 but it was not delivered, can you check whether we ever paid for a laptop from Vendor 3?",
+    "Do we usually wait until the due date to pay Vendor 15, or do we pay them early?",
+    "Was INV-V15-M01-282247 paid in full?",
+    "Which vendors consistently give us discounts on our orders?",
+]
+
+
+async def run(repeat: int):
+    for routing in (True, False):
+        retriever = GraphCompletionRetrieverWithUserPrompt(
+            user_prompt_filename="user_prompt.txt", top_k=10, routing=routing
+        )
+        for _ in range(repeat):
+            for question in QUESTIONS:
+                await retriever.get_triplets(question)
+        label = "routing on " if routing else "routing off"
+        for mode, stats in retriever.routing_metrics.stats().items():
+            if not stats["searches"]:
+                continue
+            print(
+                f"{label} {mode:<9} searches={stats['searches']:>3} nodes={stats['avg_nodes']:>8.0f} "
+                f"edges={stats['avg_edges']:>8.0f} project={stats['avg_project_ms']:>8.1f} ms "
+                f"search={stats['avg_search_ms']:>8.1f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for question in QUESTIONS:
+        print(f"{str(vendor_scope(question)):<26} {question[:70]}")
+    asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
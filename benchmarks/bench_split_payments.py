@@ -0,0 +1,88 @@
+"""Benchmark the split-payment solver at 10k, 100k and 1M transactions.
+
+A synthetic ledger is generated where ~10% of the transactions are instalments
+of an invoice (ONE_TO_MANY) or settle several invoices at once (MANY_TO_ONE);
+those, plus unrelated noise, form the unmatched set the solver sees, exactly as
+core.agents hands it over after the 1:1 engine ran.
+
+Usage:
+    python benchmarks/bench_split_payments.py [--sizes 10000,100000,1000000] [--budget 1.0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.split_payments import find_split_payments  # noqa: E402
+
+
+def synthetic_unmatched(n_transactions: int, n_vendors: int = 20, seed: int = 0):
+    """Unmatched invoices/transactions, and the document ids of each planted split settlement."""
+    rng = np.random.default_rng(seed)
+    n_split_tx = n_transactions // 10
+    start = np.datetime64("2025-01-01")
+
+    invoices, transactions = [], []
+    planted = set()  # the documents of each planted settlement
+    tx_count = 0
+    inv_count = 0
+    while tx_count < n_split_tx:
+        vendor = int(rng.integers(1, n_vendors + 1))
+        day = start + np.timedelta64(int(rng.integers(0, 365)), "D")
+        parts = rng.integers(100, 500_000, int(rng.integers(2, 5)))  # cents
+        one_to_many = rng.random() < 0.7
+        first_inv, first_tx = inv_count, tx_count
+        if one_to_many:
+            invoices.append((f"INV-S{inv_count}", vendor, day, parts.sum() / 100))
+            inv_count += 1
+            for p in parts:
+                offset = np.timedelta64(int(rng.integers(0, 30)), "D")
+                transactions.append((f"TX-S{tx_count}", vendor, day + offset, p / 100))
+                tx_count += 1
+        else:
+            for p in parts:
+                invoices.append((f"INV-S{inv_count}", vendor, day - np.timedelta64(int(rng.integers(0, 30)), "D"), p / 100))
+                inv_count += 1
+            transactions.append((f"TX-S{tx_count}", vendor, day, parts.sum() / 100))
+            tx_count += 1
+        planted.add(frozenset([f"INV-S{i}" for i in range(first_inv, inv_count)]
+                              + [f"TX-S{i}" for i in range(first_tx, tx_count)]))
+
+    # Noise: unmatched documents that belong to no settlement.
+    for i in range(n_split_tx // 4):
+        vendor = int(rng.integers(1, n_vendors + 1))
+        day = start + np.timedelta64(int(rng.integers(0, 365)), "D")
+        transactions.append((f"TX-N{i}", vendor, day, int(rng.integers(100, 500_000)) / 100))
+        invoices.append((f"INV-N{i}", vendor, day, int(rng.integers(100, 500_000)) / 100))
+
+    inv = pd.DataFrame(invoices, columns=["invoice_id", "vendor_id", "date", "total"])
+    tx = pd.DataFrame(transactions, columns=["transaction_id", "vendor_id", "date", "amount"])
+    return inv, tx, planted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds per vendor")
+    args = parser.parse_args()
+
+    print(f"{'transactions':>12} {'unmatched tx':>12} {'planted':>8} {'found':>8} {'recall':>7} {'precision':>9} {'seconds':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        inv, tx, planted = synthetic_unmatched(size)
+        start = time.perf_counter()
+        splits = find_split_payments(inv, tx, vendor_budget_s=args.budget)
+        elapsed = time.perf_counter() - start
+        # A match is genuine only when it recovers exactly one planted settlement.
+        genuine = sum(frozenset(s.invoice_ids + s.transaction_ids) in planted for s in splits)
+        print(f"{size:>12} {len(tx):>12} {len(planted):>8} {len(splits):>8} {genuine / max(len(planted), 1):>7.1%} "
+              f"{genuine / max(len(splits), 1):>9.1%} {elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
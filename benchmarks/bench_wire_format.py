@@ -0,0 +1,146 @@
+"""Output tokens and decode time of the JSON vs compact TSV agent answers.
+
+The same dashboard rows (50) and anomaly cards (20) are rendered the way the
+SLM writes them today (a pretty-printed JSON array of objects) and in the
+compact wire format (core.compact: header + TSV lines, enum codes). Rows
+come from the local ledger through the engine when enough data is present,
+otherwise they are synthetic.
+
+Tokens are counted with the HUGGINGFACE_TOKENIZER tokenizer when
+`transformers` is installed, else with a GPT-2-style approximation. Decode time
+is estimated at --tok-per-s; --live instead times real source="llm" calls
+against the local Cognee backend for both formats.
+
+Usage:
+    python benchmarks/bench_wire_format.py [--tok-per-s 15] [--live]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.compact import compact_format  # noqa: E402
+from core.models import (  # noqa: E402
+    MATCH_STATUSES, MATCH_TYPES, SEVERITIES, AnomalyCard, DashboardRow,
+)
+
+_PRETOKEN = re.compile(r"""'(?:s|t|re|ve|m|ll|d)| ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+(?!\S)|\s+""")
+
+
+def approx_tokens(text: str) -> int:
+    """GPT-2-style pre-tokenization; long words count one extra token per 6 letters."""
+    return sum(1 + max(len(piece.strip()) - 1, 0) // 6 for piece in _PRETOKEN.findall(text))
+
+
+def token_counter():
+    name = os.environ.get("HUGGINGFACE_TOKENIZER", "nomic-ai/nomic-embed-text-v1.5")
+    try:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(name)
+        return f"{name}", lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    except Exception:
+        return "approx (GPT-2-style pre-tokenizer)", approx_tokens
+
+
+def sample_rows(n_rows: int, n_cards: int, seed: int = 0):
+    rng = random.Random(seed)
+    rows = [
+        DashboardRow(
+            invoice_id=f"INV-V{rng.randint(1, 20)}-M{rng.randint(1, 12):02d}-{rng.randint(100000, 999999)}",
+            vendor_name=f"Vendor {rng.randint(1, 20)}",
+            amount=round(rng.uniform(10, 30000), 2),
+            currency="EUR",
+            match_status=rng.choice(MATCH_STATUSES),
+            match_type=rng.choice(MATCH_TYPES),
+            anomaly_severity=rng.choice(SEVERITIES),
+            short_explanation="Paid in full by the matching transaction within the payment terms.",
+        )
+        for _ in range(n_rows)
+    ]
+    cards = [
+        AnomalyCard(
+            invoice_id=r.invoice_id,
+            vendor_name=r.vendor_name,
+            severity=rng.choice(SEVERITIES[1:]),
+            reason_codes=rng.sample(["AMOUNT_OUTLIER", "NO_MATCH", "UNDERPAID", "PRICE_OUTLIER"], 2),
+            human_explanation="The invoice total is far above this vendor's usual range and no payment matches it.",
+            recommendation="Ask the vendor for the purchase order before approving payment.",
+        )
+        for r in rows[:n_cards]
+    ]
+    return rows, cards
+
+
+def engine_rows(n_rows: int, n_cards: int):
+    """Rows/cards from the local ledger, or None when it is too small to be representative."""
+    try:
+        from core.agents import _engine_cards, _reconcile
+        from core.ledger import load_ledger
+        from core.reconciliation import build_dashboard_rows
+    except Exception:
+        return None
+    ledger = load_ledger()
+    if len(ledger.invoices) < n_rows:
+        return None
+    rows = build_dashboard_rows(_reconcile(ledger))[:n_rows]
+    cards = list(_engine_cards(n_cards, use_cache=True, explain_limit=0, batch_size=1))
+    return rows, cards
+
+
+def offline(args, count):
+    rows, cards = engine_rows(50, 20) or sample_rows(50, 20)
+    print(f"{'answer':<22} {'format':<6} {'bytes':>7} {'tokens':>7} {'decode s':>9} {'parse ms':>9}")
+    for name, cls, items in (("dashboard (50 rows)", DashboardRow, rows), ("anomalies (20 cards)", AnomalyCard, cards)):
+        dicts = [item.to_dict() for item in items]
+        fmt = compact_format(cls)
+        answers = {
+            "json": json.dumps(dicts, indent=2, ensure_ascii=False),
+            "tsv": fmt.encode(dicts),
+        }
+        parsers = {"json": json.loads, "tsv": fmt.parse}
+        tokens = {}
+        for kind, text in answers.items():
+            start = time.perf_counter()
+            for _ in range(100):
+                parsed = parsers[kind](text)
+            parse_ms = (time.perf_counter() - start) * 10
+            assert len(parsed) == len(dicts)
+            tokens[kind] = count(text)
+            print(f"{name:<22} {kind:<6} {len(text):>7} {tokens[kind]:>7} {tokens[kind] / args.tok_per_s:>9.1f} {parse_ms:>9.3f}")
+        print(f"{'':<22} tsv saves {1 - tokens['tsv'] / tokens['json']:.0%} of output tokens")
+
+
+def live(args):
+    from core.agents import get_global_anomalies, get_reconciliation_dashboard
+
+    print(f"{'agent':<10} {'format':<6} {'items':>6} {'wall s':>8}")
+    for name, fn, limit in (("dashboard", get_reconciliation_dashboard, 50), ("anomalies", get_global_anomalies, 20)):
+        for kind in ("json", "tsv"):
+            start = time.perf_counter()
+            items = fn(limit=limit, use_cache=False, source="llm", wire_format=kind)
+            print(f"{name:<10} {kind:<6} {len(items):>6} {time.perf_counter() - start:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tok-per-s", type=float, default=15.0, help="SLM decode speed for the estimate")
+    parser.add_argument("--live", action="store_true", help="time real LLM calls instead of estimating")
+    args = parser.parse_args()
+    if args.live:
+        live(args)
+        return
+    name, count = token_counter()
+    print(f"tokenizer: {name}; decode estimate at {args.tok_per_s:g} tok/s")
+    offline(args, count)
+
+
+if __name__ == "__main__":
+    main()
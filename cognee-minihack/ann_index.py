@@ -0,0 +1,446 @@
+"""Approximate nearest-neighbour (IVF) index over the vector collections.
+
+brute_force_triplet_search scores every embedding of every collection for each
+query, so its cost grows with the LanceDB row count. `AnnIndex` keeps one
+inverted-file index per collection: the L2-normalised 768-dim vectors are
+clustered with spherical k-means into ~4*sqrt(n) lists, and a query scans only
+the `nprobe` lists whose centroids are closest. `ann_triplet_search` uses it to
+take the top candidates per collection and scores the triplets on the memory
+fragment the same way the brute-force search does.
+
+The manifest records the graph version (graph_version) the index was saved at;
+an index saved before the graph last changed no longer `covers` any collection,
+so the retriever falls back to the brute-force search until `update_ann_index`
+runs again. The index is off unless ANN_INDEX_ENABLED is set: recall depends on
+ANN_NPROBE and the data (see benchmarks/bench_ann_index.py).
+
+The index is persisted as .npy arrays, one directory per collection, in
+ANN_INDEX_DIR (default cognee_export/ann_index, next to the exported
+databases), loaded by the retriever at startup, and updated incrementally after
+cognify (`update_ann_index` adds new rows to their nearest list and retrains a
+collection once it has doubled). With ANN_QUANTIZATION=int8 or binary the lists
+are scanned on compact codes and a shortlist is re-ranked on the float vectors,
+which are memory-mapped rather than loaded. Only NumPy is needed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from graph_version import get_graph_version
+from quantization import QUANTIZERS, RERANK_FACTOR
+
+logger = logging.getLogger(__name__)
+
+ANN_ENABLED = os.environ.get("ANN_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+ANN_INDEX_DIR = Path(
+    os.environ.get("ANN_INDEX_DIR", str(Path(__file__).resolve().parent / "cognee_export" / "ann_index"))
+)
+# Lists scanned per query, and candidates per collection handed to the triplet scoring.
+ANN_NPROBE = int(os.environ.get("ANN_NPROBE", "8"))
+ANN_CANDIDATES = int(os.environ.get("ANN_CANDIDATES", "200"))
+# Optional compact codes for the first-pass scan: none, int8 or binary (see quantization).
+ANN_QUANTIZATION = os.environ.get("ANN_QUANTIZATION", "none").lower()
+# Codes decoded per block in the first pass, so the float copy stays in cache.
+SCAN_BLOCK = 4096
+# Below this many rows a collection is scanned exactly (one list).
+MIN_ROWS_FOR_LISTS = 1024
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 50_000
+# Retrain a collection's lists once it has grown by this factor since training.
+RETRAIN_GROWTH = 2.0
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if k >= scores.size:
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on (a sample of) normalised vectors."""
+    rng = np.random.default_rng(seed)
+    sample = vectors if len(vectors) <= KMEANS_SAMPLE else vectors[rng.choice(len(vectors), KMEANS_SAMPLE, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        sums = np.zeros_like(centroids)
+        used = counts > 0
+        sums[used] = np.add.reduceat(sample[order], (np.cumsum(counts) - counts)[used], axis=0)
+        empty = ~used
+        # Re-seed empty lists with random points so every list stays in use.
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file index: vectors grouped by nearest centroid, scanned per probed list.
+
+    With a `quantizer`, each probed list is first scanned on the compact codes and
+    only the best `rerank_factor * k` rows are scored on the float vectors.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+        centroids: np.ndarray,
+        trained_rows: int,
+        order: Optional[np.ndarray] = None,
+        offsets: Optional[np.ndarray] = None,
+        quantizer=None,
+        codes: Optional[np.ndarray] = None,
+    ):
+        self.ids = ids
+        self.vectors = vectors
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.trained_rows = trained_rows
+        self.quantizer = quantizer
+        self.codes = codes
+        if order is None or offsets is None:
+            self._build_lists()
+        else:
+            self.order, self.offsets = order, offsets
+
+    @classmethod
+    def build(
+        cls, ids: Sequence[str], vectors: np.ndarray, nlist: Optional[int] = None, quantization: str = ANN_QUANTIZATION
+    ) -> "IVFIndex":
+        vectors = _normalize(vectors)
+        n = len(vectors)
+        if nlist is None:
+            nlist = 1 if n < MIN_ROWS_FOR_LISTS else int(4 * np.sqrt(n))
+        centroids = train_centroids(vectors, nlist) if nlist > 1 else _normalize(vectors.mean(axis=0, keepdims=True))
+        index = cls(np.asarray(ids, dtype=str), vectors, centroids, n)
+        if quantization != "none":
+            index.quantizer = QUANTIZERS[quantization]().fit(vectors)
+            index.codes = index.quantizer.encode(vectors)
+        return index
+
+    def _build_lists(self) -> None:
+        assign = np.argmax(self.vectors @ self.centroids.T, axis=1) if len(self.vectors) else np.empty(0, dtype=np.int64)
+        self.order = np.argsort(assign, kind="stable")
+        self.offsets = np.zeros(len(self.centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=len(self.centroids)), out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def needs_retrain(self) -> bool:
+        return len(self) >= MIN_ROWS_FOR_LISTS and len(self) > RETRAIN_GROWTH * max(self.trained_rows, 1)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes a query scans from memory: codes (or float vectors without them), centroids, lists."""
+        scanned = self.codes if self.codes is not None else self.vectors
+        return int(scanned.nbytes + self.centroids.nbytes + self.order.nbytes + self.offsets.nbytes)
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Append rows; each goes to its nearest existing list (no retraining)."""
+        if not len(ids):
+            return
+        vectors = _normalize(vectors)
+        self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=str)])
+        self.vectors = np.concatenate([self.vectors, vectors])
+        if self.quantizer is not None:
+            self.codes = np.concatenate([self.codes, self.quantizer.encode(vectors)])
+        self._build_lists()
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = ANN_NPROBE) -> List[Tuple[str, float]]:
+        """Up to k (id, cosine distance) pairs, nearest first."""
+        query = _normalize(query)
+        lists = _top(self.centroids @ query, min(nprobe, len(self.centroids)))
+        rows = np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        if not rows.size:
+            return []
+        if self.quantizer is not None:
+            # Sorted so the float rows are read from the memory map in file order.
+            approx = np.concatenate([
+                self.quantizer.scores(self.codes[rows[i:i + SCAN_BLOCK]], query) for i in range(0, rows.size, SCAN_BLOCK)
+            ])
+            shortlist = _top(approx, RERANK_FACTOR[self.quantizer.name] * k)
+            rows = np.sort(rows[shortlist])
+        scores = self.vectors[rows] @ query
+        best = _top(scores, k)
+        return [(str(self.ids[rows[i]]), float(1.0 - scores[i])) for i in best]
+
+    def farthest(self, query: np.ndarray, nprobe: int = ANN_NPROBE) -> float:
+        """Largest cosine distance to the query among the `nprobe` lists whose centroids are farthest.
+
+        Estimates the far end of the distance range the brute-force search
+        normalises over; exact when the index has no more than `nprobe` lists.
+        """
+        query = _normalize(query)
+        lists = _top(-(self.centroids @ query), min(nprobe, len(self.centroids)))
+        rows = np.sort(np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists]))
+        return float(1.0 - (self.vectors[rows] @ query).min()) if rows.size else 0.0
+
+    def save(self, directory: Path) -> None:
+        """One .npy per array, so load() can memory-map the ids, vectors and codes."""
+        tmp = directory.with_name(directory.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        arrays = {"ids": self.ids, "vectors": self.vectors, "centroids": self.centroids,
+                  "order": self.order, "offsets": self.offsets}
+        if self.quantizer is not None:
+            arrays.update(codes=self.codes, **self.quantizer.state())
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", np.asarray(array))
+        meta = {"trained_rows": self.trained_rows, "quantization": self.quantizer.name if self.quantizer else "none"}
+        (tmp / "meta.json").write_text(json.dumps(meta))
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "IVFIndex":
+        meta = json.loads((directory / "meta.json").read_text())
+        mode = "r" if mmap else None
+
+        def array(name, mmap_mode=None):
+            return np.load(directory / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+
+        quantizer, codes = None, None
+        if meta["quantization"] != "none":
+            quantizer_cls = QUANTIZERS[meta["quantization"]]
+            quantizer = quantizer_cls(**{name: array(name) for name in quantizer_cls().state()})
+            codes = array("codes", mode)
+        return cls(
+            array("ids", mode), array("vectors", mode), array("centroids"), meta["trained_rows"],
+            array("order"), array("offsets"), quantizer, codes,
+        )
+
+
+class AnnIndex:
+    """One IVFIndex per vector collection, persisted under `directory`.
+
+    `indexed` lists every collection the index was built for, including ones that
+    were empty or absent in the vector store at the time; `graph_version` is the
+    graph version it was last saved at.
+    """
+
+    def __init__(
+        self,
+        directory: Path = ANN_INDEX_DIR,
+        collections: Optional[Dict[str, IVFIndex]] = None,
+        indexed: Iterable[str] = (),
+        graph_version: Optional[str] = None,
+    ):
+        self.directory = Path(directory)
+        self.collections: Dict[str, IVFIndex] = collections or {}
+        self.indexed = set(indexed) | set(self.collections)
+        self.graph_version = graph_version
+        self._warned_stale = False
+
+    @classmethod
+    def load(cls, directory: Path = ANN_INDEX_DIR) -> Optional["AnnIndex"]:
+        """The persisted index, or None when none was built yet."""
+        manifest = Path(directory) / "manifest.json"
+        if not manifest.exists():
+            return None
+        data = json.loads(manifest.read_text())
+        collections = {name: IVFIndex.load(Path(directory) / name) for name in data.get("collections", [])}
+        return cls(directory, collections, data.get("indexed", []), data.get("graph_version"))
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, index in self.collections.items():
+            index.save(self.directory / name)
+        self.graph_version = get_graph_version()
+        manifest = {
+            "graph_version": self.graph_version,
+            "collections": sorted(self.collections),
+            "indexed": sorted(self.indexed),
+            "rows": {n: len(i) for n, i in self.collections.items()},
+            "resident_bytes": {n: i.resident_bytes for n, i in self.collections.items()},
+        }
+        (self.directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    @property
+    def is_current(self) -> bool:
+        """Whether the index was saved at the current graph version."""
+        return self.graph_version is not None and self.graph_version == get_graph_version()
+
+    def covers(self, collections: Iterable[str]) -> bool:
+        """Whether every collection is indexed and the graph has not changed since the index was saved."""
+        if not set(collections) <= self.indexed:
+            return False
+        if not self.is_current:
+            if not self._warned_stale:
+                logger.warning("ANN index at %s predates the current graph version, using brute-force search; "
+                               "run update_ann_index to bring it up to date", self.directory)
+                self._warned_stale = True
+            return False
+        return True
+
+    def search(self, collection: str, query: np.ndarray, k: int, nprobe: int = ANN_NPROBE) -> List[Tuple[str, float]]:
+        index = self.collections.get(collection)
+        return index.search(query, k, nprobe) if index is not None else []
+
+    def search_with_range(
+        self, collection: str, query: np.ndarray, k: int, nprobe: int = ANN_NPROBE
+    ) -> Tuple[List[Tuple[str, float]], float]:
+        """search() plus the estimated largest distance in the collection (see IVFIndex.farthest)."""
+        index = self.collections.get(collection)
+        if index is None:
+            return [], 0.0
+        return index.search(query, k, nprobe), index.farthest(query, nprobe)
+
+
+def vector_collections() -> List[str]:
+    """Vector collections of every indexed DataPoint field (as GraphCompletionRetriever builds them)."""
+    from cognee.infrastructure.engine import DataPoint
+    from cognee.modules.graph.utils.convert_node_to_data_point import get_all_subclasses
+
+    collections = []
+    for subclass in get_all_subclasses(DataPoint):
+        metadata_field = subclass.model_fields.get("metadata")
+        default = getattr(metadata_field, "default", None)
+        if isinstance(default, dict):
+            collections.extend(f"{subclass.__name__}_{name}" for name in default.get("index_fields", []))
+    return collections
+
+
+_lock = threading.Lock()
+_shared: Optional[Tuple[int, Optional[AnnIndex]]] = None  # (manifest mtime_ns, index)
+
+
+def get_ann_index(directory: Path = ANN_INDEX_DIR) -> Optional[AnnIndex]:
+    """The persisted index, re-read only when its manifest changed on disk; None if not built."""
+    global _shared
+    try:
+        mtime_ns = (Path(directory) / "manifest.json").stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _shared is not None and _shared[0] == mtime_ns:
+            return _shared[1]
+        try:
+            ann = AnnIndex.load(directory)
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("ANN index at %s unreadable, using brute-force search: %s", directory, exc)
+            ann = None
+        _shared = (mtime_ns, ann)
+        return ann
+
+
+async def _collection_rows(vector_engine, collection: str) -> Tuple[List[str], np.ndarray]:
+    """All (id, vector) rows of a LanceDB collection."""
+    connection = await vector_engine.get_connection()
+    table = await connection.open_table(collection)
+    frame = await table.query().select(["id", "vector"]).to_pandas()
+    if frame.empty:
+        return [], np.empty((0, 0), dtype=np.float32)
+    return [str(i) for i in frame["id"]], np.stack(frame["vector"].to_numpy()).astype(np.float32)
+
+
+async def update_ann_index(
+    collections: Optional[Sequence[str]] = None, directory: Path = ANN_INDEX_DIR, rebuild: bool = False
+) -> AnnIndex:
+    """Bring the persisted index up to date with the vector store and save it.
+
+    Missing collections are built; rows not yet indexed are added to their nearest
+    list, and a collection that has doubled since training is rebuilt. `rebuild`
+    discards the existing index (after a prune).
+    """
+    from cognee.infrastructure.databases.vector import get_vector_engine
+
+    collections = list(collections) if collections is not None else vector_collections()
+    vector_engine = get_vector_engine()
+    ann = None if rebuild else AnnIndex.load(directory)
+    ann = ann or AnnIndex(directory)
+    ann.indexed.update(collections)
+    existing = set(await (await vector_engine.get_connection()).table_names())
+    for collection in collections:
+        if collection not in existing:
+            continue
+        start = time.perf_counter()
+        ids, vectors = await _collection_rows(vector_engine, collection)
+        if not ids:
+            continue
+        index = ann.collections.get(collection)
+        if index is None:
+            index = IVFIndex.build(ids, vectors)
+            action = "built"
+        else:
+            known = set(index.ids.tolist())
+            new = [i for i, row_id in enumerate(ids) if row_id not in known]
+            index.add([ids[i] for i in new], vectors[new])
+            action = f"added {len(new)}"
+            current = index.quantizer.name if index.quantizer is not None else "none"
+            if index.needs_retrain or current != ANN_QUANTIZATION:
+                index = IVFIndex.build(index.ids, index.vectors)
+                action += ", retrained"
+        ann.collections[collection] = index
+        logger.info("ANN index %s: %s (%d rows, %d lists) in %.2fs",
+                    collection, action, len(index), len(index.centroids), time.perf_counter() - start)
+    ann.save()
+    return ann
+
+
+def _normalized(distances: np.ndarray, high: float) -> np.ndarray:
+    """Distances min-max normalised over [nearest candidate, `high`], clipped to [0, 1].
+
+    The LanceDB adapter normalises over every row of the collection; normalising
+    over the candidates alone would stretch their scores across the whole [0, 1]
+    range and change how node and edge distances weigh against each other.
+    """
+    low = float(distances.min())
+    span = max(float(high), float(distances.max())) - low
+    return np.clip((distances - low) / span, 0.0, 1.0) if span > 0 else np.zeros_like(distances)
+
+
+def _scored(results: List[Tuple[str, float]], high: float) -> List[Any]:
+    """ScoredResults with distances normalised as the LanceDB adapter returns them (see _normalized)."""
+    from cognee.infrastructure.databases.vector.models.ScoredResult import ScoredResult
+
+    if not results:
+        return []
+    normalized = _normalized(np.asarray([d for _, d in results], dtype=np.float32), high)
+    return [ScoredResult(id=row_id, score=float(s), payload={}) for (row_id, _), s in zip(results, normalized)]
+
+
+async def ann_triplet_search(
+    query: str,
+    ann: AnnIndex,
+    top_k: int,
+    collections: Sequence[str],
+    memory_fragment,
+    candidates: int = ANN_CANDIDATES,
+    nprobe: int = ANN_NPROBE,
+):
+    """brute_force_triplet_search with each collection scanned through the ANN index."""
+    from cognee.infrastructure.databases.vector import get_vector_engine
+
+    vector_engine = get_vector_engine()
+    query_vector = np.asarray((await vector_engine.embedding_engine.embed_text([query]))[0], dtype=np.float32)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(ann.search_with_range, c, query_vector, candidates, nprobe) for c in collections)
+    )
+    node_distances = {c: _scored(r, high) for c, (r, high) in zip(collections, results)}
+    await memory_fragment.map_vector_distances_to_graph_nodes(node_distances=node_distances)
+    await memory_fragment.map_vector_distances_to_graph_edges(
+        vector_engine=vector_engine,
+        query_vector=query_vector.tolist(),
+        edge_distances=node_distances.get("EdgeType_relationship_name"),
+    )
+    return await memory_fragment.calculate_top_triplet_importances(k=top_k)
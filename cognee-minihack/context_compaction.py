@@ -0,0 +1,233 @@
+"""Token-budgeted compaction of the retrieved graph context.
+
+resolve_edges_to_text renders every retrieved triplet: each node's description
+and one line per edge. Hub nodes ("Vendor 2", "Quantity 4") and parallel edges
+make that context long and repetitive, which the SLM pays for in prefill time.
+`compact_context` renders the same Nodes/Connections layout but
+
+- keeps each node once, and a description shared by several nodes only once
+  (duplicate entities are dropped, other nodes get a "same as" reference);
+- collapses parallel edges between two nodes into one line
+  (`A --[issued_by, billed_by]--> B`);
+- adds triplets in rank order (the retriever's relevance order, then any
+  expanded connections) until CONTEXT_TOKEN_BUDGET tokens, counted with the
+  HUGGINGFACE_TOKENIZER tokenizer, are used; a triplet whose node content does
+  not fit (e.g. a long document chunk) is kept with its content cut to the
+  remaining budget rather than dropped in favour of lower-ranked ones.
+
+Kept free of cognee imports: triplets only need node1/node2 with `id` and
+`attributes`, and `attributes["relationship_type"]` on the edge.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "2000"))
+
+TokenCounter = Callable[[Sequence[str]], List[int]]
+
+_PRETOKEN = re.compile(r"""'(?:s|t|re|ve|m|ll|d)| ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+(?!\S)|\s+""")
+
+
+def _approx_counts(texts: Sequence[str]) -> List[int]:
+    """GPT-2-style pre-tokenization; long words count one extra token per 6 letters."""
+    return [sum(1 + max(len(p.strip()) - 1, 0) // 6 for p in _PRETOKEN.findall(t)) for t in texts]
+
+
+@lru_cache(maxsize=None)
+def token_counter(name: Optional[str] = None) -> TokenCounter:
+    """Batch token counter for the HUGGINGFACE_TOKENIZER tokenizer (approximate without transformers)."""
+    name = name or os.environ.get("HUGGINGFACE_TOKENIZER", "nomic-ai/nomic-embed-text-v1.5")
+    try:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(name)
+    except Exception as exc:
+        logger.info("Tokenizer %s unavailable (%s); counting tokens approximately", name, exc)
+        return _approx_counts
+
+    def count(texts: Sequence[str]) -> List[int]:
+        if not texts:
+            return []
+        return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)["input_ids"]]
+
+    return count
+
+
+@dataclass
+class CompactedContext:
+    text: str
+    tokens_in: int
+    tokens_kept: int
+    edges_in: int
+    edges_kept: int
+
+
+NodeEntry = Callable[[Any], Tuple[str, str]]
+
+
+def node_fragment(attributes: Dict[str, Any]) -> Tuple[str, str]:
+    """(name, content) as resolve_edges_to_text shows a node: chunk text, else the description."""
+    text = attributes.get("text")
+    if text:
+        return " ".join(str(text).split()[:3]) + "...", str(text)
+    name = str(attributes.get("name", "Unnamed Node"))
+    return name, str(attributes.get("description", name))
+
+
+def _node_entry(node) -> Tuple[str, str]:
+    return node_fragment(node.attributes)
+
+
+def node_block(name: str, content: str) -> str:
+    return f"Node: {name}\n__node_content_start__\n{content}\n__node_content_end__\n"
+
+
+TRUNCATION_MARK = " [...]"
+
+
+def _cut_block(name: str, content: str, tokens: int, count: TokenCounter) -> Optional[str]:
+    """node_block with `content` cut to the longest word prefix whose block (and newline)
+    takes at most `tokens`; None if not even one word fits."""
+    words = content.split()
+
+    def block(n: int) -> str:
+        return node_block(name, " ".join(words[:n]) + (TRUNCATION_MARK if n < len(words) else ""))
+
+    low, high = 0, len(words)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count([block(middle) + "\n"])[0] <= tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return block(low) if low > 0 else None
+
+
+def _fit_blocks(pieces: List[Tuple[str, str]], line: str, room: int, count: TokenCounter) -> Optional[List[str]]:
+    """Node blocks for `pieces` and `line` within `room` tokens, cutting content as needed.
+
+    The smallest blocks are placed first and each block gets at most an equal share
+    of what is left, so one long chunk does not crowd out the other node. None when
+    even the shortened blocks do not fit.
+    """
+    room -= count([line + "\n"])[0]
+    costs = [count([node_block(*piece) + "\n"])[0] for piece in pieces]
+    fitted: List[Optional[str]] = [None] * len(pieces)
+    for position, i in enumerate(sorted(range(len(pieces)), key=costs.__getitem__)):
+        share = room // (len(pieces) - position)
+        block = node_block(*pieces[i]) if costs[i] <= share else _cut_block(*pieces[i], share, count)
+        if block is None:
+            return None
+        fitted[i] = block
+        room -= count([block + "\n"])[0]
+    return fitted
+
+
+def _render(node_blocks: List[str], connections: List[str]) -> str:
+    return "Nodes:\n" + "\n".join(node_blocks) + "\n\nConnections:\n" + "\n".join(connections)
+
+
+def compact_context(
+    triplets: Sequence[Any],
+    extra_connections: Sequence[str] = (),
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    count: Optional[TokenCounter] = None,
+    entry: NodeEntry = _node_entry,
+) -> CompactedContext:
+    """Deduplicated, budgeted Nodes/Connections context for ranked `triplets`.
+
+    `extra_connections` (pre-rendered lines, e.g. graph_projection expansions) are
+    added after all triplets, while budget remains. `entry` and `count` default to
+    rendering and tokenizing on the fly; fragment_store supplies precomputed ones.
+    Token figures are sums over the rendered pieces (blocks and lines).
+    """
+    count = count or token_counter()
+
+    # Group triplets by node pair in rank order, so parallel edges become one line.
+    pairs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for triplet in triplets:
+        key = (str(triplet.node1.id), str(triplet.node2.id))
+        group = pairs.setdefault(key, {"triplet": triplet, "relations": []})
+        relation = str(triplet.attributes.get("relationship_type", "related_to"))
+        if relation not in group["relations"]:
+            group["relations"].append(relation)
+
+    # The uncompacted rendering (as resolve_edges_to_text), for the tokens-in figure.
+    naive_nodes: Dict[str, str] = {}
+    naive_lines = []
+    for triplet in triplets:
+        for node in (triplet.node1, triplet.node2):
+            naive_nodes.setdefault(str(node.id), node_block(*entry(node)))
+        naive_lines.append(
+            f"{entry(triplet.node1)[0]} --[{triplet.attributes.get('relationship_type', 'related_to')}]--> "
+            f"{entry(triplet.node2)[0]}"
+        )
+
+    used = count([_render([], [])])[0]
+
+    # Add pairs in rank order; a pair that does not fit whole is kept with its node
+    # content cut to the remaining budget, and otherwise a later, cheaper pair may still fit.
+    # Node blocks and shared descriptions are deduplicated against what was kept so far.
+    node_blocks: List[str] = []
+    connections: List[str] = []
+    kept_names: Dict[str, str] = {}
+    kept_content: Dict[str, str] = {}
+    edges_kept = 0
+    for group in pairs.values():
+        triplet = group["triplet"]
+        names: List[str] = []
+        pieces: List[Tuple[str, str]] = []
+        new_names: Dict[str, str] = {}
+        new_content: Dict[str, str] = {}
+        for node in (triplet.node1, triplet.node2):
+            name, content = entry(node)
+            names.append(name)
+            node_id = str(node.id)
+            if node_id in kept_names or node_id in new_names:
+                continue
+            new_names[node_id] = name
+            shared = kept_content.get(content) or new_content.get(content)
+            if shared == name:
+                continue  # a duplicate entity (same name and content): its block is already there
+            if shared and len(f"(same as {shared})") < len(content):
+                content = f"(same as {shared})"
+            else:
+                new_content.setdefault(content, name)
+            pieces.append((name, content))
+        line = f"{names[0]} --[{', '.join(group['relations'])}]--> {names[1]}"
+        blocks = [node_block(name, content) for name, content in pieces]
+        # Pieces are counted with the newline that joins them in the rendered text.
+        cost = sum(count([piece + "\n" for piece in blocks + [line]]))
+        if used + cost > budget:
+            # Keep the pair with its node content cut to the remaining budget.
+            blocks = _fit_blocks(pieces, line, budget - used, count) if pieces else None
+            if blocks is None:
+                continue
+            cost = sum(count([piece + "\n" for piece in blocks + [line]]))
+        used += cost
+        kept_names.update(new_names)
+        for content, name in new_content.items():
+            kept_content.setdefault(content, name)
+        node_blocks.extend(blocks)
+        connections.append(line)
+        edges_kept += len(group["relations"])
+
+    for line in dict.fromkeys(extra_connections):
+        cost = count([line + "\n"])[0]
+        if used + cost <= budget:
+            used += cost
+            connections.append(line)
+            edges_kept += 1
+
+    text = _render(node_blocks, connections)
+    naive_pieces = list(naive_nodes.values()) + naive_lines + list(extra_connections)
+    tokens_in = count([_render([], [])])[0] + sum(count([piece + "\n" for piece in naive_pieces]))
+    edges_in = len(triplets) + len(extra_connections)
+    return CompactedContext(text, tokens_in, used, edges_in, edges_kept)
@@ -1,8 +1,21 @@
-from typing import Optional, Type, Any
-import os
-from openai import AsyncOpenAI
+from typing import AsyncIterator, Optional, Type, Any
 import logging
-from cognee.infrastructure.llm.prompts import read_query_prompt
+from llm_client import get_llm_client, get_llm_config
+from prompt_templates import build_messages, system_prompt_text
+
+
+def _messages(
+    user_prompt: str,
+    system_prompt_path: str,
+    system_prompt: Optional[str] = None,
+    conversation_history: Optional[str] = None,
+) -> list:
+    system_prompt = system_prompt if system_prompt else system_prompt_text(system_prompt_path)
+    return build_messages(user_prompt, system_prompt, conversation_history)
+
+
+def _format_kwargs(response_format: Optional[dict]) -> dict:
+    return {"response_format": response_format} if response_format else {}
 
 
 async def generate_structured_completion_with_user_prompt(
@@ -11,45 +24,66 @@ async def generate_structured_completion_with_user_prompt(
     system_prompt: Optional[str] = None,
     conversation_history: Optional[str] = None,
     response_model: Type = str,
+    response_format: Optional[dict] = None,
 ) -> Any:
-    """Generates a structured completion using LLM with given context and prompts."""
-    system_prompt = system_prompt if system_prompt else read_query_prompt(system_prompt_path)
+    """Generates a structured completion using LLM with given context and prompts.
 
-    if conversation_history:
-        #:TODO: I would separate the history and put it into the system prompt but we have to test what works best with longer convos
-        system_prompt = conversation_history + "\nTASK:" + system_prompt
+    `response_format` (an OpenAI-style json_schema format, see core.schemas) constrains
+    decoding on the Ollama/OpenAI-compatible endpoint to documents of that schema.
+    """
+    messages = _messages(user_prompt, system_prompt_path, system_prompt, conversation_history)
 
-    # Bypass structured-output enforcement and call Ollama/OpenAI-compatible endpoint directly.
-    client = AsyncOpenAI(
-        base_url=os.environ.get("LLM_ENDPOINT", "http://localhost:11434/v1"),
-        api_key=os.environ.get("LLM_API_KEY", "ollama"),
-    )
-    model_name = os.environ.get("LLM_MODEL", "cognee-distillabs-model-gguf-quantized")
+    # Bypass structured-output enforcement and call Ollama/OpenAI-compatible endpoint directly,
+    # reusing the pooled client (and its keep-alive connections) bound to this event loop.
+    client = get_llm_client()
+    model_name = get_llm_config().model
 
     logging.getLogger(__name__).debug(
         "generate_structured_completion_with_user_prompt model=%s endpoint=%s user_prompt_len=%d system_prompt_len=%d",
         model_name,
         client.base_url,
         len(user_prompt or ""),
-        len(system_prompt or ""),
+        len(messages[0]["content"] or ""),
     )
 
-    resp = await client.chat.completions.create(
-        model=model_name,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
+    resp = await client.chat.completions.create(model=model_name, messages=messages, **_format_kwargs(response_format))
 
     return resp.choices[0].message.content if resp.choices else ""
 
 
+async def stream_completion_with_user_prompt(
+    user_prompt: str,
+    system_prompt_path: str,
+    system_prompt: Optional[str] = None,
+    conversation_history: Optional[str] = None,
+    response_format: Optional[dict] = None,
+) -> AsyncIterator[str]:
+    """Same request as generate_completion_with_user_prompt, yielding content deltas as they arrive."""
+    messages = _messages(user_prompt, system_prompt_path, system_prompt, conversation_history)
+    client = get_llm_client()
+    model_name = get_llm_config().model
+
+    logging.getLogger(__name__).debug(
+        "stream_completion_with_user_prompt model=%s endpoint=%s user_prompt_len=%d",
+        model_name,
+        client.base_url,
+        len(user_prompt or ""),
+    )
+
+    stream = await client.chat.completions.create(
+        model=model_name, messages=messages, stream=True, **_format_kwargs(response_format)
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
 async def generate_completion_with_user_prompt(
     user_prompt: str,
     system_prompt_path: str,
     system_prompt: Optional[str] = None,
     conversation_history: Optional[str] = None,
+    response_format: Optional[dict] = None,
 ) -> str:
     """Generates a completion using LLM with given context and prompts."""
     return await generate_structured_completion_with_user_prompt(
@@ -58,4 +92,5 @@ async def generate_completion_with_user_prompt(
         system_prompt=system_prompt,
         conversation_history=conversation_history,
         response_model=str,
+        response_format=response_format,
     )
@@ -1,16 +1,16 @@
 import asyncio
-import pathlib
+import json
 import os
-from typing import Optional, Type, List
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional, Type, List, Sequence
 from uuid import NAMESPACE_OID, uuid5
 
-from cognee.infrastructure.engine import DataPoint
 from cognee.modules.graph.cognee_graph.CogneeGraphElements import Edge
 from cognee.modules.retrieval.graph_completion_retriever import GraphCompletionRetriever
 from cognee.tasks.storage import add_data_points
 from cognee.modules.graph.utils import resolve_edges_to_text
-from cognee.modules.graph.utils.convert_node_to_data_point import get_all_subclasses
-from cognee.modules.retrieval.utils.brute_force_triplet_search import brute_force_triplet_search
+from cognee.modules.retrieval.utils.brute_force_triplet_search import brute_force_triplet_search, get_memory_fragment
 from cognee.modules.retrieval.utils.completion import summarize_text
 from cognee.modules.retrieval.utils.session_cache import (
     save_conversation_history,
@@ -23,11 +23,36 @@ from cognee.modules.engine.models.node_set import NodeSet
 from cognee.infrastructure.databases.graph import get_graph_engine
 from cognee.context_global_variables import session_user
 from cognee.infrastructure.databases.cache.config import CacheConfig
-from custom_generate_completion import generate_completion_with_user_prompt
-from cognee.infrastructure.llm.prompts.render_prompt import render_prompt
+from ann_index import ANN_ENABLED, AnnIndex, ann_triplet_search, get_ann_index, vector_collections
+from context_compaction import CONTEXT_TOKEN_BUDGET, compact_context
+from fragment_store import FRAGMENT_STORE_ENABLED, get_fragment_store
+from custom_generate_completion import generate_completion_with_user_prompt, stream_completion_with_user_prompt
+from graph_projection import DEFAULT_HOPS, MAX_EXPANSION_EDGES, PROJECTION_ENABLED, get_projection
+from graph_version import get_graph_version
+from prompt_templates import render_user_prompt
+from query_routing import ROUTING_ENABLED, RoutingMetrics, vendor_scope
+from semantic_cache import SemanticCache
 
 logger = get_logger("GraphCompletionRetrieverWithUserPrompt")
 
+
+def default_max_concurrency() -> int:
+    """Concurrency matching the number of requests Ollama serves in parallel per model."""
+    return max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", "4")))
+
+
+@dataclass
+class QueryResult:
+    """Outcome of one query in a batch: the answer or the error, plus wall-clock timing."""
+    query: str
+    answer: Optional[str]
+    error: Optional[str]
+    elapsed_s: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
 class GraphCompletionRetrieverWithUserPrompt(GraphCompletionRetriever):
     """
     Retriever for handling graph-based completion searches, with a given filename
@@ -46,8 +71,32 @@ class GraphCompletionRetrieverWithUserPrompt(GraphCompletionRetriever):
         node_type: Optional[Type] = None,
         node_name: Optional[List[str]] = None,
         save_interaction: bool = False,
+        semantic_cache: Optional[SemanticCache] = None,
+        routing: bool = ROUTING_ENABLED,
+        routing_metrics: Optional[RoutingMetrics] = None,
+        expand_hops: Optional[Sequence[Sequence[str]]] = DEFAULT_HOPS if PROJECTION_ENABLED else None,
+        use_ann: bool = ANN_ENABLED,
+        context_token_budget: Optional[int] = CONTEXT_TOKEN_BUDGET,
+        use_fragment_store: bool = FRAGMENT_STORE_ENABLED,
     ):
-        """Initialize retriever with prompt paths and search parameters."""
+        """Initialize retriever with prompt paths and search parameters.
+
+        With `routing`, queries naming vendors or their invoice/transaction IDs are
+        searched in those vendors' NodeSet subgraphs only (see query_routing); an explicit
+        `node_name` disables routing.
+
+        With `expand_hops`, the documents in the retrieved triplets are expanded along
+        those relations (one tuple per hop) on the in-memory graph projection, and the
+        reached edges are added to the context (see graph_projection); None disables it.
+
+        With `use_ann`, triplet search scans the persisted IVF index (see ann_index)
+        instead of every embedding, when an index covering all collections exists.
+
+        With `context_token_budget`, the context is deduplicated and cut to that many
+        tokens before rendering (see context_compaction); None or 0 renders it whole.
+        With `use_fragment_store`, node text and token counts come from the
+        precomputed fragment store (see fragment_store) instead of being recomputed.
+        """
         super().__init__(
             save_interaction = save_interaction,
             system_prompt_path = system_prompt_path,
@@ -57,12 +106,133 @@ class GraphCompletionRetrieverWithUserPrompt(GraphCompletionRetriever):
             node_name = node_name,
         )
         self.user_prompt_filename = user_prompt_filename
+        self.semantic_cache = semantic_cache
+        self.routing = routing
+        self.routing_metrics = routing_metrics if routing_metrics is not None else RoutingMetrics()
+        self.expand_hops = expand_hops
+        self.use_ann = use_ann
+        self.context_token_budget = context_token_budget or None
+        self.use_fragment_store = use_fragment_store
+        self._collections: Optional[List[str]] = None
+        if use_ann:
+            # Load (or pick up) the persisted index now rather than on the first query.
+            get_ann_index()
+
+    @staticmethod
+    def _session_save() -> bool:
+        """Whether answers go to the user's session history, in which case the semantic cache is skipped."""
+        user = session_user.get()
+        return bool(getattr(user, "id", None) and CacheConfig().caching)
+
+    def _semantic_namespace(self, response_format: Optional[dict] = None) -> str:
+        parts = [
+            self.user_prompt_filename, str(self.system_prompt_path), str(self.top_k),
+            str(self.expand_hops), str(self.context_token_budget), get_graph_version(),
+        ]
+        if response_format:
+            # A schema-constrained answer is only reusable for the same schema.
+            parts.append(json.dumps(response_format, sort_keys=True))
+        return "|".join(parts)
+
+    def _vector_collections(self) -> Optional[List[str]]:
+        """Vector collections of every indexed DataPoint field (as GraphCompletionRetriever builds them)."""
+        if self._collections is None:
+            self._collections = vector_collections()
+        return self._collections or None
+
+    def _ann_index(self) -> Optional[AnnIndex]:
+        """The persisted ANN index when enabled and covering every collection searched."""
+        if not self.use_ann:
+            return None
+        ann = get_ann_index()
+        collections = self._vector_collections()
+        return ann if ann is not None and collections and ann.covers(collections) else None
+
+    async def _search(self, query: str, node_type: Optional[Type], node_name: Optional[List[str]]):
+        """Project the (sub)graph, then run the triplet search on it; returns triplets, fragment and timings."""
+        start = time.perf_counter()
+        fragment = await get_memory_fragment(node_type=node_type, node_name=node_name)
+        projected = time.perf_counter()
+        ann = self._ann_index()
+        if ann is not None:
+            triplets = await ann_triplet_search(query, ann, self.top_k, self._vector_collections(), fragment)
+        else:
+            triplets = await brute_force_triplet_search(
+                query, top_k=self.top_k, collections=self._vector_collections(), memory_fragment=fragment
+            )
+        return triplets, fragment, projected - start, time.perf_counter() - projected
+
+    async def get_triplets(self, query: str) -> List[Edge]:
+        """Triplets for `query`, searched in the mentioned vendors' subgraph when routing applies.
+
+        Falls back to the global search when no vendor is detected or the scoped subgraph is
+        empty (e.g. a graph built before records were added under vendor node sets).
+        """
+        scope = vendor_scope(query) if self.routing and not self.node_name else None
+        mode, wasted_s = "global", 0.0
+        if scope:
+            try:
+                triplets, fragment, project_s, search_s = await self._search(query, NodeSet, scope)
+            except Exception as exc:
+                logger.debug(f"Scoped search for {scope} failed, using global search: {exc}")
+                fragment, project_s, search_s = None, 0.0, 0.0
+            if fragment is not None and fragment.nodes:
+                self.routing_metrics.record("scoped", len(fragment.nodes), len(fragment.edges), project_s, search_s)
+                return triplets
+            mode, wasted_s = "fallback", project_s + search_s
+
+        triplets, fragment, project_s, search_s = await self._search(query, self.node_type, self.node_name)
+        self.routing_metrics.record(mode, len(fragment.nodes), len(fragment.edges), project_s + wasted_s, search_s)
+        return triplets
+
+    async def _expansion_lines(self, triplets: List[Edge]) -> List[str]:
+        """Edges reached from the triplets' nodes via `expand_hops`, minus those already in context."""
+        if not self.expand_hops or not triplets:
+            return []
+        try:
+            projection = await get_projection()
+        except Exception as exc:
+            logger.debug(f"Graph projection unavailable, skipping expansion: {exc}")
+            return []
+        present = {(str(t.node1.id), str(t.node2.id)) for t in triplets}
+        seeds = {node_id for pair in present for node_id in pair}
+        triples = [
+            (s, r, d)
+            for s, r, d in projection.expand(seeds, self.expand_hops)
+            if (projection.node_ids[s], projection.node_ids[d]) not in present
+        ][:MAX_EXPANSION_EDGES]
+        return projection.to_text(triples).splitlines()
+
+    def _compact(self, triplets: List[Edge], expansion: List[str]):
+        store = get_fragment_store() if self.use_fragment_store else None
+        if store is None:
+            return compact_context(triplets, expansion, self.context_token_budget)
+        compacted = compact_context(triplets, expansion, self.context_token_budget, count=store.count, entry=store.entry)
+        store.flush()
+        return compacted
+
+    async def _context_text(self, triplets: List[Edge]) -> str:
+        expansion = await self._expansion_lines(triplets)
+        if self.context_token_budget is None:
+            context_text = await resolve_edges_to_text(triplets)
+            return context_text + "\nExpanded connections:\n" + "\n".join(expansion) if expansion else context_text
+        compacted = await asyncio.to_thread(self._compact, triplets, expansion)
+        logger.info(
+            f"Context compaction: {compacted.tokens_in} tokens in, {compacted.tokens_kept} kept "
+            f"({compacted.edges_kept}/{compacted.edges_in} edges, budget {self.context_token_budget})"
+        )
+        return compacted.text
+
+    def _render_user_prompt(self, query: str, context_text: str) -> str:
+        return render_user_prompt(self.user_prompt_filename, query, context_text)
 
     async def get_completion(
         self,
         query: str,
         context: Optional[List[Edge]] = None,
         session_id: Optional[str] = None,
+        response_format: Optional[dict] = None,
+        use_cache: bool = True,
     ) -> List[str]:
         """
         Generates a completion using graph connections context based on a query.
@@ -75,30 +245,34 @@ class GraphCompletionRetrieverWithUserPrompt(GraphCompletionRetriever):
               not provided, context is retrieved based on the query. (default None)
             - session_id (Optional[str]): Optional session identifier for caching. If None,
               defaults to 'default_session'. (default None)
+            - response_format (Optional[dict]): json_schema constraint for the answer
+              (see core.schemas); None leaves the output free-form. (default None)
+            - use_cache (bool): False skips the semantic cache lookup (a forced refresh);
+              the fresh answer is still stored. (default True)
+
+        When a semantic cache is configured, a near-duplicate of a previously answered query
+        (no explicit context, no session history) reuses that answer and skips retrieval.
 
         Returns:
         --------
 
             - Any: A generated completion based on the query and context provided.
         """
+        session_save = self._session_save()
+
+        use_semantic_cache = self.semantic_cache is not None and context is None and not session_save
+        if use_semantic_cache and use_cache:
+            cached = await self.semantic_cache.lookup(query, namespace=self._semantic_namespace(response_format))
+            if cached is not None:
+                return [cached]
+
         triplets = context
 
         if triplets is None:
             triplets = await self.get_context(query)
 
-        context_text = await resolve_edges_to_text(triplets)
-
-        cache_config = CacheConfig()
-        user = session_user.get()
-        user_id = getattr(user, "id", None)
-        session_save = user_id and cache_config.caching
-
-        user_prompt = render_prompt(
-            filename=self.user_prompt_filename,
-            context={"question": query, "context": context_text},
-            base_directory=str(pathlib.Path(
-            os.path.join(pathlib.Path(__file__).parent, "prompts")).resolve())
-        )
+        context_text = await self._context_text(triplets)
+        user_prompt = self._render_user_prompt(query, context_text)
 
         if session_save:
             conversation_history = await get_conversation_history(session_id=session_id)
@@ -110,6 +284,7 @@ class GraphCompletionRetrieverWithUserPrompt(GraphCompletionRetriever):
                     system_prompt_path=self.system_prompt_path,
                     system_prompt=self.system_prompt,
                     conversation_history=conversation_history,
+                    response_format=response_format,
                 ),
             )
         else:
@@ -117,6 +292,7 @@ class GraphCompletionRetrieverWithUserPrompt(GraphCompletionRetriever):
                 user_prompt=user_prompt,
                 system_prompt_path=self.system_prompt_path,
                 system_prompt=self.system_prompt,
+                response_format=response_format,
             )
 
         if self.save_interaction and context and triplets and completion:
@@ -124,6 +300,9 @@ class GraphCompletionRetrieverWithUserPrompt(GraphCompletionRetriever):
                 question=query, answer=completion, context=context_text, triplets=triplets
             )
 
+        if use_semantic_cache and completion:
+            await self.semantic_cache.store(query, completion, namespace=self._semantic_namespace(response_format))
+
         if session_save:
             await save_conversation_history(
                 query=query,
@@ -133,3 +312,86 @@ class GraphCompletionRetrieverWithUserPrompt(GraphCompletionRetriever):
             )
 
         return [completion]
+
+    async def stream_completion(
+        self,
+        query: str,
+        context: Optional[List[Edge]] = None,
+        response_format: Optional[dict] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Streams the completion for a query as content deltas, as get_completion would answer it.
+
+        Parameters:
+        -----------
+
+            - query (str): The query string for which a completion is generated.
+            - context (Optional[Any]): Optional context to use instead of retrieving it.
+            - response_format (Optional[dict]): json_schema constraint, as in get_completion.
+            - use_cache (bool): False skips the semantic cache lookup, as in get_completion.
+
+        A semantic cache hit is yielded as a single chunk; a fresh answer is stored in the
+        cache once the stream completes. Session history is not read or saved in this mode,
+        but as in get_completion the semantic cache is bypassed when a session is active.
+        """
+        use_semantic_cache = self.semantic_cache is not None and context is None and not self._session_save()
+        if use_semantic_cache and use_cache:
+            cached = await self.semantic_cache.lookup(query, namespace=self._semantic_namespace(response_format))
+            if cached is not None:
+                yield cached
+                return
+
+        triplets = context if context is not None else await self.get_context(query)
+        user_prompt = self._render_user_prompt(query, await self._context_text(triplets))
+
+        parts: List[str] = []
+        async for delta in stream_completion_with_user_prompt(
+            user_prompt=user_prompt,
+            system_prompt_path=self.system_prompt_path,
+            system_prompt=self.system_prompt,
+            response_format=response_format,
+        ):
+            parts.append(delta)
+            yield delta
+
+        if use_semantic_cache and parts:
+            await self.semantic_cache.store(query, "".join(parts), namespace=self._semantic_namespace(response_format))
+
+    async def complete_many(
+        self,
+        queries: Sequence[str],
+        max_concurrency: Optional[int] = None,
+        session_id: Optional[str] = None,
+    ) -> List[QueryResult]:
+        """
+        Answers many queries concurrently, returning one QueryResult per query in input order.
+
+        Parameters:
+        -----------
+
+            - queries (Sequence[str]): The questions to answer.
+            - max_concurrency (Optional[int]): Upper bound on queries in flight (retrieval plus
+              completion). Defaults to OLLAMA_NUM_PARALLEL, or 4 when it is unset.
+            - session_id (Optional[str]): Session identifier forwarded to get_completion.
+
+        Returns:
+        --------
+
+            - List[QueryResult]: Answers or errors with per-query timing; a failing query does
+              not cancel the others.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or default_max_concurrency())
+
+        async def _answer(query: str) -> QueryResult:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    completion = await self.get_completion(query=query, session_id=session_id)
+                    answer = completion[0] if completion else ""
+                    return QueryResult(query, answer, None, time.perf_counter() - start)
+                except Exception as exc:
+                    logger.warning(f"complete_many: query failed ({type(exc).__name__}): {exc}")
+                    return QueryResult(query, None, f"{type(exc).__name__}: {exc}", time.perf_counter() - start)
+
+        return list(await asyncio.gather(*(_answer(query) for query in queries)))
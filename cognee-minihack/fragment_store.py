@@ -0,0 +1,238 @@
+"""Persistent store of pre-rendered context fragments.
+
+Every query used to re-render the same invoice, line-item and product nodes
+and re-tokenize them for the context budget. `FragmentStore` keeps, per node
+ID, the rendered (name, content) pair and a hash of the attributes it was
+rendered from, and the token count of every rendered node block and
+`source --[relation]--> target` line. context_compaction then assembles the
+context by lookup and concatenation and only tokenizes pieces it has not seen.
+A retrieved node whose attributes no longer match the stored hash is rendered
+afresh, so a store that missed a graph update never serves stale text.
+
+`update_fragment_store` fills the store from the graph after an import or a
+cognify run; only nodes whose attributes changed (and the edge lines touching
+them) are re-rendered and re-counted, and nodes no longer in the graph are
+dropped. Once FRAGMENT_TOKENS_MAX token counts are stored, the sync
+also drops the counts of pieces the current graph no longer renders, and query
+processes stop remembering new ones. Query processes reload the store when the
+graph version changes.
+Like core.response_cache, it is an in-memory map in front of a SQLite file.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from context_compaction import TokenCounter, node_block, node_fragment, token_counter
+from graph_version import get_graph_version
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_STORE_ENABLED = os.environ.get("FRAGMENT_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+_DEFAULT_PATH = Path(__file__).resolve().parent.parent / ".cache" / "graph_fragments.sqlite"
+FRAGMENT_TOKENS_MAX = int(os.environ.get("FRAGMENT_TOKENS_MAX", "200000"))
+
+
+def _hash(*parts: str) -> str:
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _source_hash(attributes: Dict[str, Any]) -> str:
+    """Hash of the attributes node_fragment renders from (chunk text, name, description)."""
+    return _hash(*(str(attributes.get(key, "")) for key in ("text", "name", "description")))
+
+
+class FragmentStore:
+    """Node fragments and token counts of rendered pieces, in memory and in SQLite."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = _DEFAULT_PATH,
+        count: Optional[TokenCounter] = None,
+        max_tokens: int = FRAGMENT_TOKENS_MAX,
+    ):
+        self.path = Path(path) if path else None
+        self._count = count
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, Tuple[str, str, str]] = {}  # id -> (attributes hash, name, content)
+        self._tokens: Dict[str, int] = {}  # text hash -> tokens
+        self._pending_tokens: Dict[str, int] = {}
+        self._stats = {"node_hits": 0, "node_misses": 0, "token_hits": 0, "token_misses": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.path is not None:
+            self._open()
+
+    def _open(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS nodes (id TEXT PRIMARY KEY, hash TEXT NOT NULL, name TEXT NOT NULL, content TEXT NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS tokens (hash TEXT PRIMARY KEY, tokens INTEGER NOT NULL)")
+            self._conn.commit()
+            self._nodes = {row[0]: (row[1], row[2], row[3]) for row in self._conn.execute("SELECT id, hash, name, content FROM nodes")}
+            self._tokens = dict(self._conn.execute("SELECT hash, tokens FROM tokens"))
+        except sqlite3.Error as exc:
+            logger.warning("Fragment store disk tier disabled (%s): %s", self.path, exc)
+            self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def counter(self) -> TokenCounter:
+        if self._count is None:
+            self._count = token_counter()
+        return self._count
+
+    def entry(self, node) -> Tuple[str, str]:
+        """(name, content) of a retrieved node; rendered and remembered if not stored or stale."""
+        node_id = str(node.id)
+        source = _source_hash(node.attributes)
+        stored = self._nodes.get(node_id)
+        if stored is not None and stored[0] == source:
+            self._stats["node_hits"] += 1
+            return stored[1], stored[2]
+        self._stats["node_misses"] += 1
+        name, content = node_fragment(node.attributes)
+        with self._lock:
+            self._nodes[node_id] = (source, name, content)
+        return name, content
+
+    def count(self, texts: Sequence[str], keep: bool = False) -> List[int]:
+        """Token counts, tokenizing only texts not counted before.
+
+        New counts are remembered while fewer than `max_tokens` are stored, or always with `keep`.
+        """
+        keys = [_hash(text) for text in texts]
+        missing = {key: text for key, text in zip(keys, texts) if key not in self._tokens}
+        self._stats["token_hits"] += len(keys) - len(missing)
+        self._stats["token_misses"] += len(missing)
+        if not missing:
+            return [self._tokens[key] for key in keys]
+        counted = dict(zip(missing, self.counter(list(missing.values()))))
+        with self._lock:
+            room = len(counted) if keep else max(self.max_tokens - len(self._tokens), 0)
+            kept = dict(list(counted.items())[:room])
+            self._tokens.update(kept)
+            self._pending_tokens.update(kept)
+        return [self._tokens.get(key, counted.get(key)) for key in keys]
+
+    def flush(self) -> None:
+        """Persist token counts learned while answering queries."""
+        with self._lock:
+            pending, self._pending_tokens = self._pending_tokens, {}
+            if not pending or self._conn is None:
+                return
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO tokens (hash, tokens) VALUES (?, ?)", pending.items())
+                self._conn.commit()
+            except sqlite3.Error as exc:
+                logger.debug("Fragment store write failed: %s", exc)
+
+    def sync(self, nodes: Iterable[Tuple[Any, Dict[str, Any]]], edges: Iterable[Tuple[Any, Any, str, Any]]) -> Dict[str, int]:
+        """Make the store match the graph (get_graph_data() shape); returns change counts."""
+        current: Dict[str, Tuple[str, str, str]] = {}
+        for node_id, attributes in nodes:
+            attributes = attributes or {}
+            current[str(node_id)] = (_source_hash(attributes), *node_fragment(attributes))
+        changed = {i: v for i, v in current.items() if self._nodes.get(i, ("",))[0] != v[0]}
+        removed = [i for i in self._nodes if i not in current]
+        edges = [(str(s), str(t), relation) for s, t, relation, *_ in edges]
+        pruned = self._prune_tokens(current, edges) if len(self._tokens) >= self.max_tokens else 0
+
+        # Pre-count what the compaction will ask for: changed node blocks and the
+        # single-relation lines of edges touching a changed node.
+        lines = {
+            f"{current[s][1]} --[{relation}]--> {current[t][1]}\n"
+            for s, t, relation in edges
+            if s in current and t in current and (s in changed or t in changed)
+        }
+        self.count([node_block(name, content) + "\n" for _, name, content in changed.values()], keep=True)
+        self.count(sorted(lines), keep=True)
+
+        with self._lock:
+            for node_id in removed:
+                del self._nodes[node_id]
+            self._nodes.update(changed)
+            if self._conn is not None:
+                try:
+                    self._conn.executemany("DELETE FROM nodes WHERE id = ?", ((i,) for i in removed))
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO nodes (id, hash, name, content) VALUES (?, ?, ?, ?)",
+                        ((i, h, n, c) for i, (h, n, c) in changed.items()),
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as exc:
+                    logger.warning("Fragment store sync write failed: %s", exc)
+        self.flush()
+        return {"nodes": len(current), "changed": len(changed), "removed": len(removed),
+                "lines_counted": len(lines), "tokens_pruned": pruned}
+
+    def _prune_tokens(self, nodes: Dict[str, Tuple[str, str, str]], edges: List[Tuple[str, str, str]]) -> int:
+        """Keep only the counts of the graph's node blocks and single-relation lines; returns how many were dropped."""
+        live = {_hash(node_block(name, content) + "\n") for _, name, content in nodes.values()}
+        live.update(
+            _hash(f"{nodes[s][1]} --[{relation}]--> {nodes[t][1]}\n") for s, t, relation in edges if s in nodes and t in nodes
+        )
+        with self._lock:
+            stale = [key for key in self._tokens if key not in live]
+            for key in stale:
+                del self._tokens[key]
+                self._pending_tokens.pop(key, None)
+            if self._conn is not None:
+                try:
+                    self._conn.executemany("DELETE FROM tokens WHERE hash = ?", ((key,) for key in stale))
+                    self._conn.commit()
+                except sqlite3.Error as exc:
+                    logger.warning("Fragment store prune failed: %s", exc)
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats.update(nodes=len(self._nodes), token_counts=len(self._tokens))
+        stats["path"] = str(self.path) if self._conn is not None else None
+        return stats
+
+
+_store: Optional[FragmentStore] = None
+_store_version: Optional[str] = None
+_store_lock = threading.Lock()
+
+
+def get_fragment_store() -> Optional[FragmentStore]:
+    """The process-wide store configured from env (re-read when the graph version changes), or None."""
+    global _store, _store_version
+    if not FRAGMENT_STORE_ENABLED:
+        return None
+    version = get_graph_version()
+    with _store_lock:
+        if _store is None or _store_version != version:
+            if _store is not None:
+                _store.flush()
+            _store = FragmentStore(Path(os.environ.get("FRAGMENT_STORE_PATH", str(_DEFAULT_PATH))))
+            _store_version = version
+        return _store
+
+
+async def update_fragment_store() -> Dict[str, int]:
+    """Sync the store with the current graph; run after an import or cognify, before bump_graph_version."""
+    from cognee.infrastructure.databases.graph import get_graph_engine
+
+    store = get_fragment_store()
+    if store is None:
+        return {}
+    graph_engine = await get_graph_engine()
+    nodes, edges = await graph_engine.get_graph_data()
+    changes = store.sync(nodes, edges)
+    logger.info("Fragment store synced: %s", changes)
+    return changes
@@ -0,0 +1,201 @@
+"""Direct graph-query fast path for structured questions.
+
+Questions such as "list all payments to Vendor 2", "did we pay for SKU
+PTD-LAP-003" or "show INV-V3-M04-277438" have exact answers in the graph the
+cognify prompts build (Transaction -paid_to-> Vendor, Invoice -issued_by->
+Vendor, document -contains_item-> LineItem "<doc>_<SKU>"). `detect_intent`
+recognises them and `run_intent` answers with one parameterised Cypher query
+against the graph engine, returning every matching row instead of the
+top-k triplets an embedding search would surface. Only short questions are
+routed; agent prompts and anything unrecognised take the normal retrieval path.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+FAST_PATH_ENABLED = os.environ.get("GRAPH_FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+# Longer inputs are agent prompts or open questions, never routed.
+MAX_QUESTION_CHARS = 300
+
+_DASHES = re.compile(r"[‐-―−]")
+_VENDOR = r"vendor[\s_#:-]*(\d+)"
+# Only questions about the document list itself ("payments to Vendor 2", "Vendor 4's
+# invoices"); "did we pay Vendor 3 for a laptop" needs line items and goes to retrieval.
+_PAYMENTS = re.compile(
+    r"\b(?:(?:payments?|transactions?)\s+(?:made\s+)?(?:to|for|with)|paid\s+to)\s+" + _VENDOR + r"\b"
+    r"|\b" + _VENDOR + r"(?:'s)?\s+(?:payments|transactions)\b",
+    re.IGNORECASE,
+)
+_INVOICES = re.compile(
+    r"\binvoices?\s+(?:from|by|of|issued\s+by)\s+" + _VENDOR + r"\b|\b" + _VENDOR + r"(?:'s)?\s+invoices\b",
+    re.IGNORECASE,
+)
+_SKU = re.compile(r"\b([A-Z]{2,4}-[A-Z]{2,4}-\d{3})\b", re.IGNORECASE)
+_DOCUMENT = re.compile(r"\b((?:INV|TX)-V\d+-M\d+-\d+)\b", re.IGNORECASE)
+
+# One parameterised query per intent. Edges are matched in both directions because
+# the extraction model does not always orient them as the prompts ask.
+CYPHER = {
+    "payments_to_vendor": """
+        MATCH (t:Node)-[e:EDGE]-(v:Node)
+        WHERE e.relationship_name = 'paid_to' AND lower(v.name) = $vendor
+        RETURN DISTINCT t.name, t.properties
+        ORDER BY t.name
+    """,
+    "invoices_from_vendor": """
+        MATCH (i:Node)-[e:EDGE]-(v:Node)
+        WHERE e.relationship_name = 'issued_by' AND lower(v.name) = $vendor
+        RETURN DISTINCT i.name, i.properties
+        ORDER BY i.name
+    """,
+    "documents_with_sku": """
+        MATCH (d:Node)-[e:EDGE]-(li:Node)
+        WHERE e.relationship_name = 'contains_item' AND lower(li.name) CONTAINS $sku
+        RETURN DISTINCT d.name, d.properties, li.name, li.properties
+        ORDER BY d.name
+    """,
+    "document_details": """
+        MATCH (d:Node)-[e:EDGE]-(x:Node)
+        WHERE lower(d.name) = $document
+        RETURN d.properties, e.relationship_name, x.name, x.properties
+        ORDER BY e.relationship_name, x.name
+    """,
+}
+
+# Vendors that documents are issued by or paid to: the shard keys of a vendor-sharded LLM
+# dashboard when there are no ledger CSVs to list them from.
+VENDOR_NAMES = """
+    MATCH (d:Node)-[e:EDGE]-(v:Node)
+    WHERE e.relationship_name IN ['issued_by', 'paid_to'] AND lower(v.name) STARTS WITH 'vendor'
+    RETURN DISTINCT v.name
+    ORDER BY v.name
+"""
+
+COLUMNS = {
+    "payments_to_vendor": ["transaction", "details"],
+    "invoices_from_vendor": ["invoice", "details"],
+    "documents_with_sku": ["document", "details", "line_item", "line_details"],
+    "document_details": ["document_details", "relationship", "node", "node_details"],
+}
+
+
+@dataclass
+class Intent:
+    """A recognised structured question: the query name and its parameters."""
+    name: str
+    params: Dict[str, Any]
+
+
+@dataclass
+class GraphQueryResult:
+    intent: Intent
+    columns: List[str]
+    rows: List[List[Any]] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    def to_markdown(self) -> str:
+        lines = ["| " + " | ".join(self.columns) + " |", "|" + "---|" * len(self.columns)]
+        for row in self.rows:
+            lines.append("| " + " | ".join(str(c).replace("|", "/").replace("\n", " ") for c in row) + " |")
+        return "\n".join(lines)
+
+
+def detect_intent(question: str) -> Optional[Intent]:
+    """The structured intent of a short question, or None for the normal retrieval path."""
+    if not question or len(question) > MAX_QUESTION_CHARS:
+        return None
+    text = _DASHES.sub("-", question)
+    documents = {d.lower() for d in _DOCUMENT.findall(text)}
+    if len(documents) == 1:
+        return Intent("document_details", {"document": documents.pop()})
+    if documents:
+        return None
+    skus = {s.lower() for s in _SKU.findall(text)}
+    if len(skus) == 1:
+        return Intent("documents_with_sku", {"sku": skus.pop()})
+    for name, pattern in (("invoices_from_vendor", _INVOICES), ("payments_to_vendor", _PAYMENTS)):
+        match = pattern.search(text)
+        if match:
+            vendors = {int(v) for v in re.findall(_VENDOR, text, re.IGNORECASE)}
+            if len(vendors) == 1:
+                return Intent(name, {"vendor": f"vendor {vendors.pop()}"})
+            return None
+    return None
+
+
+def _description(properties: Any) -> Any:
+    """Nodes keep their text in a JSON `properties` column; show its description."""
+    if isinstance(properties, str):
+        try:
+            properties = json.loads(properties)
+        except ValueError:
+            return properties
+    if isinstance(properties, dict):
+        return properties.get("description") or properties.get("text") or ""
+    return properties if properties is not None else ""
+
+
+async def run_intent(intent: Intent) -> GraphQueryResult:
+    """Run the intent's Cypher query on the configured graph engine."""
+    from cognee.infrastructure.databases.graph import get_graph_engine
+
+    start = time.perf_counter()
+    graph_engine = await get_graph_engine()
+    raw_rows: Sequence[Sequence[Any]] = await graph_engine.query(CYPHER[intent.name], intent.params)
+    columns = COLUMNS[intent.name]
+    detail_columns = {i for i, c in enumerate(columns) if "details" in c}
+    rows = [
+        [_description(value) if i in detail_columns else value for i, value in enumerate(row)]
+        for row in raw_rows or []
+    ]
+    result = GraphQueryResult(intent, columns, rows, time.perf_counter() - start)
+    _stats.record(intent.name, bool(rows))
+    return result
+
+
+async def vendor_names() -> List[str]:
+    """Names of the vendor nodes in the graph, from one edge-filtered query."""
+    from cognee.infrastructure.databases.graph import get_graph_engine
+
+    graph_engine = await get_graph_engine()
+    rows = await graph_engine.query(VENDOR_NAMES, {})
+    return [str(row[0]) for row in rows or [] if row and row[0]]
+
+
+def summary_prompt(question: str, result: GraphQueryResult) -> str:
+    """User prompt asking the LLM to answer from the complete result table only."""
+    return (
+        f"<question>{question}</question>\n"
+        f"<context>Complete result of a direct graph query ({len(result.rows)} rows, nothing omitted):\n"
+        f"{result.to_markdown()}</context>\n"
+        "Answer the question in 1-3 sentences using only these rows; cite IDs and amounts."
+    )
+
+
+class FastPathStats:
+    """Routed questions per intent, and how many returned no rows (and fell back)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, intent: str, found: bool) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(intent, {"answered": 0, "empty": 0})
+            counts["answered" if found else "empty"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._counts.items()}
+
+
+_stats = FastPathStats()
+
+
+def fast_path_stats() -> Dict[str, Dict[str, int]]:
+    return _stats.stats()
@@ -0,0 +1,239 @@
+"""Read-only in-memory CSR projection of the knowledge graph.
+
+The whole graph is read once (graph_engine.get_graph_data) and kept as NumPy
+arrays: node IDs are interned to ints, each edge is (src, dst, relation code),
+and two CSR indexes (by source and by target) map a node to its edge IDs.
+Node names, types and descriptions are columnar arrays. Multi-hop neighbour
+expansion (Invoice -contains_item-> LineItem -refers_to-> Product) is then a
+few vectorised array operations per hop instead of a graph-engine round-trip.
+
+`get_projection` reloads the projection when the graph version changes (see
+graph_version), so an import_cognee_data or cognify run is picked up on the
+next query. Kept free of cognee imports except inside `load_projection`.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from graph_version import get_graph_version
+
+PROJECTION_ENABLED = os.environ.get("GRAPH_PROJECTION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Hops used to expand retrieved documents: the items they contain, then what each item is.
+DEFAULT_HOPS: Tuple[Tuple[str, ...], ...] = (("contains_item",), ("refers_to", "has_quantity"))
+# Upper bound on expanded edges added to one prompt.
+MAX_EXPANSION_EDGES = int(os.environ.get("GRAPH_PROJECTION_MAX_EDGES", "60"))
+
+Triple = Tuple[int, int, int]  # (src node, relation code, dst node)
+
+
+def _csr(keys: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """indptr/edge-id arrays grouping edge IDs by `keys` (node index per edge)."""
+    order = np.argsort(keys, kind="stable").astype(np.int32)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=indptr[1:])
+    return indptr, order
+
+
+def _gather(indptr: np.ndarray, edge_ids: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Edge IDs of every node in `nodes`, concatenated."""
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.empty(0, dtype=edge_ids.dtype)
+    offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+    return edge_ids[np.arange(total) + offsets]
+
+
+def _unique(values: np.ndarray) -> np.ndarray:
+    """Sorted distinct values; a plain sort is faster than np.unique's hashing for these sizes."""
+    values = np.sort(values)
+    if values.size < 2:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+class GraphProjection:
+    """Interned nodes, columnar node attributes and by-source/by-target CSR edge indexes."""
+
+    def __init__(
+        self,
+        node_ids: Sequence[str],
+        names: Sequence[str],
+        types: Sequence[str],
+        descriptions: Sequence[str],
+        src: np.ndarray,
+        dst: np.ndarray,
+        relations: np.ndarray,
+        relation_names: Sequence[str],
+        version: str = "",
+    ):
+        self.node_ids = list(node_ids)
+        self.index: Dict[str, int] = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.names = np.asarray(names, dtype=object)
+        self.type_names, type_codes = np.unique(np.asarray(types, dtype=str), return_inverse=True)
+        self.types = type_codes.astype(np.int16)
+        self.descriptions = np.asarray(descriptions, dtype=object)
+        self.src = src.astype(np.int32)
+        self.dst = dst.astype(np.int32)
+        self.relations = relations.astype(np.int16)
+        self.relation_names = list(relation_names)
+        self.relation_codes = {name: i for i, name in enumerate(self.relation_names)}
+        n = len(self.node_ids)
+        self.out_ptr, self.out_edges = _csr(self.src, n)
+        self.in_ptr, self.in_edges = _csr(self.dst, n)
+        self.version = version
+
+    @classmethod
+    def from_graph_data(
+        cls,
+        nodes: Iterable[Tuple[Any, Dict[str, Any]]],
+        edges: Iterable[Tuple[Any, Any, str, Any]],
+        version: str = "",
+    ) -> "GraphProjection":
+        """Build from graph_engine.get_graph_data() output: (id, props) nodes, (src, dst, rel, props) edges."""
+        node_ids, names, types, descriptions = [], [], [], []
+        index: Dict[str, int] = {}
+        for node_id, props in nodes:
+            props = props or {}
+            index[str(node_id)] = len(node_ids)
+            node_ids.append(str(node_id))
+            names.append(str(props.get("name") or ""))
+            types.append(str(props.get("type") or ""))
+            descriptions.append(str(props.get("description") or props.get("text") or ""))
+        relation_codes: Dict[str, int] = {}
+        src, dst, rel = [], [], []
+        for edge in edges:
+            s, d = index.get(str(edge[0])), index.get(str(edge[1]))
+            if s is None or d is None:
+                continue
+            src.append(s)
+            dst.append(d)
+            rel.append(relation_codes.setdefault(str(edge[2]), len(relation_codes)))
+        return cls(
+            node_ids, names, types, descriptions,
+            np.asarray(src, dtype=np.int32), np.asarray(dst, dtype=np.int32), np.asarray(rel, dtype=np.int16),
+            list(relation_codes), version,
+        )
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.src)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the NumPy arrays (excludes the Python strings and the ID index)."""
+        arrays = (self.types, self.src, self.dst, self.relations, self.out_ptr, self.out_edges, self.in_ptr, self.in_edges)
+        return sum(a.nbytes for a in arrays) + self.names.nbytes + self.descriptions.nbytes
+
+    def _relation_mask(self, relations: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        """Boolean lookup by relation code, or None for every relation."""
+        if relations is None:
+            return None
+        mask = np.zeros(len(self.relation_names), dtype=bool)
+        mask[[self.relation_codes[r] for r in relations if r in self.relation_codes]] = True
+        return mask
+
+    def hop(self, nodes: np.ndarray, relations: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Edge IDs touching `nodes` in either direction, optionally only of `relations`.
+
+        Both directions are followed because the extraction model does not always
+        orient edges as the cognify prompts ask.
+        """
+        edge_ids = np.concatenate([_gather(self.out_ptr, self.out_edges, nodes), _gather(self.in_ptr, self.in_edges, nodes)])
+        mask = self._relation_mask(relations)
+        if mask is not None:
+            edge_ids = edge_ids[mask[self.relations[edge_ids]]]
+        return _unique(edge_ids)
+
+    def expand(
+        self,
+        seed_ids: Iterable[str],
+        hops: Sequence[Optional[Sequence[str]]] = DEFAULT_HOPS,
+        max_edges: Optional[int] = None,
+    ) -> List[Triple]:
+        """Edges reached from the seed nodes following one relation set per hop, as (src, rel, dst)."""
+        index = self.index
+        frontier = _unique(np.fromiter((index[s] for s in seed_ids if s in index), dtype=np.int32))
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        visited[frontier] = True
+        seen_edges: List[np.ndarray] = []
+        for relations in hops:
+            if not frontier.size:
+                break
+            edge_ids = self.hop(frontier, relations)
+            seen_edges.append(edge_ids)
+            ends = np.concatenate([self.src[edge_ids], self.dst[edge_ids]])
+            frontier = _unique(ends[~visited[ends]])
+            visited[frontier] = True
+        if not seen_edges:
+            return []
+        edge_ids = np.concatenate(seen_edges)
+        if max_edges is not None:
+            edge_ids = edge_ids[:max_edges]
+        return list(zip(self.src[edge_ids].tolist(), self.relations[edge_ids].tolist(), self.dst[edge_ids].tolist()))
+
+    def to_text(self, triples: Iterable[Triple]) -> str:
+        """Render triples as `source --[relation]--> target` lines, one per edge."""
+        return "\n".join(
+            f"{self.names[s] or self.node_ids[s]} --[{self.relation_names[r]}]--> {self.names[d] or self.node_ids[d]}"
+            for s, r, d in triples
+        )
+
+
+async def load_projection() -> GraphProjection:
+    """Read the whole graph from the configured graph engine into a new projection."""
+    from cognee.infrastructure.databases.graph import get_graph_engine
+
+    version = get_graph_version()
+    graph_engine = await get_graph_engine()
+    nodes, edges = await graph_engine.get_graph_data()
+    return GraphProjection.from_graph_data(nodes, edges, version)
+
+
+_projection: Optional[GraphProjection] = None
+_load_lock: Optional[asyncio.Lock] = None
+_load_stats: Dict[str, float] = {"loads": 0, "last_load_s": 0.0}
+
+
+async def get_projection() -> GraphProjection:
+    """The shared projection, (re)loaded when missing or built from an older graph version."""
+    global _projection, _load_lock
+    if _projection is not None and _projection.version == get_graph_version():
+        return _projection
+    if _load_lock is None:
+        _load_lock = asyncio.Lock()
+    async with _load_lock:
+        if _projection is None or _projection.version != get_graph_version():
+            start = time.perf_counter()
+            _projection = await load_projection()
+            _load_stats["loads"] += 1
+            _load_stats["last_load_s"] = time.perf_counter() - start
+    return _projection
+
+
+def reload_projection() -> None:
+    """Drop the shared projection; the next get_projection() reads the graph again."""
+    global _projection
+    _projection = None
+
+
+def projection_stats() -> Dict[str, Any]:
+    """Size of the loaded projection and how often/long it was loaded."""
+    stats: Dict[str, Any] = dict(_load_stats)
+    if _projection is not None:
+        stats.update(
+            version=_projection.version,
+            nodes=_projection.num_nodes,
+            edges=_projection.num_edges,
+            array_bytes=_projection.nbytes,
+        )
+    return stats
@@ -0,0 +1,62 @@
+"""Graph version fingerprint.
+
+A small marker file records an opaque version string that changes whenever the
+knowledge graph is replaced (import_cognee_data) or extended (cognify). Caches
+keyed by this fingerprint are invalidated automatically when the graph changes.
+Kept free of cognee imports so cheap callers (e.g. response caches) can use it.
+"""
+
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+_VERSION_FILE = Path(
+    os.environ.get(
+        "COGNEE_GRAPH_VERSION_FILE",
+        str(Path(__file__).resolve().parent / ".graph_version"),
+    )
+)
+_INITIAL_VERSION = "initial"
+
+_lock = threading.Lock()
+_cached: Optional[Tuple[int, str]] = None  # (mtime_ns, version)
+
+
+def get_graph_version() -> str:
+    """Return the current graph version; re-reads the marker only when it changed on disk."""
+    global _cached
+    try:
+        mtime_ns = _VERSION_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return _INITIAL_VERSION
+    with _lock:
+        if _cached is not None and _cached[0] == mtime_ns:
+            return _cached[1]
+    try:
+        version = json.loads(_VERSION_FILE.read_text()).get("version", _INITIAL_VERSION)
+    except (OSError, ValueError):
+        version = _INITIAL_VERSION
+    with _lock:
+        _cached = (mtime_ns, version)
+    return version
+
+
+def bump_graph_version(reason: str = "") -> str:
+    """Record that the graph changed and return the new version string."""
+    global _cached
+    version = uuid.uuid4().hex
+    payload = {
+        "version": version,
+        "updated_at": datetime.now().isoformat(),
+        "reason": reason,
+    }
+    tmp = _VERSION_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload))
+    os.replace(tmp, _VERSION_FILE)
+    with _lock:
+        _cached = None
+    return version
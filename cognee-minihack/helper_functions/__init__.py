@@ -1,7 +1,8 @@
 """Helper functions for Cognee data management"""
 
+from .add_by_vendor import add_by_vendor, read_vendor_ids
 from .export_cognee import export_cognee_data
 from .import_cognee import import_cognee_data
 
-__all__ = ['export_cognee_data', 'import_cognee_data']
+__all__ = ['add_by_vendor', 'export_cognee_data', 'import_cognee_data', 'read_vendor_ids']
 
@@ -0,0 +1,26 @@
+"""
+Add Records by Vendor
+=====================
+Shared by initial_graph_creation.py and solution_enrichtment.py: records are
+added under one node set per vendor (query_routing.vendor_node_set) so
+retrieval can be scoped to a vendor's subgraph.
+"""
+
+import cognee
+import pandas as pd
+
+from query_routing import vendor_node_set
+
+
+async def add_by_vendor(records, vendor_ids):
+    """Add records under one node set per vendor so retrieval can be scoped to a vendor's subgraph."""
+    by_vendor = {}
+    for record, vendor_id in zip(records, vendor_ids):
+        by_vendor.setdefault(vendor_node_set(vendor_id), []).append(record)
+    for node_set, vendor_records in by_vendor.items():
+        await cognee.add(vendor_records, node_set=[node_set])
+
+
+def read_vendor_ids(filepath, n_rows, delimiter=','):
+    """vendor_id of the first n_rows records, in the order read_invoices_csv returns them."""
+    return pd.read_csv(filepath, sep=delimiter, usecols=['vendor_id']).head(n_rows)['vendor_id'].tolist()
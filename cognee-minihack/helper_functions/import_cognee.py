@@ -26,6 +26,10 @@ from pathlib import Path
 import cognee
 import site
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from graph_version import bump_graph_version
+from fragment_store import update_fragment_store
+
 
 def find_cognee_paths():
     """Find cognee data directories in the site-packages"""
@@ -161,6 +165,17 @@ async def import_cognee_data(import_dir="cognee_export", verbose=True):
             print(f"  ✗ Error importing data storage: {e}")
         return False
     
+    # Re-render the context fragments of the imported graph, then invalidate
+    # caches keyed by the graph fingerprint
+    try:
+        changes = await update_fragment_store()
+        if verbose:
+            print(f"  ✓ Fragment store synced: {changes}")
+    except Exception as e:
+        if verbose:
+            print(f"  ! Fragment store not synced (nodes are rendered at query time): {e}")
+    bump_graph_version("import_cognee_data")
+
     if verbose:
         print("\n" + "=" * 60)
         print("✓ Import completed successfully!")
@@ -14,7 +14,10 @@ os.environ["HUGGINGFACE_TOKENIZER"] = "nomic-ai/nomic-embed-text-v1.5"
 import cognee
 import pandas as pd
 from pathlib import Path
-from helper_functions import export_cognee_data
+from ann_index import update_ann_index
+from fragment_store import update_fragment_store
+from graph_version import bump_graph_version
+from helper_functions import add_by_vendor, export_cognee_data, read_vendor_ids
 
 
 def load_prompt(filename):
@@ -36,6 +39,7 @@ def read_invoices_csv(filepath, n_rows, delimiter=','):
     # return "\n".join(str(row) for row in df.to_dict('records'))
     return [str(row) for row in df.to_dict('records')]
 
+
 async def main():
     # Create a clean slate for cognee -- reset data and system state
     await cognee.prune.prune_data()
@@ -43,13 +47,18 @@ async def main():
 
     # Read and process invoices
     invoices = read_invoices_csv('data/invoices.csv', 200)
-    await cognee.add(invoices)
+    await add_by_vendor(invoices, read_vendor_ids('data/invoices.csv', 200))
     await cognee.cognify(custom_prompt=INVOICE_PROMPT)
+    await update_fragment_store()
+    bump_graph_version("cognify invoices")
 
     # Read and process transactions
     transactions = read_invoices_csv('data/transactions.csv', 200, delimiter=';')
-    await cognee.add(transactions)
+    await add_by_vendor(transactions, read_vendor_ids('data/transactions.csv', 200, delimiter=';'))
     await cognee.cognify(custom_prompt=TRANSACTION_PROMPT)
+    await update_fragment_store()
+    bump_graph_version("cognify transactions")
+    await update_ann_index(rebuild=True)
 
     # Visualize the graph
     from cognee.api.v1.visualize.visualize import visualize_graph
@@ -0,0 +1,194 @@
+"""Long-lived, pooled OpenAI-compatible client for the local Ollama endpoint.
+
+The connection settings are read from the environment once (on first use), and
+one ``AsyncOpenAI`` client with its own httpx connection pool is kept per event
+loop, so consecutive completions on the same loop reuse warm keep-alive
+connections instead of paying a new TCP handshake every call.
+
+`warm_up_llm` loads the model into Ollama ahead of the first question, with
+`LLM_KEEP_ALIVE` as its keep-alive, and primes the KV cache with the system
+prompt, so the first user request does not pay for model load and prefill.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+import weakref
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LLMClientConfig:
+    """Connection settings for the OpenAI-compatible LLM endpoint."""
+    endpoint: str
+    api_key: str
+    model: str
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    timeout: float
+    connect_timeout: float
+    keep_alive: str
+
+    @classmethod
+    def from_env(cls) -> "LLMClientConfig":
+        return cls(
+            endpoint=os.environ.get("LLM_ENDPOINT", "http://localhost:11434/v1"),
+            api_key=os.environ.get("LLM_API_KEY", "ollama"),
+            model=os.environ.get("LLM_MODEL", "cognee-distillabs-model-gguf-quantized"),
+            max_connections=int(os.environ.get("LLM_MAX_CONNECTIONS", "8")),
+            max_keepalive_connections=int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", "8")),
+            keepalive_expiry=float(os.environ.get("LLM_KEEPALIVE_EXPIRY", "300")),
+            # CPU-only SLM generations can take minutes for long outputs.
+            timeout=float(os.environ.get("LLM_TIMEOUT", "600")),
+            connect_timeout=float(os.environ.get("LLM_CONNECT_TIMEOUT", "5")),
+            # How long Ollama keeps the model loaded after the warm-up request ("-1" = forever).
+            keep_alive=os.environ.get("LLM_KEEP_ALIVE", "30m"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("api_key")
+        return data
+
+
+_lock = threading.Lock()
+_config: Optional[LLMClientConfig] = None
+# httpx pools are bound to the loop that opened their connections, so clients are keyed by loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+_counters = {"requests": 0, "clients_created": 0, "clients_closed": 0, "warmups": 0}
+
+
+def get_llm_config() -> LLMClientConfig:
+    """Return the LLM connection settings, reading the environment only once."""
+    global _config
+    with _lock:
+        if _config is None:
+            _config = LLMClientConfig.from_env()
+            logger.debug("LLM client config loaded: %s", _config.to_dict())
+        return _config
+
+
+def _build_client(config: LLMClientConfig) -> AsyncOpenAI:
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+    )
+    return AsyncOpenAI(
+        base_url=config.endpoint,
+        api_key=config.api_key,
+        http_client=http_client,
+        max_retries=0,
+    )
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """Return the shared client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    config = get_llm_config()
+    with _lock:
+        client = _clients.get(loop)
+        if client is None:
+            client = _build_client(config)
+            _clients[loop] = client
+            _counters["clients_created"] += 1
+            logger.debug("Created pooled LLM client for loop %x", id(loop))
+        _counters["requests"] += 1
+        return client
+
+
+async def aclose_llm_client() -> None:
+    """Close the client bound to the running event loop, if any."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        await client.close()
+        with _lock:
+            _counters["clients_closed"] += 1
+
+
+def close_llm_clients() -> None:
+    """Close every pooled client whose loop can still run cleanup; drop the rest."""
+    with _lock:
+        items = list(_clients.items())
+        _clients.clear()
+    for loop, client in items:
+        try:
+            if not loop.is_closed() and not loop.is_running():
+                loop.run_until_complete(client.close())
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.close(), loop).result(timeout=5)
+        except Exception as exc:
+            logger.debug("Failed to close pooled LLM client cleanly: %s", exc)
+        with _lock:
+            _counters["clients_closed"] += 1
+
+
+def _native_endpoint(endpoint: str) -> str:
+    """Ollama's native API root for an OpenAI-compatible `.../v1` endpoint."""
+    endpoint = endpoint.rstrip("/")
+    return endpoint[: -len("/v1")] if endpoint.endswith("/v1") else endpoint
+
+
+async def warm_up_llm(system_prompt: Optional[str] = None) -> float:
+    """Load the model with the configured keep-alive; returns the seconds the request took.
+
+    Uses Ollama's native /api/chat (the OpenAI-compatible endpoint has no keep_alive)
+    and generates a single token. With `system_prompt`, its prefill is left in the
+    KV cache for the requests that start with it.
+    """
+    config = get_llm_config()
+    payload: Dict[str, Any] = {
+        "model": config.model,
+        "keep_alive": config.keep_alive,
+        "stream": False,
+        "options": {"num_predict": 1},
+        "messages": [{"role": "system", "content": system_prompt}] if system_prompt else [],
+    }
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout)) as http:
+        response = await http.post(f"{_native_endpoint(config.endpoint)}/api/chat", json=payload)
+        response.raise_for_status()
+    elapsed = time.perf_counter() - start
+    with _lock:
+        _counters["warmups"] += 1
+    logger.info("Warmed up %s in %.1fs (keep_alive=%s)", config.model, elapsed, config.keep_alive)
+    return elapsed
+
+
+def llm_client_stats() -> Dict[str, Any]:
+    """Return pool counters plus the current connection count of every open client."""
+    with _lock:
+        clients = list(_clients.values())
+        stats: Dict[str, Any] = dict(_counters)
+    connections = 0
+    idle = 0
+    for client in clients:
+        pool = getattr(getattr(client._client, "_transport", None), "_pool", None)
+        for conn in getattr(pool, "connections", []):
+            connections += 1
+            idle += int(conn.is_idle())
+    stats.update(
+        open_clients=len(clients),
+        open_connections=connections,
+        idle_connections=idle,
+        config=get_llm_config().to_dict(),
+    )
+    return stats
+
+
+atexit.register(close_llm_clients)
@@ -0,0 +1,160 @@
+"""Dedicated, long-lived asyncio loop running in a background thread.
+
+Cognee's graph/vector engines and the pooled LLM client are bound to the event
+loop that created them. Running every request on one persistent loop keeps
+those resources warm, and lets synchronous callers (e.g. Streamlit script
+threads) submit work concurrently without creating throwaway loops.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Iterator, Optional, TypeVar
+
+from llm_client import aclose_llm_client
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackgroundLoopRunner:
+    """Owns one event loop in a daemon thread and accepts coroutines from any thread."""
+
+    def __init__(self, name: str = "cognee-loop"):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop  # type: ignore[return-value]
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the loop thread if it is not running yet (idempotent)."""
+        with self._lock:
+            if self.is_running():
+                return
+            self._started.clear()
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._started.wait()
+        logger.debug("Background loop %s started", self.name)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(self._started.set)
+        self._loop.run_forever()
+
+    def submit(self, coro: Awaitable[T]) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the loop and return a thread-safe future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and block the calling thread for its result."""
+        if self._on_loop_thread():
+            getattr(coro, "close", lambda: None)()  # never scheduled; avoid the "never awaited" warning
+            raise RuntimeError("run() would deadlock when called from the runner loop; await instead")
+        return self.submit(coro).result(timeout=timeout)
+
+    async def run_async(self, coro: Awaitable[T]) -> T:
+        """Await a coroutine on the runner loop from any other event loop."""
+        if self._on_loop_thread():
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def iterate(self, agen: AsyncIterator[T], timeout: Optional[float] = None) -> Iterator[T]:
+        """Drive an async iterator on the loop and yield its items in the calling thread.
+
+        `timeout` bounds the wait for each item. Closing the returned generator early
+        cancels the async iterator on the loop.
+        """
+        if self._on_loop_thread():
+            raise RuntimeError("iterate() would deadlock when called from the runner loop; use async for")
+        items: "queue.Queue" = queue.Queue()
+
+        async def _pump() -> None:
+            try:
+                async for item in agen:
+                    items.put(("item", item))
+            except Exception as exc:
+                items.put(("error", exc))
+            finally:
+                items.put(("done", None))
+
+        future = self.submit(_pump())
+        try:
+            while True:
+                kind, value = items.get(timeout=timeout)
+                if kind == "item":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            future.cancel()
+
+    def _on_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Close loop-bound resources, cancel pending tasks and stop the thread."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None or thread is None or not thread.is_alive():
+            return
+
+        async def _drain() -> None:
+            await aclose_llm_client()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_drain(), loop).result(timeout=timeout)
+        except Exception as exc:
+            logger.debug("Background loop %s drain failed: %s", self.name, exc)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=timeout)
+        if not thread.is_alive():
+            loop.close()
+        logger.debug("Background loop %s stopped", self.name)
+
+
+_RUNNER: Optional[BackgroundLoopRunner] = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_runner() -> BackgroundLoopRunner:
+    """Return the process-wide runner, starting it on first use."""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = BackgroundLoopRunner()
+            atexit.register(_RUNNER.shutdown)
+        runner = _RUNNER
+    runner.start()
+    return runner
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """Convenience wrapper: run a coroutine on the shared loop and wait for it."""
+    return get_runner().run(coro, timeout=timeout)
+
+
+def submit(coro: Awaitable[Any]) -> "concurrent.futures.Future[Any]":
+    """Convenience wrapper: schedule a coroutine on the shared loop."""
+    return get_runner().submit(coro)
@@ -0,0 +1,68 @@
+"""Prompt templates, loaded once, and the message layout sent to the SLM.
+
+Ollama reuses the KV cache of the longest token prefix a request shares with the
+previous one in the same slot, so everything that is the same across requests
+goes first:
+
+1. the system prompt (a 9 KB file, identical for every question);
+2. the user template's fixed instructions, then the question (for the agent
+   prompts in core.agents, mostly static instructions);
+3. the retrieved context;
+
+and the session's conversation history is appended after the system prompt
+instead of in front of it. The system prompt file and the user template are read
+and compiled once per process rather than on every call.
+"""
+
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = Path(__file__).resolve().parent / "prompts"
+
+# Same loader settings as cognee's render_prompt, so rendered prompts are unchanged;
+# templates are compiled once and not re-checked on disk.
+_env = Environment(
+    loader=FileSystemLoader(str(PROMPTS_DIR)),
+    autoescape=select_autoescape(["html", "xml", "txt"]),
+    auto_reload=False,
+)
+
+
+@lru_cache(maxsize=None)
+def system_prompt_text(path: str) -> str:
+    """Contents of a system prompt file; names that are not files resolve via cognee's prompt directory."""
+    file = Path(path)
+    if file.is_file():
+        return file.read_text()
+    from cognee.infrastructure.llm.prompts import read_query_prompt
+
+    return read_query_prompt(path)
+
+
+@lru_cache(maxsize=None)
+def user_template(filename: str) -> Template:
+    return _env.get_template(filename)
+
+
+def render_user_prompt(filename: str, question: str, context: str) -> str:
+    return user_template(filename).render(question=question, context=context)
+
+
+def build_messages(
+    user_prompt: str,
+    system_prompt: str,
+    conversation_history: Optional[str] = None,
+) -> List[Dict[str, str]]:
+    """Chat messages with the stable system prompt first and the history after it."""
+    if conversation_history:
+        system_prompt = f"{system_prompt}\n\nCONVERSATION HISTORY:\n{conversation_history}"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
@@ -0,0 +1,68 @@
+"""Scalar (int8) and binary (1-bit) codes for normalised embeddings.
+
+A 768-dim float32 embedding takes 3072 bytes; its int8 code takes 768 and its
+binary code 96. The ANN index (see ann_index) keeps the codes for a first-pass
+scan and re-ranks a shortlist with the exact float vectors, which stay on disk
+memory-mapped, so only the shortlist's pages are read. `QUANTIZERS` maps the
+ANN_QUANTIZATION setting to the quantizer class.
+"""
+
+from typing import Dict, Optional, Type
+
+import numpy as np
+
+
+class Int8Quantizer:
+    """Per-dimension symmetric scaling to int8; scores are the dequantised dot products."""
+
+    name = "int8"
+
+    def __init__(self, scale: Optional[np.ndarray] = None):
+        self.scale = scale
+
+    def fit(self, vectors: np.ndarray) -> "Int8Quantizer":
+        peak = np.abs(vectors).max(axis=0) if len(vectors) else np.ones(vectors.shape[1], dtype=np.float32)
+        self.scale = (np.where(peak > 0, peak, 1.0) / 127.0).astype(np.float32)
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint(vectors / self.scale), -127, 127).astype(np.int8)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Approximate cosine similarity of each code with the normalised query (higher is closer)."""
+        return codes.astype(np.float32) @ (query * self.scale)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"scale": self.scale}
+
+
+# Set bits of every byte value; a table lookup works on any NumPy version
+# (np.bitwise_count needs NumPy 2).
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+class BinaryQuantizer:
+    """Sign bits packed 8 per byte; scores are negated Hamming distances."""
+
+    name = "binary"
+
+    def __init__(self, **_):
+        pass
+
+    def fit(self, vectors: np.ndarray) -> "BinaryQuantizer":
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.packbits(vectors > 0, axis=-1)
+
+    def scores(self, codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+        differing = _POPCOUNT[np.bitwise_xor(codes, self.encode(query))]
+        return -differing.sum(axis=1, dtype=np.int32)
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+
+QUANTIZERS: Dict[str, Type] = {"int8": Int8Quantizer, "binary": BinaryQuantizer}
+# First-pass shortlist size per result, re-ranked exactly; binary codes need a longer one.
+RERANK_FACTOR = {"int8": 4, "binary": 10}
@@ -0,0 +1,168 @@
+"""Semantic near-duplicate query cache.
+
+Queries are embedded with the configured embedding model (nomic-embed-text by
+default) and compared against a small in-memory index of previously answered
+queries. A stored answer is reused when the cosine similarity is above the
+threshold *and* both queries mention exactly the same identifiers and numbers,
+so "Vendor 2" never reuses an answer about "Vendor 3".
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+EmbedFn = Callable[[List[str]], Awaitable[Sequence[Sequence[float]]]]
+
+# Invoice/transaction IDs, SKUs, dates and plain numbers.
+_SIGNATURE_TOKEN = re.compile(r"[A-Za-z]+(?:-[A-Za-z0-9]+)+|\d+(?:[.,]\d+)*")
+
+
+def query_signature(query: str) -> str:
+    """Identifiers and numbers in a query; two queries must share it to reuse an answer."""
+    return " ".join(sorted({t.upper() for t in _SIGNATURE_TOKEN.findall(query or "")}))
+
+
+async def cognee_embed(texts: List[str]) -> Sequence[Sequence[float]]:
+    """Embed texts with the embedding engine configured for the Cognee vector store."""
+    from cognee.infrastructure.databases.vector import get_vector_engine
+
+    return await get_vector_engine().embedding_engine.embed_text(texts)
+
+
+class SemanticCache:
+    """Bounded cosine-similarity index of answered queries plus a memo of query embeddings."""
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn = cognee_embed,
+        threshold: float = 0.95,
+        capacity: int = 512,
+        embedding_cache_size: int = 2048,
+    ):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.capacity = capacity
+        self.embedding_cache_size = embedding_cache_size
+        self._embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._namespaces: List[Optional[str]] = [None] * capacity
+        self._answers: List[Optional[str]] = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._clock = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "embedding_hits": 0,
+            "embedding_misses": 0,
+        }
+        self._hit_similarities: List[float] = []
+
+    async def embed(self, query: str) -> np.ndarray:
+        """Return the L2-normalised embedding of `query`, memoised by exact text."""
+        with self._lock:
+            cached = self._embeddings.get(query)
+            if cached is not None:
+                self._embeddings.move_to_end(query)
+                self._stats["embedding_hits"] += 1
+                return cached
+            self._stats["embedding_misses"] += 1
+
+        vector = np.asarray((await self.embed_fn([query]))[0], dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector = vector / norm
+
+        with self._lock:
+            self._embeddings[query] = vector
+            while len(self._embeddings) > self.embedding_cache_size:
+                self._embeddings.popitem(last=False)
+        return vector
+
+    def _namespaced(self, query: str, namespace: str) -> str:
+        return f"{namespace}|{query_signature(query)}"
+
+    async def lookup(self, query: str, namespace: str = "") -> Optional[str]:
+        """Return a cached answer for a near-duplicate of `query`, or None."""
+        vector = await self.embed(query)
+        key = self._namespaced(query, namespace)
+        with self._lock:
+            best, similarity = self._best_match(vector, key)
+            if best is None or similarity < self.threshold:
+                self._stats["misses"] += 1
+                return None
+            self._clock += 1
+            self._last_used[best] = self._clock
+            self._stats["hits"] += 1
+            self._hit_similarities.append(similarity)
+            del self._hit_similarities[:-1000]
+            return self._answers[best]
+
+    def _best_match(self, vector: np.ndarray, key: str) -> Tuple[Optional[int], float]:
+        if self._matrix is None:
+            return None, -1.0
+        candidates = np.fromiter(
+            (i for i, ns in enumerate(self._namespaces) if ns == key), dtype=np.int64
+        )
+        if candidates.size == 0:
+            return None, -1.0
+        similarities = self._matrix[candidates] @ vector
+        position = int(np.argmax(similarities))
+        return int(candidates[position]), float(similarities[position])
+
+    async def store(self, query: str, answer: str, namespace: str = "") -> None:
+        """Remember `answer` for `query`, evicting the least recently used entry when full."""
+        vector = await self.embed(query)
+        key = self._namespaced(query, namespace)
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            free = [i for i, ns in enumerate(self._namespaces) if ns is None]
+            if free:
+                slot = free[0]
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._stats["evictions"] += 1
+            self._clock += 1
+            self._matrix[slot] = vector
+            self._namespaces[slot] = key
+            self._answers[slot] = answer
+            self._last_used[slot] = self._clock
+            self._stats["stores"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._namespaces = [None] * self.capacity
+            self._answers = [None] * self.capacity
+            self._last_used[:] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus similarity percentiles of accepted hits (for tuning)."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = sum(ns is not None for ns in self._namespaces)
+            stats["threshold"] = self.threshold
+            if self._hit_similarities:
+                sims = np.asarray(self._hit_similarities)
+                stats["hit_similarity_p10"] = float(np.percentile(sims, 10))
+                stats["hit_similarity_p50"] = float(np.percentile(sims, 50))
+        return stats
+
+
+def semantic_cache_from_env() -> Optional[SemanticCache]:
+    """Build a cache from SEMANTIC_CACHE_* env vars, or None when disabled."""
+    if os.environ.get("SEMANTIC_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return SemanticCache(
+        threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        capacity=int(os.environ.get("SEMANTIC_CACHE_CAPACITY", "512")),
+        embedding_cache_size=int(os.environ.get("SEMANTIC_CACHE_EMBEDDINGS", "2048")),
+    )
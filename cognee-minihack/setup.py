@@ -1,6 +1,7 @@
 import cognee
 import asyncio
 from helper_functions import import_cognee_data
+from ann_index import get_ann_index, update_ann_index
 from cognee.api.v1.visualize.visualize import visualize_graph
 
 
@@ -19,6 +20,13 @@ async def main():
         print("\n✗ Import failed!")
         return
     
+    # The export normally ships its ANN index (cognee_export/ann_index); the import
+    # bumps the graph version, so bring it up to date (or build it) for this graph
+    ann = get_ann_index()
+    if ann is None or not ann.is_current:
+        print("\nUpdating ANN index...")
+        await update_ann_index()
+
     # Create visualization
     print("\nCreating graph visualization...")
     await visualize_graph("./graphs/after_setup.html")
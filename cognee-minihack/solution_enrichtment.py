@@ -2,6 +2,10 @@ import asyncio
 import cognee
 import pandas as pd
 from pathlib import Path
+from ann_index import update_ann_index
+from fragment_store import update_fragment_store
+from graph_version import bump_graph_version
+from helper_functions import add_by_vendor, read_vendor_ids
 
 
 def load_prompt(filename):
@@ -22,16 +26,22 @@ def read_invoices_csv(filepath, n_rows, delimiter=','):
     print(df)
     return [str(row) for row in df.to_dict('records')]
 
+
 async def main():
     # Read and process invoices
     invoices = read_invoices_csv('data_for_enrichment/new_invoices.csv', 10000)
-    await cognee.add(invoices)
+    await add_by_vendor(invoices, read_vendor_ids('data_for_enrichment/new_invoices.csv', 10000))
     await cognee.cognify(custom_prompt=INVOICE_PROMPT)
+    await update_fragment_store()
+    bump_graph_version("cognify invoices")
 
     # Read and process transactions
     transactions = read_invoices_csv('data_for_enrichment/new_transactions.csv', 10000, delimiter=';')
-    await cognee.add(transactions)
+    await add_by_vendor(transactions, read_vendor_ids('data_for_enrichment/new_transactions.csv', 10000, delimiter=';'))
     await cognee.cognify(custom_prompt=TRANSACTION_PROMPT)
+    await update_fragment_store()
+    bump_graph_version("cognify transactions")
+    await update_ann_index()
 
     # Visualize the graph
     from cognee.api.v1.visualize.visualize import visualize_graph
@@ -13,47 +13,186 @@ os.environ["EMBEDDING_ENDPOINT"] = "http://localhost:11434/api/embed"
 os.environ["EMBEDDING_DIMENSIONS"] = "768"
 os.environ["HUGGINGFACE_TOKENIZER"] = "nomic-ai/nomic-embed-text-v1.5"
 
-from custom_retriever import GraphCompletionRetrieverWithUserPrompt
+from custom_generate_completion import generate_completion_with_user_prompt, stream_completion_with_user_prompt
+from custom_retriever import GraphCompletionRetrieverWithUserPrompt, QueryResult
+import graph_fast_path
+import graph_projection
+from llm_client import warm_up_llm
+from loop_runner import get_runner
+from prompt_templates import system_prompt_text
+from semantic_cache import semantic_cache_from_env
 import asyncio
+import concurrent.futures
+import logging
 import pathlib
+from typing import AsyncIterator, Iterator, List, Optional
 
 # Build a module-level retriever so downstream callers (Streamlit app) can reuse it.
 _SYSTEM_PROMPT_PATH = pathlib.Path(
     os.path.join(pathlib.Path(__file__).parent, "prompts/system_prompt.txt")
 ).resolve()
 _USER_PROMPT_FILENAME = "user_prompt.txt"
+_SEMANTIC_CACHE = semantic_cache_from_env()
 _RETRIEVER = GraphCompletionRetrieverWithUserPrompt(
     user_prompt_filename=_USER_PROMPT_FILENAME,
     system_prompt_path=str(_SYSTEM_PROMPT_PATH),
     top_k=10,
+    semantic_cache=_SEMANTIC_CACHE,
 )
 
 
-def completion(query: str) -> str:
-    """Synchronous wrapper to fetch a completion from Cognee retriever."""
+def semantic_cache_stats() -> dict:
+    """Hit/miss metrics of the shared semantic cache (empty when disabled)."""
+    return _SEMANTIC_CACHE.stats() if _SEMANTIC_CACHE is not None else {}
 
-    async def _run():
-        import logging
-        logging.getLogger(__name__).debug("completion() query len=%d preview=%s", len(query or ""), (query or "")[:200])
-        return await _RETRIEVER.get_completion(query=query)
 
+def routing_stats() -> dict:
+    """Search-space size and latency of vendor-scoped vs global retrievals (see query_routing)."""
+    return _RETRIEVER.routing_metrics.stats()
+
+
+def projection_stats() -> dict:
+    """Size and load time of the in-memory graph projection used for expansion (see graph_projection)."""
+    return graph_projection.projection_stats()
+
+
+def fast_path_stats() -> dict:
+    """Questions answered by the direct graph-query fast path, per intent (see graph_fast_path)."""
+    return graph_fast_path.fast_path_stats()
+
+
+async def _fast_path_result(query: str) -> Optional[graph_fast_path.GraphQueryResult]:
+    """Direct graph-query rows for a recognised structured question, else None (use retrieval)."""
+    if not graph_fast_path.FAST_PATH_ENABLED:
+        return None
+    intent = graph_fast_path.detect_intent(query)
+    if intent is None:
+        return None
     try:
-        result = asyncio.run(_run())
-    except RuntimeError:
-        # If an event loop is already running (unlikely in Streamlit),
-        # fallback to creating a new loop.
-        loop = asyncio.new_event_loop()
-        try:
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(_run())
-        finally:
-            loop.close()
-            asyncio.set_event_loop(None)
+        result = await graph_fast_path.run_intent(intent)
+    except Exception as exc:
+        logging.getLogger(__name__).warning("graph fast path %s failed, using retrieval: %s", intent.name, exc)
+        return None
+    if not result.rows:
+        return None
+    logging.getLogger(__name__).debug(
+        "graph fast path %s: %d rows in %.3fs", intent.name, len(result.rows), result.elapsed_s
+    )
+    return result
+
+
+async def _fast_path_answer(query: str) -> Optional[str]:
+    """Summary + complete result table for a recognised structured question, else None."""
+    result = await _fast_path_result(query)
+    if result is None:
+        return None
+    summary = await generate_completion_with_user_prompt(
+        user_prompt=graph_fast_path.summary_prompt(query, result),
+        system_prompt_path=str(_SYSTEM_PROMPT_PATH),
+    )
+    return f"{summary}\n\n{result.to_markdown()}"
 
+
+async def _stream_completion(
+    query: str, response_format: Optional[dict] = None, use_cache: bool = True
+) -> AsyncIterator[str]:
+    """Deltas of the answer _get_completion gives: the fast-path summary then its table, or retrieval."""
+    result = await _fast_path_result(query) if response_format is None else None
+    if result is not None:
+        async for delta in stream_completion_with_user_prompt(
+            user_prompt=graph_fast_path.summary_prompt(query, result),
+            system_prompt_path=str(_SYSTEM_PROMPT_PATH),
+        ):
+            yield delta
+        yield f"\n\n{result.to_markdown()}"
+        return
+    async for delta in _RETRIEVER.stream_completion(query=query, response_format=response_format, use_cache=use_cache):
+        yield delta
+
+
+def _first_answer(result) -> str:
     if isinstance(result, list) and result:
         return result[0]
     return str(result)
 
+
+async def _get_completion(query: str, response_format: Optional[dict] = None, use_cache: bool = True) -> str:
+    logging.getLogger(__name__).debug("completion() query len=%d preview=%s", len(query or ""), (query or "")[:200])
+    if response_format is None:
+        answer = await _fast_path_answer(query)
+        if answer is not None:
+            return answer
+    return _first_answer(
+        await _RETRIEVER.get_completion(query=query, response_format=response_format, use_cache=use_cache)
+    )
+
+
+async def _warm_up() -> float:
+    try:
+        return await warm_up_llm(system_prompt_text(str(_SYSTEM_PROMPT_PATH)))
+    except Exception as exc:
+        logging.getLogger(__name__).warning("LLM warm-up failed (first request will load the model): %s", exc)
+        return 0.0
+
+
+def warm_up() -> "concurrent.futures.Future[float]":
+    """Load the SLM and prefill the system prompt on the background loop, without waiting for it."""
+    return get_runner().submit(_warm_up())
+
+
+def submit_completion(
+    query: str, response_format: Optional[dict] = None, use_cache: bool = True
+) -> "concurrent.futures.Future[str]":
+    """Schedule a completion on the shared background loop and return a future."""
+    return get_runner().submit(_get_completion(query, response_format, use_cache))
+
+
+def completion(
+    query: str, timeout: Optional[float] = None, response_format: Optional[dict] = None, use_cache: bool = True
+) -> str:
+    """Synchronous wrapper to fetch a completion from Cognee retriever.
+
+    Runs on the long-lived background loop so the LLM client, graph engine and vector DB
+    handles stay warm between calls; safe to call concurrently from several threads.
+    Short structured questions (payments to / invoices from a vendor, a SKU, one
+    document ID) are answered from a direct graph query first, see graph_fast_path.
+    `response_format` constrains the answer to a JSON schema (see core.schemas);
+    `use_cache=False` skips the semantic cache lookup (a forced refresh).
+    Raises RuntimeError when called from the runner loop itself (await completion_async there).
+    """
+    return get_runner().run(_get_completion(query, response_format, use_cache), timeout=timeout)
+
+
+async def completion_async(query: str, response_format: Optional[dict] = None, use_cache: bool = True) -> str:
+    """Async variant of completion() usable from any event loop."""
+    return await get_runner().run_async(_get_completion(query, response_format, use_cache))
+
+
+def completion_stream(
+    query: str, timeout: Optional[float] = None, response_format: Optional[dict] = None, use_cache: bool = True
+) -> Iterator[str]:
+    """Synchronous generator of completion deltas, streamed from the background loop.
+
+    Answers the same way as completion(): structured questions stream the fast-path
+    summary followed by the complete result table as the last chunk.
+    `timeout` bounds the wait for each chunk (None waits indefinitely).
+    """
+    logging.getLogger(__name__).debug("completion_stream() query len=%d", len(query or ""))
+    return get_runner().iterate(_stream_completion(query, response_format, use_cache), timeout=timeout)
+
+
+def vendor_names(timeout: Optional[float] = None) -> List[str]:
+    """Vendor node names in the graph (see graph_fast_path.vendor_names)."""
+    return get_runner().run(graph_fast_path.vendor_names(), timeout=timeout)
+
+
+def completion_many(
+    queries: List[str], max_concurrency: Optional[int] = None
+) -> List[QueryResult]:
+    """Answer a batch of queries concurrently on the background loop, in input order."""
+    return get_runner().run(_RETRIEVER.complete_many(queries, max_concurrency=max_concurrency))
+
+
 async def main():
     """
     QUICK README:
@@ -70,7 +209,9 @@ async def main():
     important in the custom retriever; just look for the use of "render_prompt()" function.
 
     To run a search, create an instance of the retriever with the desired user and system prompt,
-    and use the "get_completion()" function of the retriever to get search results.
+    and use the "get_completion()" function of the retriever to get search results. For many
+    questions at once, "complete_many()" answers them concurrently (bounded by OLLAMA_NUM_PARALLEL)
+    and returns the results in order, with per-question timing and errors.
 
     """
 
@@ -98,14 +239,15 @@ async def main():
         top_k=10,
     )
 
-    user_answers = []
-    for question in user_questions:
-        completion = await retriever.get_completion(query=question)
-        user_answers.append(completion)
+    results = await retriever.complete_many(user_questions)
 
-    for i in range(len(user_questions)):
-        print(f"Question: {user_questions[i]}")
-        print(f"Answer: {user_answers[i][0]}")
+    for result in results:
+        print(f"Question: {result.query}")
+        if result.ok:
+            print(f"Answer: {result.answer}")
+        else:
+            print(f"Error: {result.error}")
+        print(f"Time: {result.elapsed_s:.1f}s")
         print("-" * 50)
 
 
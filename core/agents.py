@@ -7,20 +7,110 @@ Agents:
 - Financial Anomaly Mini-Detective
 """
 
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+import logging
+import os
+
+import pandas as pd
+
+from .models import SEVERITIES, DashboardRow, ConciergeResult, AnomalyCard, MissingInvoiceReport
+from .cognee_client import ask_cognee_json, ask_cognee_raw, ask_cognee_stream, graph_vendor_names
+from .compact import compact_format
+from .json_stream import iter_json_array
+from .anomalies import anomaly_candidates, score_anomalies
+from .concierge import EXTRACTED_FIELDS, RISK_FIELDS, pre_extract, rule_risk
+from .cadence import SweepFinding, get_cadence_index, missing_invoice_sweep
+from .ledger import Ledger, load_ledger, vendor_name
+from .schemas import SchemaValidationError, array_schema, coerce_fields, from_json, json_schema, mapping_schema
+from .reconciliation import build_dashboard_rows, match_invoices
+from .split_payments import apply_split_matches, claimed_transaction_ids, find_split_payments, unmatched_documents
+
+logger = logging.getLogger(__name__)
+
+# Output constraints sent with each prompt (see core.schemas).
+_DASHBOARD_SCHEMA = array_schema(json_schema(DashboardRow))
+_ANOMALIES_SCHEMA = array_schema(json_schema(AnomalyCard))
+_ROW_EXPLANATIONS_SCHEMA = mapping_schema({"type": "string"}, title="RowExplanations")
+_CARD_EXPLANATIONS_SCHEMA = mapping_schema(
+    json_schema(AnomalyCard, ["human_explanation", "recommendation"]), title="CardExplanations"
+)
+_MISSING_SCHEMA = json_schema(MissingInvoiceReport)
+
+# Answer format of the LLM-generated dashboard/anomaly lists: "json" (array of objects)
+# or "tsv" (header + tab-separated lines with enum codes, see core.compact).
+WIRE_FORMATS = ("json", "tsv")
+WIRE_FORMAT = os.environ.get("AGENT_WIRE_FORMAT", "json").lower()
+
+
+# Sharded LLM dashboard: rows asked per shard prompt, and shards in flight at once
+# (matching the requests Ollama serves in parallel per model).
+SHARD_BY = ("vendor", "month")
+SHARD_LIMIT = 25
+SHARD_WORKERS = max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", "4")))
+
+
+def _check_wire_format(wire_format: str) -> str:
+    if wire_format not in WIRE_FORMATS:
+        raise ValueError(f"wire_format must be one of {WIRE_FORMATS}, got {wire_format!r}")
+    return wire_format
 
-from .models import DashboardRow, ConciergeResult, AnomalyCard
-from .cognee_client import ask_cognee_json
 
+def _reconcile(ledger: Ledger):
+    """1:1 matches plus split settlements for the whole ledger."""
+    matches = match_invoices(ledger)
+    return apply_split_matches(matches, find_split_payments(*unmatched_documents(ledger, matches)))
 
-def get_reconciliation_dashboard(limit: int = 50) -> List[DashboardRow]:
-    """Ask Cognee for a compact reconciliation overview."""
-    prompt = f"""You are a reconciliation dashboard generator.
+
+def _explain_rows(rows: List[DashboardRow], use_cache: bool = True) -> Dict[str, str]:
+    """One LLM call that writes short_explanation for the given (non-trivial) rows."""
+    if not rows:
+        return {}
+    lines = "\n".join(
+        f"- {r.invoice_id} | {r.vendor_name} | {r.amount:.2f} {r.currency} | "
+        f"{r.match_status}/{r.match_type} | engine note: {r.short_explanation}"
+        for r in rows
+    )
+    prompt = f"""You are a reconciliation analyst.
+
+The reconciliation engine already matched these invoices to payments deterministically.
+Using the Cognee knowledge graph of vendors, invoices and payments for context,
+write ONE short English sentence per invoice explaining its reconciliation status
+and what to check next. Do not change the status.
+
+Invoices:
+{lines}
+
+Return a single JSON object mapping each invoice_id to its sentence, no extra text.
+"""
+    data = ask_cognee_json(prompt, use_cache=use_cache, schema=_ROW_EXPLANATIONS_SCHEMA)
+    if not isinstance(data, dict) or "error" in data:
+        return {}
+    known = {r.invoice_id for r in rows}
+    return {str(k): str(v) for k, v in data.items() if str(k) in known and v}
+
+
+def _dashboard_prompt(limit: int, wire_format: str = "json", scope: str = "invoices") -> str:
+    if wire_format == "tsv":
+        return f"""You are a reconciliation dashboard generator.
+
+Using ONLY the Cognee knowledge graph of vendors, invoices and payments,
+summarize reconciliation and anomaly status for up to {limit} {scope}, one line per invoice.
+
+Columns:
+- invoice_id, vendor_name, currency: as stored in the graph
+- amount: plain number, no thousands separators
+- match_status, match_type, anomaly_severity: codes from the legend below
+- short_explanation: 1 short English sentence explaining the status
+
+{compact_format(DashboardRow).instructions()}
+"""
+    return f"""You are a reconciliation dashboard generator.
 
 Using ONLY the Cognee knowledge graph of vendors, invoices and payments,
 build a compact JSON array that summarizes reconciliation and anomaly status
-for up to {limit} invoices.
+for up to {limit} {scope}.
 
 Return a JSON array of objects, each with EXACTLY the following keys:
 - invoice_id: string
@@ -34,7 +124,35 @@ Return a JSON array of objects, each with EXACTLY the following keys:
 
 Respond with a single JSON array only, no extra keys or text. If you cannot produce a valid JSON array, return [].
 """
-    data = ask_cognee_json(prompt)
+
+
+_ROW_DEFAULTS = {
+    "amount": 0.0,
+    "currency": "EUR",
+    "match_status": "UNMATCHED",
+    "match_type": "NONE",
+    "anomaly_severity": "NONE",
+    "short_explanation": "",
+}
+
+
+def _row_from_dict(r) -> Optional[DashboardRow]:
+    try:
+        return from_json(DashboardRow, r, defaults=_ROW_DEFAULTS)
+    except SchemaValidationError as exc:
+        logger.debug("reconciliation: dropping invalid row (%s)", exc)
+        return None
+
+
+def _llm_dashboard_rows(
+    limit: int, use_cache: bool, wire_format: str, scope: str = "invoices"
+) -> List[DashboardRow]:
+    """Rows written by the LLM for one prompt (the whole graph or one shard)."""
+    if wire_format == "tsv":
+        raw = ask_cognee_raw(_dashboard_prompt(limit, "tsv", scope), use_cache=use_cache)
+        return [row for row in map(_row_from_dict, compact_format(DashboardRow).parse(str(raw))) if row is not None]
+
+    data = ask_cognee_json(_dashboard_prompt(limit, scope=scope), use_cache=use_cache, schema=_DASHBOARD_SCHEMA)
 
     rows: List[DashboardRow] = []
     if isinstance(data, list):
@@ -44,32 +162,233 @@ Respond with a single JSON array only, no extra keys or text. If you cannot prod
     else:
         raw_rows = []
 
-    import logging
-    logging.getLogger(__name__).debug("reconciliation raw_rows=%d data_error=%s", len(raw_rows), data.get("error") if isinstance(data, dict) else None)
+    logger.debug("reconciliation raw_rows=%d data_error=%s", len(raw_rows), data.get("error") if isinstance(data, dict) else None)
 
     for r in raw_rows:
-        try:
-            rows.append(
-                DashboardRow(
-                    invoice_id=str(r.get("invoice_id")),
-                    vendor_name=str(r.get("vendor_name")),
-                    amount=float(r.get("amount", 0.0)),
-                    currency=str(r.get("currency", "EUR")),
-                    match_status=str(r.get("match_status", "UNMATCHED")),
-                    match_type=str(r.get("match_type", "NONE")),
-                    anomaly_severity=str(r.get("anomaly_severity", "NONE")),
-                    short_explanation=str(r.get("short_explanation", "")),
-                )
-            )
-        except Exception:
-            continue
+        row = _row_from_dict(r)
+        if row is not None:
+            rows.append(row)
 
     return rows
 
 
-def run_concierge_on_invoice_text(raw_text: str) -> ConciergeResult:
-    """Run Agentic Invoice Concierge on raw invoice text via Cognee."""
-    prompt = f"""You are an Agentic Invoice Concierge.
+def dashboard_shards(shard_by: str, ledger: Optional[Ledger] = None) -> List[str]:
+    """Shard keys for a sharded dashboard: vendor names, or "YYYY-MM" issue months."""
+    if shard_by not in SHARD_BY:
+        raise ValueError(f"shard_by must be one of {SHARD_BY}, got {shard_by!r}")
+    ledger = ledger if ledger is not None else load_ledger()
+    invoices = ledger.invoices
+    if invoices.empty:
+        return []
+    if shard_by == "vendor":
+        return [vendor_name(v) for v in sorted(invoices["vendor_id"].dropna().unique())]
+    return [str(p) for p in sorted(invoices["date"].dropna().dt.to_period("M").unique())]
+
+
+def _shard_scope(shard_by: str, shard: str) -> str:
+    if shard_by == "vendor":
+        return f"invoices of {shard} (only this vendor)"
+    period = pd.Period(shard, freq="M")
+    return (
+        f"invoices issued in {shard} (between {period.start_time.date().isoformat()} "
+        f"and {period.end_time.date().isoformat()} only)"
+    )
+
+
+def _iter_sharded_rows(
+    shard_by: str,
+    shards: Sequence[str],
+    shard_limit: int,
+    use_cache: bool,
+    wire_format: str,
+    max_workers: int,
+) -> Iterator[DashboardRow]:
+    """One small prompt per shard, `max_workers` at a time, yielding rows as shards finish.
+
+    An invoice reported by several shards is yielded again only when the new row is more
+    severe (later rows replace earlier ones). A failing shard is logged and skipped so the
+    others still fill the dashboard.
+    """
+    rank = {s: i for i, s in enumerate(SEVERITIES)}
+    seen: Dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        futures = {
+            pool.submit(_llm_dashboard_rows, shard_limit, use_cache, wire_format, _shard_scope(shard_by, shard)): shard
+            for shard in shards
+        }
+        for future in as_completed(futures):
+            try:
+                rows = future.result()
+            except Exception as exc:
+                logger.warning("reconciliation: shard %s failed: %s", futures[future], exc)
+                continue
+            for row in rows:
+                severity = rank.get(row.anomaly_severity, 0)
+                if seen.get(row.invoice_id, -1) < severity:
+                    seen[row.invoice_id] = severity
+                    yield row
+
+
+def _shard_keys(shard_by: Optional[str], shards: Optional[Sequence[str]]) -> List[str]:
+    """Explicit `shards`, else the ledger's keys; vendors come from the graph when the ledger is empty."""
+    if shard_by is None:
+        return []
+    if shards is not None:
+        keys = list(shards)
+    else:
+        keys = dashboard_shards(shard_by)
+        if not keys and shard_by == "vendor":
+            # The LLM dashboard mostly runs without ledger CSVs; the graph still knows the vendors.
+            keys = graph_vendor_names()
+    if not keys:
+        logger.warning(
+            "reconciliation: no %s shard keys (%s); falling back to a single prompt", shard_by,
+            "empty ledger, pass shards=" if shard_by == "month" else "no vendors in the ledger or the graph",
+        )
+    return keys
+
+
+def get_reconciliation_dashboard(
+    limit: Optional[int] = 50,
+    use_cache: bool = True,
+    source: str = "auto",
+    explain_limit: int = 20,
+    wire_format: str = WIRE_FORMAT,
+    offset: int = 0,
+    shard_by: Optional[str] = None,
+    shards: Optional[Sequence[str]] = None,
+    shard_limit: int = SHARD_LIMIT,
+    max_workers: int = SHARD_WORKERS,
+) -> List[DashboardRow]:
+    """Reconciliation overview, most severe rows first; one page of `limit` rows from `offset`.
+
+    source="engine" matches the full ledger deterministically (core.reconciliation) and asks
+    the LLM only to explain up to `explain_limit` non-exact rows of the page; source="llm"
+    asks Cognee to produce the rows itself, as a JSON array or, with wire_format="tsv", as
+    compact tab-separated lines; "auto" uses the engine when the base invoices.csv is
+    present in the data directory (see core.ledger.ledger_files).
+    `limit=None` returns every invoice.
+
+    With source="llm", shard_by="vendor" or "month" splits the request into one prompt
+    per vendor / issue month (keys from `shards`, else the ledger; vendors fall back to
+    the graph when the ledger is empty), each asking for up to
+    `shard_limit` rows, answered `max_workers` at a time and merged by invoice_id. Without
+    shard keys it falls back to a single prompt.
+    """
+    _check_wire_format(wire_format)
+    page = slice(offset, None if limit is None else offset + limit)
+    if source in ("auto", "engine"):
+        ledger = load_ledger()
+        if not ledger.invoices.empty:
+            rows = build_dashboard_rows(_reconcile(ledger))[page]
+            to_explain = [r for r in rows if r.anomaly_severity != "NONE"][:explain_limit]
+            explanations = _explain_rows(to_explain, use_cache=use_cache) if explain_limit > 0 else {}
+            for r in rows:
+                if r.invoice_id in explanations:
+                    r.short_explanation = explanations[r.invoice_id]
+            return rows
+        if source == "engine":
+            return []
+        logger.debug("reconciliation: no ledger data, falling back to LLM-generated rows")
+
+    keys = _shard_keys(shard_by, shards)
+    if keys:
+        merged: Dict[str, DashboardRow] = {}
+        for row in _iter_sharded_rows(shard_by, keys, shard_limit, use_cache, wire_format, max_workers):
+            merged[row.invoice_id] = row
+        rank = {s: i for i, s in enumerate(SEVERITIES)}
+        return sorted(merged.values(), key=lambda r: (-rank.get(r.anomaly_severity, 0), r.invoice_id))[page]
+
+    return _llm_dashboard_rows((limit or 50) + offset, use_cache, wire_format)[page]
+
+
+def stream_reconciliation_dashboard(
+    limit: Optional[int] = 50,
+    use_cache: bool = True,
+    source: str = "auto",
+    explain_limit: int = 20,
+    wire_format: str = WIRE_FORMAT,
+    shard_by: Optional[str] = None,
+    shards: Optional[Sequence[str]] = None,
+    shard_limit: int = SHARD_LIMIT,
+    max_workers: int = SHARD_WORKERS,
+) -> Iterator[DashboardRow]:
+    """Progressive get_reconciliation_dashboard for the UI.
+
+    With the engine, every row is yielded at once with its template explanation and rows
+    the LLM then explains are yielded again (same invoice_id; later rows replace earlier
+    ones). With source="llm", rows are yielded one by one while the SLM is still writing,
+    or, when sharded, each shard's rows as soon as that shard completes.
+    """
+    _check_wire_format(wire_format)
+    if source in ("auto", "engine"):
+        ledger = load_ledger()
+        if not ledger.invoices.empty:
+            rows = build_dashboard_rows(_reconcile(ledger))
+            if limit is not None:
+                rows = rows[:limit]
+            yield from rows
+            to_explain = [r for r in rows if r.anomaly_severity != "NONE"][:explain_limit]
+            explanations = _explain_rows(to_explain, use_cache=use_cache) if explain_limit > 0 else {}
+            for r in to_explain:
+                if r.invoice_id in explanations:
+                    r.short_explanation = explanations[r.invoice_id]
+                    yield r
+            return
+        if source == "engine":
+            return
+
+    keys = _shard_keys(shard_by, shards)
+    if keys:
+        yield from _iter_sharded_rows(shard_by, keys, shard_limit, use_cache, wire_format, max_workers)
+        return
+
+    if wire_format == "tsv":
+        chunks = ask_cognee_stream(_dashboard_prompt(limit or 50, "tsv"), use_cache=use_cache)
+        raw_rows = compact_format(DashboardRow).iter_stream(chunks)
+    else:
+        chunks = ask_cognee_stream(_dashboard_prompt(limit or 50), use_cache=use_cache, schema=_DASHBOARD_SCHEMA)
+        raw_rows = iter_json_array(chunks)
+    for r in raw_rows:
+        row = _row_from_dict(r)
+        if row is not None:
+            yield row
+
+
+_CONCIERGE_KEYS = {
+    "invoice_id": 'string (if no explicit ID is present, generate a short synthetic ID like "NEW-INVOICE-1")',
+    "vendor_name": "string",
+    "amount": "number",
+    "currency": "string",
+    "issue_date": 'string (YYYY-MM-DD or "UNKNOWN")',
+    "due_date": 'string (YYYY-MM-DD or "UNKNOWN")',
+    "category": 'string ("SOFTWARE" | "MARKETING" | "TRAVEL" | "HARDWARE" | "SERVICES" | "OTHER")',
+    "risk_score": "number between 0.0 and 1.0",
+    "risk_label": 'string ("LOW" | "MEDIUM" | "HIGH")',
+    "triage_status": 'string ("READY_FOR_RECON" | "NEEDS_REVIEW")',
+}
+
+
+def run_concierge_on_invoice_text(
+    raw_text: str, use_cache: bool = True, llm_risk: bool = False
+) -> ConciergeResult:
+    """Run Agentic Invoice Concierge on raw invoice text.
+
+    Fields that core.concierge.pre_extract reads off the text directly are not sent to
+    the LLM; Cognee is asked only for the remaining ones (and for risk when
+    `llm_risk=True`, otherwise risk is scored by rules against the ledger). A fully
+    extracted invoice needs no LLM call at all.
+    """
+    fields = pre_extract(raw_text)
+    wanted = [k for k in EXTRACTED_FIELDS if k not in fields]
+    if llm_risk:
+        wanted += RISK_FIELDS + ["triage_status"]
+
+    data: Dict = {}
+    if wanted:
+        keys = "\n".join(f"- {k}: {_CONCIERGE_KEYS[k]}" for k in wanted)
+        known = "\n".join(f"- {k}: {v}" for k, v in fields.items()) or "- (none)"
+        prompt = f"""You are an Agentic Invoice Concierge.
 
 You will receive raw invoice text from a user. The text may contain:
 - vendor name,
@@ -80,47 +399,165 @@ You will receive raw invoice text from a user. The text may contain:
 Your task:
 1. Interpret the text as a single invoice.
 2. Normalize and summarise it.
-3. Assign a high-level spend category and a simple risk assessment.
+3. Fill in ONLY the fields that are still missing.
+
+These fields were already extracted from the text:
+{known}
 
 Using ONLY the text provided below, and your internal knowledge of common invoice patterns,
 produce a JSON object with EXACTLY the following keys:
 
-- invoice_id: string (if no explicit ID is present, generate a short synthetic ID like "NEW-INVOICE-1")
-- vendor_name: string
-- amount: number
-- currency: string
-- issue_date: string (YYYY-MM-DD or "UNKNOWN")
-- due_date: string (YYYY-MM-DD or "UNKNOWN")
-- category: string ("SOFTWARE" | "MARKETING" | "TRAVEL" | "HARDWARE" | "SERVICES" | "OTHER")
-- risk_score: number between 0.0 and 1.0
-- risk_label: string ("LOW" | "MEDIUM" | "HIGH")
-- triage_status: string ("READY_FOR_RECON" | "NEEDS_REVIEW")
+{keys}
 
 Raw invoice text:
 \"\"\"{raw_text}\"\"\" 
 
 Return ONLY the JSON object, with no extra commentary.
 """
-    data = ask_cognee_json(prompt)
+        data = ask_cognee_json(prompt, use_cache=use_cache, schema=json_schema(ConciergeResult, wanted))
+        if not isinstance(data, dict):
+            data = {}
+    answered = {}
+    for k in wanted:
+        try:
+            answered.update(coerce_fields(ConciergeResult, data, [k]))
+        except SchemaValidationError as exc:
+            logger.debug("concierge: ignoring invalid field (%s)", exc)
+    merged = {**{k: v for k, v in answered.items() if v is not None}, **fields}
+
+    if llm_risk and "risk_score" in merged:
+        risk_score, risk_label = float(merged["risk_score"]), str(merged.get("risk_label", "LOW"))
+        triage = str(merged.get("triage_status", "READY_FOR_RECON"))
+    else:
+        risk_score, risk_label, _ = rule_risk(merged, load_ledger())
+        triage = "READY_FOR_RECON" if risk_label == "LOW" else "NEEDS_REVIEW"
 
     return ConciergeResult(
-        invoice_id=str(data.get("invoice_id", "NEW-INVOICE")),
-        vendor_name=str(data.get("vendor_name", "UNKNOWN VENDOR")),
-        amount=float(data.get("amount", 0.0)),
-        currency=str(data.get("currency", "EUR")),
-        issue_date=str(data.get("issue_date", "UNKNOWN")),
-        due_date=str(data.get("due_date", "UNKNOWN")),
-        category=str(data.get("category", "OTHER")),
-        risk_score=float(data.get("risk_score", 0.0)),
-        risk_label=str(data.get("risk_label", "LOW")),
-        triage_status=str(data.get("triage_status", "READY_FOR_RECON")),
+        invoice_id=str(merged.get("invoice_id", "NEW-INVOICE")),
+        vendor_name=str(merged.get("vendor_name", "UNKNOWN VENDOR")),
+        amount=float(merged.get("amount", 0.0)),
+        currency=str(merged.get("currency", "EUR")),
+        issue_date=str(merged.get("issue_date", "UNKNOWN")),
+        due_date=str(merged.get("due_date", "UNKNOWN")),
+        category=str(merged.get("category", "OTHER")),
+        risk_score=risk_score,
+        risk_label=risk_label,
+        triage_status=triage,
     )
 
 
-def get_global_anomalies(limit: int = 20) -> List[AnomalyCard]:
-    """Ask Cognee for a list of the most important anomalies."""
+def _is_directory(path: Union[str, Path]) -> bool:
+    """Path(path).is_dir(), False for invoice text that is no valid path (e.g. over the name limit)."""
+    if isinstance(path, str) and ("\n" in path or len(path) > 4096):
+        return False
+    try:
+        return Path(path).is_dir()
+    except (OSError, ValueError):
+        return False
+
+
+def _concierge_sources(texts: Union[Iterable[str], str, Path]) -> Iterator[Tuple[str, str]]:
+    """(source, text) pairs: the *.txt files of a directory, else the texts by position.
+
+    A Path must be a directory; a str is a directory only if one exists at that path,
+    otherwise it is a single invoice text (never iterated character by character).
+    """
+    if isinstance(texts, Path) or (isinstance(texts, str) and _is_directory(texts)):
+        directory = Path(texts)
+        if not _is_directory(directory):
+            raise NotADirectoryError(f"not a directory of invoice texts: {directory}")
+        for path in sorted(directory.glob("*.txt")):
+            yield path.name, path.read_text(errors="replace")
+    elif isinstance(texts, str):
+        yield "0", texts
+    else:
+        for i, text in enumerate(texts):
+            yield str(i), text
+
+
+def run_concierge_batch(
+    texts: Union[Iterable[str], str, Path],
+    max_workers: int = 8,
+    use_cache: bool = True,
+    llm_risk: bool = False,
+) -> Iterator[Tuple[str, Union[ConciergeResult, Exception]]]:
+    """Run the concierge over many invoices, yielding (source, result) as each one finishes.
+
+    `texts` is an iterable of invoice texts (source = position), a single text (source
+    "0"), or a directory of `*.txt` OCR dumps (source = file name) given as a Path or
+    as a string naming an existing directory. At most `max_workers` invoices are in flight
+    and at most twice that many are read ahead, so arbitrarily large inboxes stream
+    through in bounded memory. A failing invoice yields its exception instead of a result.
+    """
+    sources = _concierge_sources(texts)
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        pending = {}
+        for source, text in sources:
+            pending[pool.submit(run_concierge_on_invoice_text, text, use_cache, llm_risk)] = source
+            if len(pending) < 2 * max(max_workers, 1):
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield _concierge_outcome(pending.pop(future), future)
+        for future in as_completed(list(pending)):
+            yield _concierge_outcome(pending.pop(future), future)
+
+
+def _concierge_outcome(source: str, future) -> Tuple[str, Union[ConciergeResult, Exception]]:
+    try:
+        return source, future.result()
+    except Exception as exc:
+        logger.warning("concierge failed for %s: %s", source, exc)
+        return source, exc
+
+
+def _explain_cards(cards: List[AnomalyCard], use_cache: bool = True) -> Dict[str, Dict[str, str]]:
+    """One LLM call that rewrites human_explanation/recommendation for pre-scored cards."""
+    if not cards:
+        return {}
+    lines = "\n".join(
+        f"- {c.invoice_id} | {c.vendor_name} | {c.severity} | {', '.join(c.reason_codes)} | "
+        f"findings: {c.human_explanation}"
+        for c in cards
+    )
     prompt = f"""You are a Financial Anomaly Mini-Detective.
 
+A statistical scorer already flagged these documents and assigned reason codes and severity.
+Using the Cognee knowledge graph of vendors, invoices and payments for context, write for each:
+- human_explanation: 1-3 sentences explaining why it is anomalous
+- recommendation: 1-2 sentences with a clear next step
+Do not change the severity or reason codes.
+
+Flagged documents:
+{lines}
+
+Return a single JSON object mapping each id to {{"human_explanation": ..., "recommendation": ...}}, no extra text.
+"""
+    data = ask_cognee_json(prompt, use_cache=use_cache, schema=_CARD_EXPLANATIONS_SCHEMA)
+    if not isinstance(data, dict) or "error" in data:
+        return {}
+    known = {c.invoice_id for c in cards}
+    return {str(k): v for k, v in data.items() if str(k) in known and isinstance(v, dict)}
+
+
+def _anomalies_prompt(limit: int, wire_format: str = "json") -> str:
+    if wire_format == "tsv":
+        return f"""You are a Financial Anomaly Mini-Detective.
+
+Using ONLY the Cognee knowledge graph of vendors, invoices and payments,
+identify up to {limit} of the most relevant anomalies in the current data, one line per anomaly.
+
+Columns:
+- invoice_id, vendor_name: as stored in the graph
+- severity: code from the legend below
+- reason_codes: short codes (e.g. AMOUNT_OUTLIER,NO_MATCH)
+- human_explanation: 1–3 sentences
+- recommendation: 1–2 sentences with a clear next step
+
+{compact_format(AnomalyCard).instructions()}
+"""
+    return f"""You are a Financial Anomaly Mini-Detective.
+
 Using ONLY the Cognee knowledge graph of vendors, invoices and payments,
 identify up to {limit} of the most relevant anomalies in the current data.
 
@@ -134,30 +571,106 @@ Return a JSON array of objects, each with EXACTLY:
 
 Respond with a single JSON array only, no extra keys. If you cannot produce a valid JSON array, return [].
 """
-    data = ask_cognee_json(prompt)
 
-    cards: List[AnomalyCard] = []
+
+_CARD_DEFAULTS = {"severity": "LOW", "reason_codes": [], "human_explanation": "", "recommendation": ""}
+
+
+def _card_from_dict(c) -> Optional[AnomalyCard]:
+    try:
+        return from_json(AnomalyCard, c, defaults=_CARD_DEFAULTS)
+    except SchemaValidationError as exc:
+        logger.debug("anomalies: dropping invalid card (%s)", exc)
+        return None
+
+
+def _engine_cards(limit: int, use_cache: bool, explain_limit: int, batch_size: int) -> Iterator[AnomalyCard]:
+    """Pre-scored cards, then each LLM-reworded batch again (same invoice_id)."""
+    ledger = load_ledger()
+    cards = anomaly_candidates(score_anomalies(ledger, _reconcile(ledger)), limit)
+    yield from cards
+    to_explain = cards[:max(explain_limit, 0)]
+    for start in range(0, len(to_explain), max(batch_size, 1)):
+        batch = to_explain[start:start + max(batch_size, 1)]
+        written = _explain_cards(batch, use_cache=use_cache)
+        for card in batch:
+            text = written.get(card.invoice_id, {})
+            card.human_explanation = str(text.get("human_explanation") or card.human_explanation)
+            card.recommendation = str(text.get("recommendation") or card.recommendation)
+        yield from batch
+
+
+def get_global_anomalies(
+    limit: int = 20,
+    use_cache: bool = True,
+    source: str = "auto",
+    explain_limit: int = 10,
+    batch_size: int = 10,
+    wire_format: str = WIRE_FORMAT,
+) -> List[AnomalyCard]:
+    """Most important anomalies, highest score first.
+
+    source="engine" scores the full ledger (core.anomalies) and asks the LLM only to word
+    the explanation/recommendation of the top `explain_limit` cards, one call per
+    `batch_size` cards; source="llm" asks Cognee to find anomalies itself (JSON array or,
+    with wire_format="tsv", compact tab-separated lines); "auto" uses the engine when
+    the base ledger CSVs are present (see core.ledger.ledger_files).
+    """
+    _check_wire_format(wire_format)
+    if source in ("auto", "engine"):
+        if not load_ledger().is_empty:
+            cards: Dict[str, AnomalyCard] = {}
+            for card in _engine_cards(limit, use_cache, explain_limit, batch_size):
+                cards[card.invoice_id] = card
+            return list(cards.values())
+        if source == "engine":
+            return []
+        logger.debug("anomalies: no ledger data, falling back to LLM-generated cards")
+
+    if wire_format == "tsv":
+        raw = ask_cognee_raw(_anomalies_prompt(limit, "tsv"), use_cache=use_cache)
+        return [card for card in map(_card_from_dict, compact_format(AnomalyCard).parse(str(raw))) if card is not None]
+
+    data = ask_cognee_json(_anomalies_prompt(limit), use_cache=use_cache, schema=_ANOMALIES_SCHEMA)
+
     raw_cards = data if isinstance(data, list) else data.get("anomalies", [])
+    logger.debug("anomalies raw_cards=%d data_error=%s", len(raw_cards), data.get("error") if isinstance(data, dict) else None)
+
+    return [card for card in map(_card_from_dict, raw_cards) if card is not None]
+
 
-    import logging
-    logging.getLogger(__name__).debug("anomalies raw_cards=%d data_error=%s", len(raw_cards), data.get("error") if isinstance(data, dict) else None)
+def stream_global_anomalies(
+    limit: int = 20,
+    use_cache: bool = True,
+    source: str = "auto",
+    explain_limit: int = 10,
+    batch_size: int = 10,
+    wire_format: str = WIRE_FORMAT,
+) -> Iterator[AnomalyCard]:
+    """Progressive get_global_anomalies for the UI.
 
+    With the engine, all pre-scored cards are yielded at once and each LLM-reworded batch
+    again as it completes (same invoice_id; later cards replace earlier ones). With
+    source="llm", cards are yielded one by one while the SLM is still writing.
+    """
+    _check_wire_format(wire_format)
+    if source in ("auto", "engine"):
+        if not load_ledger().is_empty:
+            yield from _engine_cards(limit, use_cache, explain_limit, batch_size)
+            return
+        if source == "engine":
+            return
+
+    if wire_format == "tsv":
+        chunks = ask_cognee_stream(_anomalies_prompt(limit, "tsv"), use_cache=use_cache)
+        raw_cards = compact_format(AnomalyCard).iter_stream(chunks)
+    else:
+        chunks = ask_cognee_stream(_anomalies_prompt(limit), use_cache=use_cache, schema=_ANOMALIES_SCHEMA)
+        raw_cards = iter_json_array(chunks)
     for c in raw_cards:
-        try:
-            cards.append(
-                AnomalyCard(
-                    invoice_id=str(c.get("invoice_id")),
-                    vendor_name=str(c.get("vendor_name")),
-                    severity=str(c.get("severity", "LOW")),
-                    reason_codes=list(c.get("reason_codes", [])),
-                    human_explanation=str(c.get("human_explanation", "")),
-                    recommendation=str(c.get("recommendation", "")),
-                )
-            )
-        except Exception:
-            continue
-
-    return cards
+        card = _card_from_dict(c)
+        if card is not None:
+            yield card
 
 
 # --- Missing Invoice Detective ---
@@ -178,12 +691,13 @@ def _load_missing_prompt() -> str:
 
 
 def run_missing_invoice_detective(
-    vendor: str, period: str, cadence_hint: str = "unknown"
+    vendor: str, period: str, cadence_hint: str = "unknown", use_cache: bool = True
 ):
     """
     Run Missing Invoice Detective using the custom prompt template.
 
-    Returns parsed JSON (dict) or an error object.
+    The answer is constrained to and validated against MissingInvoiceReport; returns
+    its dict form, or an error object.
     """
     template = _load_missing_prompt()
     if not template:
@@ -195,4 +709,47 @@ def run_missing_invoice_detective(
         .replace("{{CADENCE_HINT}}", cadence_hint or "unknown")
     )
 
-    return ask_cognee_json(filled)
+    data = ask_cognee_json(filled, use_cache=use_cache, schema=_MISSING_SCHEMA)
+    if isinstance(data, dict) and "error" in data:
+        return data
+    try:
+        return from_json(MissingInvoiceReport, data, defaults={"vendor": vendor, "period": period}).to_dict()
+    except SchemaValidationError as exc:
+        return {"error": f"Missing Invoice Detective answer does not fit the schema: {exc}", "raw_response": data}
+
+
+def run_missing_invoice_sweep(
+    start: str,
+    end: str,
+    freq: str = "M",
+    llm_limit: int = 20,
+    max_workers: int = 4,
+    use_cache: bool = True,
+) -> List[SweepFinding]:
+    """Missing-invoice check for every vendor x period between `start` and `end`.
+
+    Uses the precomputed cadence index (core.cadence) to decide most vendor/periods
+    deterministically; only AMBIGUOUS ones (up to `llm_limit`) are sent to the Missing
+    Invoice Detective prompt, `max_workers` at a time. Returns [] when no ledger is loaded.
+    """
+    ledger = load_ledger()
+    if ledger.is_empty:
+        return []
+    claimed = claimed_transaction_ids(_reconcile(ledger)) if not ledger.invoices.empty else set()
+    unclaimed = ledger.transactions.loc[~ledger.transactions["transaction_id"].isin(claimed), "transaction_id"]
+    findings = missing_invoice_sweep(ledger, start, end, freq, unclaimed_transaction_ids=unclaimed.tolist())
+
+    ambiguous = [f for f in findings if f.status == "AMBIGUOUS"][:max(llm_limit, 0)]
+    if ambiguous:
+        index = get_cadence_index(ledger)
+
+        def detect(finding: SweepFinding):
+            period = pd.Period(finding.period, freq=freq)
+            window = f"{period.start_time.date().isoformat()} to {period.end_time.date().isoformat()}"
+            hint = index[finding.vendor_id].cadence if finding.vendor_id in index else "unknown"
+            return run_missing_invoice_detective(finding.vendor_name, window, hint, use_cache=use_cache)
+
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+            for finding, result in zip(ambiguous, pool.map(detect, ambiguous)):
+                finding.detective = result if isinstance(result, dict) else {"result": result}
+    return findings
@@ -0,0 +1,241 @@
+"""Vectorized anomaly pre-scoring over the full ledger.
+
+Every invoice and transaction is checked by cheap statistical rules before any
+LLM call:
+
+- PRICE_OUTLIER: unit price z-score within the vendor's SKU (or the SKU overall
+  when the vendor has too few observations),
+- DISCOUNT_OUTLIER: robust (median/MAD) z-score of the discount rate,
+- TOTAL_MISMATCH: invoice total differs from the sum of its line items,
+- PAID_BEFORE_ISSUE: the matching payment is dated before the invoice,
+- NO_MATCH / UNDERPAID / OVERPAID / ITEMS_MISMATCH / UNMATCHED_PAYMENT from the
+  reconciliation engine.
+
+Findings are weighted, summed per document and ranked; the top candidates become
+AnomalyCards whose explanation/recommendation the LLM may then rewrite.
+"""
+
+import logging
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .ledger import Ledger, vendor_name
+from .models import AnomalyCard
+from .reconciliation import match_invoices
+from .split_payments import claimed_transaction_ids
+
+logger = logging.getLogger(__name__)
+
+# |z| at or above which a unit price is an outlier, and the smallest group it is computed on.
+PRICE_Z_THRESHOLD = 3.0
+MIN_GROUP_SIZE = 3
+# Robust z (0.6745 * deviation / MAD) at or above which a discount rate is an outlier.
+DISCOUNT_Z_THRESHOLD = 3.5
+# Currency units below which totals are considered equal.
+AMOUNT_EPSILON = 0.01
+
+_MATCH_FINDINGS = {
+    2: ("ITEMS_MISMATCH", 1.0, "amount matches {tx} but the SKU/quantity lines differ"),
+    3: ("UNDERPAID", 1.5, "{tx} pays {abs_delta:.2f} less than invoiced"),
+    4: ("OVERPAID", 2.0, "{tx} pays {abs_delta:.2f} more than invoiced"),
+    5: ("NO_MATCH", 1.5, "no payment matches this invoice"),
+}
+
+_RECOMMENDATIONS = {
+    "OVERPAID": "Ask the vendor for a credit note or refund of the overpayment.",
+    "UNDERPAID": "Confirm whether the short payment was agreed; otherwise chase the balance.",
+    "NO_MATCH": "Check whether the invoice was paid from another account or is still open.",
+    "UNMATCHED_PAYMENT": "Request the invoice that this payment settles.",
+    "PRICE_OUTLIER": "Compare the unit price with the vendor's contract or price list.",
+    "DISCOUNT_OUTLIER": "Verify that the discount was approved and is reflected on the invoice.",
+    "TOTAL_MISMATCH": "Recompute the invoice total from its line items and ask the vendor to correct it.",
+    "PAID_BEFORE_ISSUE": "Check whether this was a prepayment and attach the order confirmation.",
+    "ITEMS_MISMATCH": "Compare delivered SKUs and quantities with the invoice lines.",
+}
+
+_FINDING_COLUMNS = ["document_id", "vendor_id", "reason_code", "weight", "detail"]
+
+
+def _findings(document_id, vendor_id, code: str, weight, detail) -> pd.DataFrame:
+    n = len(document_id)
+    return pd.DataFrame({
+        "document_id": np.asarray(document_id, dtype=object),
+        "vendor_id": np.asarray(vendor_id),
+        "reason_code": np.full(n, code, dtype=object),
+        "weight": np.broadcast_to(np.asarray(weight, dtype=float), (n,)),
+        "detail": np.asarray(detail, dtype=object),
+    })
+
+
+def _price_findings(items: pd.DataFrame) -> pd.DataFrame:
+    """Unit-price z-scores per (vendor, SKU), falling back to the SKU across vendors."""
+    if items.empty:
+        return pd.DataFrame(columns=_FINDING_COLUMNS)
+    price = items["price"].to_numpy(dtype=float)
+    z = np.full(len(items), np.nan)
+    for keys in (["sku"], ["vendor_id", "sku"]):  # vendor-level z overrides the SKU-level one
+        grouped = items.groupby(keys, sort=False)["price"]
+        count = grouped.transform("count").to_numpy()
+        mean = grouped.transform("mean").to_numpy(dtype=float)
+        std = grouped.transform("std").to_numpy(dtype=float)
+        usable = (count >= MIN_GROUP_SIZE) & (std > 0)
+        z = np.where(usable, (price - mean) / np.where(usable, std, 1.0), z)
+    flagged = np.flatnonzero(np.abs(np.nan_to_num(z)) >= PRICE_Z_THRESHOLD)
+    rows = items.iloc[flagged]
+    detail = [
+        f"unit price {p:.2f} for {sku} is {zz:+.1f} standard deviations from its usual price"
+        for p, sku, zz in zip(price[flagged], rows["sku"], z[flagged])
+    ]
+    return _findings(rows["document_id"].to_numpy(), rows["vendor_id"].to_numpy(), "PRICE_OUTLIER",
+                     np.minimum(np.abs(z[flagged]) / PRICE_Z_THRESHOLD, 3.0), detail)
+
+
+def _discount_findings(transactions: pd.DataFrame, document_ids: np.ndarray) -> pd.DataFrame:
+    """Robust z-score of discount / (amount + discount) across all discounted payments."""
+    gross = (transactions["amount"] + transactions["discount"]).to_numpy(dtype=float)
+    discount = transactions["discount"].to_numpy(dtype=float)
+    discounted = np.flatnonzero((discount > 0) & (gross > 0))
+    if discounted.size < MIN_GROUP_SIZE:
+        return pd.DataFrame(columns=_FINDING_COLUMNS)
+    rate = discount[discounted] / gross[discounted]
+    median = np.median(rate)
+    mad = np.median(np.abs(rate - median))
+    if mad == 0:
+        return pd.DataFrame(columns=_FINDING_COLUMNS)
+    z = 0.6745 * (rate - median) / mad
+    hit = np.abs(z) >= DISCOUNT_Z_THRESHOLD
+    idx = discounted[hit]
+    detail = [
+        f"discount {d:.2f} on {tx} is {r:.1%} of the gross amount (typical {median:.1%})"
+        for d, tx, r in zip(discount[idx], transactions["transaction_id"].to_numpy()[idx], rate[hit])
+    ]
+    return _findings(document_ids[idx], transactions["vendor_id"].to_numpy()[idx], "DISCOUNT_OUTLIER",
+                     np.minimum(np.abs(z[hit]) / DISCOUNT_Z_THRESHOLD, 3.0), detail)
+
+
+def _total_findings(invoices: pd.DataFrame, paid_by: pd.Series, transactions: pd.DataFrame) -> pd.DataFrame:
+    """Invoice total vs. sum of line items; a gap equal to the payment's discount weighs less."""
+    has_items = invoices["items_total"].to_numpy(dtype=float) > 0
+    gap = invoices["items_total"].to_numpy(dtype=float) - invoices["total"].to_numpy(dtype=float)
+    idx = np.flatnonzero(has_items & (np.abs(gap) > AMOUNT_EPSILON))
+    discounts = transactions.set_index("transaction_id")["discount"]
+    tx = paid_by.to_numpy(dtype=object)[idx]
+    tx_discount = pd.Series(tx).map(discounts).to_numpy(dtype=float)
+    explained = np.abs(tx_discount - gap[idx]) <= AMOUNT_EPSILON
+    detail = [
+        f"total is {abs(g):.2f} {'below' if g > 0 else 'above'} the sum of its line items"
+        + (f" ({g:.2f} equals the discount on {t})" if e else "")
+        for g, t, e in zip(gap[idx], tx, explained)
+    ]
+    return _findings(invoices["invoice_id"].to_numpy()[idx], invoices["vendor_id"].to_numpy()[idx],
+                     "TOTAL_MISMATCH", np.where(explained, 0.5, 1.5), detail)
+
+
+def _timing_findings(invoices: pd.DataFrame, paid_by: pd.Series, transactions: pd.DataFrame) -> pd.DataFrame:
+    """Payments dated before the invoice they settle."""
+    if transactions.empty:  # Series.map casts an empty datetime mapper to float
+        return _findings(np.empty(0, dtype=object), np.empty(0, dtype=object), "PAID_BEFORE_ISSUE", 0.0, [])
+    tx_dates = paid_by.map(transactions.set_index("transaction_id")["date"]).to_numpy(dtype="datetime64[ns]")
+    gap = invoices["date"].to_numpy(dtype="datetime64[ns]") - tx_dates
+    days = np.where(np.isnat(gap), 0, gap.astype("timedelta64[D]").astype(np.int64)).astype(float)
+    idx = np.flatnonzero(days > 0)
+    detail = [f"paid by {t} {int(d)} days before the invoice date" for t, d in zip(paid_by.to_numpy()[idx], days[idx])]
+    return _findings(invoices["invoice_id"].to_numpy()[idx], invoices["vendor_id"].to_numpy()[idx],
+                     "PAID_BEFORE_ISSUE", np.minimum(0.5 + days[idx] / 30.0, 2.0), detail)
+
+
+def _match_findings(matches: pd.DataFrame) -> pd.DataFrame:
+    frames = []
+    tiers = matches["tier"].to_numpy()
+    for tier, (code, weight, template) in _MATCH_FINDINGS.items():
+        rows = matches[tiers == tier]
+        detail = [template.format(tx=tx, abs_delta=abs(d)) for tx, d in zip(rows["transaction_id"], rows["delta"])]
+        frames.append(_findings(rows["invoice_id"].to_numpy(), rows["vendor_id"].to_numpy(), code, weight, detail))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _severity(score: np.ndarray) -> np.ndarray:
+    return np.select([score >= 3.0, score >= 1.5], ["HIGH", "MEDIUM"], "LOW")
+
+
+def score_anomalies(ledger: Ledger, matches: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """One row per document with at least one finding, highest score first.
+
+    Columns: document_id (invoice id, or transaction id for payments no invoice claims),
+    vendor_id, score, severity, reason_codes, details. Pass `matches` (match_invoices output,
+    optionally with split matches applied) to avoid recomputing them.
+    """
+    if matches is None:
+        matches = match_invoices(ledger)
+    invoices, transactions = ledger.invoices, ledger.transactions
+
+    # Transactions are reported under the invoice they pay; only 1:1 payers are linked.
+    paid_by = invoices["invoice_id"].map(
+        matches.loc[matches["tier"] < 5].set_index("invoice_id")["transaction_id"]
+    ).where(lambda s: ~s.astype(str).str.contains(",", regex=False))
+    tx_to_invoice = pd.Series(invoices["invoice_id"].to_numpy(), index=paid_by.to_numpy()).dropna()
+    tx_to_invoice = tx_to_invoice[tx_to_invoice.index.notna()]
+    tx_ids = transactions["transaction_id"]
+    tx_documents = tx_ids.map(tx_to_invoice[~tx_to_invoice.index.duplicated()]).fillna(tx_ids).to_numpy(dtype=object)
+
+    orphan = np.flatnonzero(~tx_ids.isin(claimed_transaction_ids(matches)).to_numpy())
+    items = pd.concat([
+        ledger.invoice_items.rename(columns={"invoice_id": "document_id"}),
+        ledger.transaction_items.assign(
+            document_id=ledger.transaction_items["transaction_id"].map(
+                pd.Series(tx_documents, index=tx_ids.to_numpy())
+            )
+        ).drop(columns="transaction_id"),
+    ], ignore_index=True)
+
+    findings = pd.concat([
+        _match_findings(matches),
+        _findings(tx_ids.to_numpy()[orphan], transactions["vendor_id"].to_numpy()[orphan], "UNMATCHED_PAYMENT",
+                  1.0, ["payment does not settle any invoice"] * orphan.size),
+        _price_findings(items),
+        _discount_findings(transactions, tx_documents),
+        _total_findings(invoices, paid_by, transactions),
+        _timing_findings(invoices, paid_by, transactions),
+    ], ignore_index=True)
+    if findings.empty:
+        return pd.DataFrame(columns=["document_id", "vendor_id", "score", "severity", "reason_codes", "details"])
+
+    # The same rule can fire on an invoice line and its payment line; keep the strongest.
+    findings = findings.sort_values(["document_id", "weight"], ascending=[True, False], kind="stable")
+    findings = findings.drop_duplicates(["document_id", "reason_code"])
+    documents, starts = np.unique(findings["document_id"].to_numpy(dtype=str), return_index=True)
+    scored = pd.DataFrame({
+        "document_id": documents.astype(object),
+        "vendor_id": findings["vendor_id"].to_numpy()[starts],
+        "score": np.add.reduceat(findings["weight"].to_numpy(dtype=float), starts),
+        "reason_codes": [list(c) for c in np.split(findings["reason_code"].to_numpy(), starts[1:])],
+        "details": [list(d) for d in np.split(findings["detail"].to_numpy(), starts[1:])],
+    })
+    scored["severity"] = _severity(scored["score"].to_numpy())
+    scored = scored.sort_values("score", ascending=False, kind="stable").reset_index(drop=True)
+    logger.debug("score_anomalies findings=%d documents=%d", len(findings), len(scored))
+    return scored[["document_id", "vendor_id", "score", "severity", "reason_codes", "details"]]
+
+
+def anomaly_candidates(scored: pd.DataFrame, limit: Optional[int] = 20) -> List[AnomalyCard]:
+    """AnomalyCards with deterministic explanation/recommendation for the top `limit` documents."""
+    rows = scored if limit is None else scored.head(limit)
+    cards: List[AnomalyCard] = []
+    for document_id, vendor_id, severity, codes, details in zip(
+        rows["document_id"], rows["vendor_id"], rows["severity"], rows["reason_codes"], rows["details"]
+    ):
+        explanation = "; ".join(details[:3])
+        cards.append(
+            AnomalyCard(
+                invoice_id=str(document_id),
+                vendor_name=vendor_name(vendor_id),
+                severity=str(severity),
+                reason_codes=list(codes),
+                human_explanation=explanation[:1].upper() + explanation[1:] + ".",
+                recommendation=_RECOMMENDATIONS.get(codes[0], "Review the document with the vendor."),
+            )
+        )
+    return cards
+
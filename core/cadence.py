@@ -0,0 +1,214 @@
+"""Per-vendor invoice cadence index and the all-vendor missing-invoice sweep.
+
+The index is built once per ledger: each vendor's sorted invoice dates, the
+median gap between them, how regular that gap is and the expected next dates.
+The sweep walks every vendor x period and decides deterministically:
+
+- OK: every expected invoice window in the period contains an invoice,
+- MISSING: the cadence is regular and an expected window is empty,
+- AMBIGUOUS: the cadence is unknown/irregular but payments no invoice claims
+  fall in the period; only these need the Missing Invoice Detective prompt,
+- NO_EVIDENCE: nothing expected and nothing unexplained.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .ledger import Ledger, vendor_name
+
+logger = logging.getLogger(__name__)
+
+# Fewest invoices needed before a cadence is inferred from the gaps.
+MIN_INVOICES = 3
+# Gap dispersion (MAD / median gap) up to which a cadence counts as regular.
+REGULARITY = 0.25
+# Half-width of an expected window as a fraction of the median gap (at least MIN_SLACK_DAYS).
+WINDOW_FRACTION = 0.25
+MIN_SLACK_DAYS = 3
+
+_CADENCE_NAMES = [(10, "weekly"), (20, "biweekly"), (45, "monthly"), (120, "quarterly")]
+
+
+@dataclass
+class VendorCadence:
+    """Invoice rhythm of one vendor."""
+    vendor_id: int
+    invoice_dates: List[pd.Timestamp]
+    median_gap_days: Optional[float]
+    dispersion: Optional[float]
+    cadence: str
+    gaps_days: List[float] = field(default_factory=list)
+
+    @property
+    def is_regular(self) -> bool:
+        return self.dispersion is not None and self.dispersion <= REGULARITY
+
+    def expected_dates(self, start: pd.Timestamp, end: pd.Timestamp) -> List[pd.Timestamp]:
+        """Dates an invoice is expected on within [start, end], stepping the median gap."""
+        if not self.is_regular or not self.invoice_dates:
+            return []
+        step = pd.Timedelta(days=self.median_gap_days)
+        anchor = self.invoice_dates[0]
+        first = int(np.ceil((start - anchor) / step))
+        last = int(np.floor((end - anchor) / step))
+        return [anchor + k * step for k in range(max(first, 0), last + 1)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["invoice_dates"] = [d.date().isoformat() for d in self.invoice_dates]
+        return data
+
+
+@dataclass
+class SweepFinding:
+    """Outcome of the missing-invoice check for one vendor and period."""
+    vendor_id: int
+    vendor_name: str
+    period: str
+    status: str
+    cadence: str
+    invoices_in_period: int
+    unclaimed_payments_in_period: int
+    missing_windows: List[str]
+    reason: str
+    detective: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _cadence_name(median_gap: Optional[float], regular: bool) -> str:
+    if median_gap is None:
+        return "unknown"
+    if not regular:
+        return "irregular"
+    for limit, name in _CADENCE_NAMES:
+        if median_gap <= limit:
+            return name
+    return "irregular"
+
+
+def build_cadence_index(ledger: Ledger) -> Dict[int, VendorCadence]:
+    """VendorCadence for every vendor that has at least one invoice."""
+    invoices = ledger.invoices.dropna(subset=["vendor_id", "date"]).sort_values("date", kind="stable")
+    index: Dict[int, VendorCadence] = {}
+    for vendor_id, dates in invoices.groupby("vendor_id", sort=True)["date"]:
+        dates = dates.drop_duplicates()
+        gaps = np.diff(dates.to_numpy(dtype="datetime64[D]")).astype(float)
+        median_gap = dispersion = None
+        if len(dates) >= MIN_INVOICES and gaps.size and np.median(gaps) > 0:
+            median_gap = float(np.median(gaps))
+            dispersion = float(np.median(np.abs(gaps - median_gap)) / median_gap)
+        regular = dispersion is not None and dispersion <= REGULARITY
+        index[int(vendor_id)] = VendorCadence(
+            vendor_id=int(vendor_id),
+            invoice_dates=list(dates),
+            median_gap_days=median_gap,
+            dispersion=dispersion,
+            cadence=_cadence_name(median_gap, regular),
+            gaps_days=gaps.tolist(),
+        )
+    return index
+
+
+_index_lock = threading.Lock()
+_index_cache: Dict[str, Any] = {"ledger": None, "index": None}
+
+
+def get_cadence_index(ledger: Ledger) -> Dict[int, VendorCadence]:
+    """build_cadence_index memoised for the most recent ledger object."""
+    with _index_lock:
+        if _index_cache["ledger"] is ledger:
+            return _index_cache["index"]
+    index = build_cadence_index(ledger)
+    with _index_lock:
+        _index_cache.update(ledger=ledger, index=index)
+    return index
+
+
+def _periods(start, end, freq: str) -> pd.PeriodIndex:
+    return pd.period_range(pd.Timestamp(start), pd.Timestamp(end), freq=freq)
+
+
+def missing_invoice_sweep(
+    ledger: Ledger,
+    start,
+    end,
+    freq: str = "M",
+    unclaimed_transaction_ids: Optional[List[str]] = None,
+    vendors: Optional[List[int]] = None,
+) -> List[SweepFinding]:
+    """Check every vendor x period in [start, end] for missing invoices.
+
+    `unclaimed_transaction_ids` are payments no invoice accounts for (e.g. from the
+    reconciliation engine); without them payments are not used as evidence.
+    Expectations never extend past the last date seen anywhere in the ledger.
+    """
+    index = get_cadence_index(ledger)
+    periods = _periods(start, end, freq)
+    if len(periods) == 0:
+        return []
+    vendor_ids = sorted(vendors if vendors is not None else set(index) | set(
+        ledger.transactions["vendor_id"].dropna().astype(int)
+    ))
+    horizon = max(ledger.invoices["date"].max(), ledger.transactions["date"].max())
+
+    # Vendor x period counts in one pass each.
+    invoices = ledger.invoices.dropna(subset=["vendor_id", "date"])
+    invoice_counts = invoices.groupby(["vendor_id", invoices["date"].dt.to_period(freq)]).size()
+    transactions = ledger.transactions.dropna(subset=["vendor_id", "date"])
+    if unclaimed_transaction_ids is not None:
+        transactions = transactions[transactions["transaction_id"].isin(unclaimed_transaction_ids)]
+    else:
+        transactions = transactions.iloc[:0]
+    payment_counts = transactions.groupby(["vendor_id", transactions["date"].dt.to_period(freq)]).size()
+
+    findings: List[SweepFinding] = []
+    for vendor_id in vendor_ids:
+        vendor = index.get(vendor_id)
+        cadence = vendor.cadence if vendor else "unknown"
+        dates = np.array(vendor.invoice_dates if vendor else [], dtype="datetime64[ns]")
+        slack = pd.Timedelta(days=max(MIN_SLACK_DAYS, (vendor.median_gap_days or 0) * WINDOW_FRACTION)) if vendor else None
+        for period in periods:
+            p_start = period.start_time
+            p_end = min(period.end_time, horizon) if pd.notna(horizon) else period.end_time
+            n_invoices = int(invoice_counts.get((vendor_id, period), 0))
+            n_payments = int(payment_counts.get((vendor_id, period), 0))
+            missing: List[str] = []
+            if vendor is not None and p_start <= p_end:
+                for expected in vendor.expected_dates(p_start, p_end):
+                    lo, hi = expected - slack, expected + slack
+                    if not ((dates >= lo.to_datetime64()) & (dates <= hi.to_datetime64())).any():
+                        missing.append(f"{lo.date().isoformat()} to {hi.date().isoformat()}")
+
+            if missing:
+                status = "MISSING"
+                reason = f"{cadence} cadence (every ~{vendor.median_gap_days:.0f} days) expects an invoice here"
+            elif vendor is not None and vendor.is_regular and p_start <= p_end:
+                status, reason = "OK", f"matches the {cadence} cadence"
+            elif n_payments and not n_invoices:
+                status = "AMBIGUOUS"
+                reason = f"{n_payments} unclaimed payment(s) but no invoice; cadence is {cadence}"
+            else:
+                status, reason = "NO_EVIDENCE", f"no expected invoice; cadence is {cadence}"
+            findings.append(
+                SweepFinding(
+                    vendor_id=int(vendor_id),
+                    vendor_name=vendor_name(vendor_id),
+                    period=str(period),
+                    status=status,
+                    cadence=cadence,
+                    invoices_in_period=n_invoices,
+                    unclaimed_payments_in_period=n_payments,
+                    missing_windows=missing,
+                    reason=reason,
+                )
+            )
+    logger.debug("missing_invoice_sweep vendors=%d periods=%d flagged=%d", len(vendor_ids), len(periods),
+                 sum(f.status in ("MISSING", "AMBIGUOUS") for f in findings))
+    return findings
@@ -1,27 +1,147 @@
+"""Bridge from the app's agents to the Cognee QA pipeline in cognee-minihack.
 
-from typing import Dict, Any
+The pipeline (solution_q_and_a: LLM/embedding settings, all of cognee, the shared
+retriever) is imported on first use, not when this module is imported, so
+`import core.agents` stays cheap for the app and for anything that only needs
+the deterministic parts of core. `prewarm()` starts that import (and the model
+warm-up) on a background thread; `readiness()` reports whether it finished or
+why it failed. A failed import is retried by the next call once COGNEE_RETRY_S
+has passed, or right away after `reset()`. Cached answers are served without
+loading the pipeline.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Dict, Any, Iterator, List, Optional
 import json
+import os
 import sys
 import logging
+import threading
+import time
 from pathlib import Path
 
-# Try to import the Cognee completion helper from cognee-minihack/solution_q_and_a.py
-_cognee_completion = None
+from .json_extract import extract_json
+from .response_cache import get_response_cache, make_cache_key
+from .schemas import STRUCTURED_OUTPUT, response_format
+
+logger = logging.getLogger(__name__)
+
 _root = Path(__file__).resolve().parent.parent
 _mini = _root / "cognee-minihack"
+_get_graph_version = None
 if _mini.exists():
     sys.path.append(str(_mini))
-    try:
-        from solution_q_and_a import completion as _cognee_completion  # type: ignore
-    except Exception as exc:  # log import issues explicitly
-        logging.getLogger(__name__).warning(
-            "Failed to import completion from solution_q_and_a: %s", exc
-        )
-        _cognee_completion = None
+    from graph_version import get_graph_version as _get_graph_version
 else:
-    logging.getLogger(__name__).warning("cognee-minihack folder not found at %s", _mini)
+    logger.warning("cognee-minihack folder not found at %s", _mini)
 
-logger = logging.getLogger(__name__)
+# Import the pipeline on a background thread when the app starts (see prewarm).
+COGNEE_PREWARM = os.environ.get("COGNEE_PREWARM", "true").lower() in ("1", "true", "yes")
+# Load the SLM (with LLM_KEEP_ALIVE) when the app starts rather than on the first question.
+LLM_WARMUP = os.environ.get("LLM_WARMUP", "true").lower() in ("1", "true", "yes")
+# Seconds after a failed import before the next call tries again.
+COGNEE_RETRY_S = float(os.environ.get("COGNEE_RETRY_S", "60"))
+
+
+@dataclass
+class BackendStatus:
+    """Load state of the Cognee pipeline: not_loaded, loading, ready or failed."""
+    state: str = "not_loaded"
+    error: Optional[str] = None
+    load_s: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+
+_backend = None
+_status = BackendStatus()
+_failed_at = 0.0  # time.monotonic() of the last failed import
+_backend_lock = threading.Lock()  # held for the whole import
+_prewarm_lock = threading.Lock()  # guards _prewarm_thread only, so prewarm() never waits for an import
+_prewarm_thread: Optional[threading.Thread] = None
+
+
+def _settled() -> bool:
+    """Whether the pipeline is loaded, or failed too recently to try again."""
+    if _backend is not None:
+        return True
+    return _status.state == "failed" and time.monotonic() - _failed_at < COGNEE_RETRY_S
+
+
+def _failed(error: str) -> None:
+    global _failed_at
+    _status.state, _status.error = "failed", error
+    _failed_at = time.monotonic()
+
+
+def _load_backend():
+    """The solution_q_and_a module, imported on first call; None if the import failed.
+
+    After a failure, None is returned without retrying until COGNEE_RETRY_S has passed.
+    """
+    global _backend
+    if _settled():
+        return _backend
+    with _backend_lock:
+        if _settled():
+            return _backend
+        if not _mini.exists():
+            _failed(f"cognee-minihack folder not found at {_mini}")
+            return None
+        _status.state = "loading"
+        start = time.perf_counter()
+        try:
+            import solution_q_and_a  # type: ignore
+        except Exception as exc:
+            logger.exception("Failed to import the Cognee pipeline (solution_q_and_a)")
+            _failed(f"{type(exc).__name__}: {exc}")
+            return None
+        finally:
+            _status.load_s = time.perf_counter() - start
+        _backend = solution_q_and_a
+        _status.state, _status.error = "ready", None
+        logger.info("Cognee pipeline loaded in %.1fs", _status.load_s)
+        return _backend
+
+
+def _prewarm() -> None:
+    backend = _load_backend()
+    if backend is not None and LLM_WARMUP:
+        backend.warm_up()
+
+
+def prewarm() -> None:
+    """Import the pipeline and warm up the model on a daemon thread; returns immediately.
+
+    Does nothing while a prewarm thread is running or once the pipeline is loaded.
+    """
+    global _prewarm_thread
+    if not COGNEE_PREWARM:
+        return
+    with _prewarm_lock:
+        if _backend is not None or (_prewarm_thread is not None and _prewarm_thread.is_alive()):
+            return
+        _prewarm_thread = threading.Thread(target=_prewarm, name="cognee-prewarm", daemon=True)
+        _prewarm_thread.start()
+
+
+def reset() -> None:
+    """Forget a failed import, so the next call (or prewarm()) tries again without waiting for COGNEE_RETRY_S."""
+    global _failed_at
+    if _status.state == "failed":
+        _failed_at = 0.0
+        _status.state, _status.error = "not_loaded", None
+
+
+def readiness() -> Dict[str, Any]:
+    """Health probe: {"ready", "state", "error", "load_s"}, without triggering a load."""
+    return {"ready": _status.ready, **asdict(_status)}
+
+
+def _unavailable() -> str:
+    return json.dumps({"error": f"Cognee backend unavailable: {_status.error or _status.state}"})
 
 
 def _truncate(text: str, max_len: int = 400) -> str:
@@ -30,67 +150,115 @@ def _truncate(text: str, max_len: int = 400) -> str:
     return text[:max_len] + "...[truncated]"
 
 
-def ask_cognee_raw(prompt: str) -> str:
+def _cache_key(prompt: str, fmt: Optional[Dict[str, Any]] = None) -> str:
+    model = os.environ.get("LLM_MODEL", "cognee-distillabs-model-gguf-quantized")
+    graph_version = _get_graph_version() if _get_graph_version is not None else "unknown"
+    if fmt:
+        prompt = prompt + "\0" + json.dumps(fmt, sort_keys=True)
+    return make_cache_key(prompt, model, graph_version)
+
+
+def _response_format(schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    return response_format(schema) if schema and STRUCTURED_OUTPUT else None
+
+
+def ask_cognee_raw(prompt: str, use_cache: bool = True, schema: Optional[Dict[str, Any]] = None) -> str:
     """Send a natural-language prompt to Cognee and get back a string.
 
     This MUST call the local Cognee + distil SLM backend (no online LLMs).
-    Replace the body once you know the correct function name/signature from solution_q_and_a.py.
+    Answers are cached per (prompt, schema, model, graph version); pass use_cache=False
+    to force a fresh completion, which also skips the retriever's semantic cache
+    (the fresh answer still refreshes both).
+    `schema` (a JSON schema from core.schemas) constrains the SLM's output to that
+    shape unless LLM_STRUCTURED_OUTPUT is disabled.
     """
     logger.debug("ask_cognee_raw prompt len=%d preview=%s", len(prompt or ""), _truncate(prompt or ""))
-    if _cognee_completion is None:
-        # Safe fallback so the app can still import before wiring Cognee.
-        return json.dumps(
-            {
-                "error": "Cognee completion function not wired. "
-                         "Update core.cognee_client.ask_cognee_raw to call solution_q_and_a."
-            }
-        )
-    return _cognee_completion(prompt)  # type: ignore[call-arg]
-
-
-def ask_cognee_json(prompt: str) -> Dict[str, Any]:
+    fmt = _response_format(schema)
+    cache = get_response_cache()
+    key = _cache_key(prompt, fmt) if cache is not None else None
+    if cache is not None and use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug("ask_cognee_raw cache hit key=%s", key[:12])
+            return cached
+
+    backend = _load_backend()
+    if backend is None:
+        return _unavailable()
+    answer = backend.completion(prompt, response_format=fmt, use_cache=use_cache)
+    if cache is not None and isinstance(answer, str) and answer.strip():
+        cache.set(key, answer)
+    return answer
+
+
+def ask_cognee_stream(
+    prompt: str, use_cache: bool = True, schema: Optional[Dict[str, Any]] = None
+) -> Iterator[str]:
+    """Like ask_cognee_raw, but yield the answer in chunks as the SLM produces it.
+
+    A cached answer is yielded as one chunk; a streamed answer is cached once complete.
+    """
+    logger.debug("ask_cognee_stream prompt len=%d preview=%s", len(prompt or ""), _truncate(prompt or ""))
+    fmt = _response_format(schema)
+    cache = get_response_cache()
+    key = _cache_key(prompt, fmt) if cache is not None else None
+    if cache is not None and use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            logger.debug("ask_cognee_stream cache hit key=%s", key[:12])
+            yield cached
+            return
+
+    backend = _load_backend()
+    if backend is None:
+        yield _unavailable()
+        return
+    parts = []
+    for chunk in backend.completion_stream(prompt, response_format=fmt, use_cache=use_cache):
+        parts.append(chunk)
+        yield chunk
+    answer = "".join(parts)
+    if cache is not None and answer.strip():
+        cache.set(key, answer)
+
+
+def graph_vendor_names() -> List[str]:
+    """Vendor names from the knowledge graph; [] when the backend is unavailable or the query fails."""
+    backend = _load_backend()
+    if backend is None:
+        return []
+    try:
+        return backend.vendor_names()
+    except Exception as exc:
+        logger.warning("Listing vendors from the graph failed: %s", exc)
+        return []
+
+
+def ask_cognee_json(
+    prompt: str, use_cache: bool = True, schema: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """Ask Cognee and parse the result as JSON.
 
-    - Calls ask_cognee_raw(prompt)
-    - Tries to parse JSON
-    - Strips simple Markdown fences if present
+    - Calls ask_cognee_raw(prompt, use_cache, schema); with a schema the endpoint only
+      emits conforming JSON, so callers validate with core.schemas.from_json
+    - Extracts the first JSON object/array in one pass (core.json_extract), skipping
+      Markdown fences and prose and repairing common SLM mistakes; with a schema, a
+      value of its top-level type is preferred over e.g. a "[1]" footnote in the prose
     """
-    raw = ask_cognee_raw(prompt)
+    raw = ask_cognee_raw(prompt, use_cache=use_cache, schema=schema)
     if isinstance(raw, dict):
         return raw
 
     text = str(raw).strip()
     logger.debug("ask_cognee_json raw type=%s len=%d preview=%s", type(raw).__name__, len(text), _truncate(text))
 
-    if text.startswith("```"):
-        # Strip code fences and optional 'json'
-        text = text.strip("`").strip()
-        if text.lower().startswith("json"):
-            text = text[4:].strip()
-
-    try:
-        return json.loads(text)
-    except Exception:
-        logger.debug("ask_cognee_json primary parse failed; attempting substring parse")
-        # Best-effort: try to extract the first JSON array/object substring
-        start = text.find("[")
-        end = text.rfind("]")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(text[start : end + 1])
-            except Exception as exc:
-                logger.debug("ask_cognee_json array parse failed: %s", exc)
-                pass
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(text[start : end + 1])
-            except Exception as exc:
-                logger.debug("ask_cognee_json object parse failed: %s", exc)
-                pass
-
+    expect = {"array": list, "object": dict}.get((schema or {}).get("type"))
+    extracted = extract_json(text, expect)
+    if extracted is None:
         return {
             "error": "Failed to parse Cognee response as JSON.",
             "raw_response": text,
         }
+    if extracted.repairs:
+        logger.debug("ask_cognee_json repaired output: %s", ", ".join(extracted.repairs))
+    return extracted.value
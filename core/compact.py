@@ -0,0 +1,153 @@
+"""Compact TSV wire format for list-returning agent prompts.
+
+Asking the SLM for a JSON array of objects makes it repeat every key name,
+quote and brace for each row; on a CPU-only model output tokens dominate the
+latency. In compact mode the model writes one header line with the column
+names and then one tab-separated line per row, with enum fields as short
+codes (e.g. `MAT` for MATCHED). `CompactFormat` derives the column list and the
+codes from a core.models dataclass, renders the prompt instructions and
+expands answers back into dicts ready for core.schemas.from_json.
+
+    invoice_id	vendor_name	amount	currency	match_status	...
+    INV-V3-M03-535592	Vendor 3	1200.50	EUR	MAT	...
+"""
+
+import dataclasses
+import logging
+import typing
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Separator for list-valued cells (e.g. reason_codes).
+LIST_SEPARATOR = ","
+
+
+def enum_codes(values: Sequence[str]) -> Dict[str, str]:
+    """Shortest unique prefix per value, e.g. MATCHED -> MAT, MANY_TO_ONE -> MAN, MEDIUM -> ME when all exist."""
+    codes = {}
+    for value in values:
+        for length in range(1, len(value) + 1):
+            prefix = value[:length]
+            if not any(other != value and other.startswith(prefix) for other in values):
+                codes[value] = prefix
+                break
+        else:
+            codes[value] = value
+    return codes
+
+
+class CompactFormat:
+    """Header + TSV rows for dataclass `cls`, enum fields written as codes."""
+
+    def __init__(self, cls: type):
+        hints = typing.get_type_hints(cls)
+        self.cls = cls
+        self.columns: List[str] = [f.name for f in dataclasses.fields(cls)]
+        self.list_columns = {name for name in self.columns if typing.get_origin(hints[name]) is list}
+        enums = {f.name: list(f.metadata["enum"]) for f in dataclasses.fields(cls) if "enum" in f.metadata}
+        # One code space for the whole legend, so a code means the same value in every column
+        # (a value shared by two columns, e.g. NONE, keeps one code).
+        legend = enum_codes(list(dict.fromkeys(v for values in enums.values() for v in values)))
+        self.codes: Dict[str, Dict[str, str]] = {
+            name: {value: legend[value] for value in values} for name, values in enums.items()
+        }
+        self._decode = {name: {c.upper(): v for v, c in codes.items()} for name, codes in self.codes.items()}
+
+    @property
+    def header(self) -> str:
+        return "\t".join(self.columns)
+
+    def instructions(self) -> str:
+        """Output-format section for a prompt."""
+        legend = "\n".join(
+            f"- {name}: " + ", ".join(f"{code}={value}" for value, code in codes.items())
+            for name, codes in self.codes.items()
+        )
+        lists = ", ".join(sorted(self.list_columns))
+        return (
+            "Output format: first the header line below, then ONE line per item, "
+            "fields separated by a single TAB, in the header's order. No JSON, no quotes, no extra text.\n"
+            f"{self.header}\n"
+            "Write these fields as codes:\n"
+            f"{legend}\n"
+            + (f"Separate multiple values in {lists} with '{LIST_SEPARATOR}'.\n" if lists else "")
+            + "Text fields must not contain tabs or line breaks. If there is nothing to report, output only the header."
+        )
+
+    def _row(self, cells: List[str], columns: List[str]) -> Optional[Dict[str, Any]]:
+        if len(cells) < len(columns):
+            return None
+        if len(cells) > len(columns):
+            # A stray tab inside the last (free-text) column.
+            cells = cells[:len(columns) - 1] + [" ".join(cells[len(columns) - 1:])]
+        row: Dict[str, Any] = {}
+        for name, cell in zip(columns, cells):
+            cell = cell.strip()
+            if name in self._decode:
+                row[name] = self._decode[name].get(cell.upper(), cell)
+            elif name in self.list_columns:
+                row[name] = [v.strip() for v in cell.split(LIST_SEPARATOR) if v.strip()]
+            else:
+                row[name] = cell
+        return row
+
+    def _header(self, cells: List[str]) -> Optional[List[str]]:
+        names = [c.strip() for c in cells]
+        return names if names and set(names) <= set(self.columns) and len(set(names)) == len(names) else None
+
+    def iter_rows(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Decode answer lines; a header line (any column order) re-maps the columns."""
+        columns = self.columns
+        for line in lines:
+            line = line.strip("\r\n")
+            if not line.strip() or line.lstrip().startswith("```"):
+                continue
+            cells = line.split("\t")
+            header = self._header(cells)
+            if header is not None:
+                columns = header
+                continue
+            row = self._row(cells, columns)
+            if row is None:
+                logger.debug("CompactFormat: skipping short line: %.200s", line)
+                continue
+            yield row
+
+    def parse(self, text: str) -> List[Dict[str, Any]]:
+        return list(self.iter_rows(text.splitlines()))
+
+    def iter_stream(self, chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Like iter_rows over a stream of text chunks; each row is yielded once its line ends."""
+        return self.iter_rows(_lines(chunks))
+
+    def encode(self, rows: Iterable[Dict[str, Any]]) -> str:
+        """Render rows in the wire format (used by the benchmark and for few-shot examples)."""
+        out = [self.header]
+        for row in rows:
+            cells = []
+            for name in self.columns:
+                value = row.get(name, "")
+                if name in self.codes:
+                    value = self.codes[name].get(value, value)
+                elif name in self.list_columns:
+                    value = LIST_SEPARATOR.join(map(str, value or []))
+                cells.append(str(value).replace("\t", " ").replace("\n", " "))
+            out.append("\t".join(cells))
+        return "\n".join(out)
+
+
+def _lines(chunks: Iterable[str]) -> Iterator[str]:
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        *complete, buffer = buffer.split("\n")
+        yield from complete
+    if buffer:
+        yield buffer
+
+
+@lru_cache(maxsize=None)
+def compact_format(cls: type) -> CompactFormat:
+    return CompactFormat(cls)
@@ -0,0 +1,204 @@
+"""Rule-based pre-extraction for the Agentic Invoice Concierge.
+
+Most pasted invoices already carry a clean ID (`INV-V15-M01-282247`), ISO
+dates, a labelled total and a currency. `pre_extract` pulls those out with
+regular expressions so the LLM is only asked for what is left, and
+`rule_risk` scores risk against the ledger (duplicate IDs, unknown vendors,
+amount outliers, inconsistent dates) without a model call.
+"""
+
+import re
+import threading
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .ledger import Ledger, vendor_name
+
+# Fields the concierge returns apart from risk and triage.
+EXTRACTED_FIELDS = ["invoice_id", "vendor_name", "amount", "currency", "issue_date", "due_date", "category"]
+RISK_FIELDS = ["risk_score", "risk_label"]
+
+_INVOICE_ID = re.compile(r"\bINV-[A-Z0-9]+(?:-[A-Z0-9]+)*\b", re.IGNORECASE)
+_LABELLED_ID = re.compile(r"(?:invoice|rechnung)\s*(?:no\.?|nr\.?|number|#|id)\s*[:#]?\s*([A-Z0-9][A-Z0-9\-/]{2,})", re.IGNORECASE)
+_VENDOR_IN_ID = re.compile(r"^INV-V(\d+)-", re.IGNORECASE)
+_VENDOR = re.compile(r"\bvendor\s*(?:name)?\s*[:#]?\s*(\d+\b|[^\n,;]{2,60})", re.IGNORECASE)
+_CURRENCY = re.compile(r"\b(EUR|USD|GBP|CHF)\b|([€$£])")
+_CURRENCY_SYMBOLS = {"€": "EUR", "$": "USD", "£": "GBP"}
+_NUMBER = r"(?P<number>\d{1,3}(?:[.,' ]\d{3})+(?:[.,]\d{1,3})?|\d+(?:[.,]\d{1,3})?)"
+# Total labels from most to least specific; the most specific label found wins, the last
+# occurrence among equals (the grand total is usually at the bottom).
+_TOTAL_LABELS = (
+    r"grand\s+total|total\s+due|amount\s+due|balance\s+due|invoice\s+total|gesamtbetrag|rechnungsbetrag|endbetrag",
+    r"total(?:\s+amount)?|gesamtsumme|summe",
+    r"amount|betrag",
+)
+_TOTAL = re.compile(
+    r"\b(?:" + "|".join(f"(?P<rank{i}>{labels})" for i, labels in enumerate(_TOTAL_LABELS)) + r")\b"
+    r"(?P<gap>[^\d\n]{0,20}?)" + _NUMBER,
+    re.IGNORECASE,
+)
+# A label in one of these contexts (same line, before the number) is not the invoice total:
+# "Amount paid", "Tax total", "Discount amount", "Sub-total"; "incl. VAT" still is.
+_NOT_TOTAL = re.compile(
+    r"\b(?:paid|payments?|received|deposit|credit|discount|rabatt|skonto|sub"
+    r"|(?<!incl\. )(?<!incl )(?<!inkl\. )(?<!inkl )(?<!including )(?:tax|vat|mwst|ust))\b",
+    re.IGNORECASE,
+)
+_ISO_DATE = r"(\d{4}-\d{2}-\d{2})"
+_EU_DATE = r"(\d{1,2})\.(\d{1,2})\.(\d{4})"
+_DUE_DATE = re.compile(r"\b(?:due|payable\s+by|pay\s+by|zahlbar\s+bis|fällig)\b[^\d\n]{0,20}(?:" + _ISO_DATE + "|" + _EU_DATE + ")", re.IGNORECASE)
+_ISSUE_DATE = re.compile(
+    r"\b(?:invoice\s+date|issue(?:d)?(?:\s+date)?|date(?:\s+of\s+issue)?)\b[^\d\n]{0,20}(?:" + _ISO_DATE + "|" + _EU_DATE + ")",
+    re.IGNORECASE,
+)
+_ANY_DATE = re.compile(_ISO_DATE + "|" + _EU_DATE)
+
+_CATEGORY_KEYWORDS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("HARDWARE", ("laptop", "monitor", "ssd", "hdd", "ram", "keyboard", "mouse", "server", "printer", "-lap-", "-mon-", "-key-")),
+    ("SOFTWARE", ("license", "licence", "subscription", "saas", "software", "cloud")),
+    ("MARKETING", ("marketing", "campaign", "advertis", "sponsor")),
+    ("TRAVEL", ("flight", "hotel", "travel", "train", "taxi")),
+    ("SERVICES", ("consulting", "service", "support", "maintenance", "audit")),
+]
+
+
+def _parse_number(text: str) -> Optional[float]:
+    text = text.replace(" ", "").replace("'", "")
+    if "," in text and "." in text:
+        decimal = "," if text.rfind(",") > text.rfind(".") else "."
+        text = text.replace("." if decimal == "," else ",", "").replace(decimal, ".")
+    elif "," in text:
+        head, _, tail = text.rpartition(",")
+        text = f"{head.replace(',', '')}.{tail}" if len(tail) <= 2 else text.replace(",", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _date(match: "re.Match") -> str:
+    iso, day, month, year = match.groups()[-4:]
+    return iso or f"{int(year):04d}-{int(month):02d}-{int(day):02d}"
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """An ISO or dd.mm.yyyy date string as a date; None for anything else ("UNKNOWN", "")."""
+    text = str(value or "").strip()
+    match = re.fullmatch(_EU_DATE, text)
+    try:
+        if match:
+            day, month, year = map(int, match.groups())
+            return date(year, month, day)
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _total(text: str) -> Optional[float]:
+    """The invoice total: the most specific total label's amount, skipping paid/tax/discount lines."""
+    best: Optional[Tuple[int, float]] = None
+    for match in _TOTAL.finditer(text):
+        context = text[text.rfind("\n", 0, match.start()) + 1:match.start()] + " " + match.group("gap")
+        if _NOT_TOTAL.search(context):
+            continue
+        value = _parse_number(match.group("number"))
+        if value is None:
+            continue
+        rank = next(i for i in range(len(_TOTAL_LABELS)) if match.group(f"rank{i}"))
+        if best is None or rank <= best[0]:
+            best = (rank, value)
+    return best[1] if best else None
+
+
+def pre_extract(raw_text: str) -> Dict[str, Any]:
+    """Concierge fields that can be read off the text directly; missing keys were not found."""
+    text = raw_text or ""
+    fields: Dict[str, Any] = {}
+
+    match = _INVOICE_ID.search(text) or _LABELLED_ID.search(text)
+    if match:
+        fields["invoice_id"] = (match.group(1) if match.re is _LABELLED_ID else match.group(0)).upper()
+
+    vendor_in_id = _VENDOR_IN_ID.match(fields.get("invoice_id", ""))
+    match = _VENDOR.search(text)
+    if vendor_in_id:
+        fields["vendor_name"] = vendor_name(int(vendor_in_id.group(1)))
+    elif match:
+        value = match.group(1).strip()
+        fields["vendor_name"] = vendor_name(int(value)) if value.isdigit() else value
+
+    amount = _total(text)
+    if amount is not None:
+        fields["amount"] = amount
+
+    match = _CURRENCY.search(text)
+    if match:
+        fields["currency"] = match.group(1) or _CURRENCY_SYMBOLS[match.group(2)]
+
+    due = _DUE_DATE.search(text)
+    if due:
+        fields["due_date"] = _date(due)
+    issue = _ISSUE_DATE.search(text)
+    if issue and (not due or issue.start() != due.start()):
+        fields["issue_date"] = _date(issue)
+    else:
+        others = [_date(m) for m in _ANY_DATE.finditer(text) if not due or m.start() < due.start() or m.start() > due.end()]
+        if others:
+            fields["issue_date"] = others[0]
+
+    lowered = text.lower()
+    for category, keywords in _CATEGORY_KEYWORDS:
+        if any(k in lowered for k in keywords):
+            fields["category"] = category
+            break
+    return fields
+
+
+_profile_lock = threading.Lock()
+_profile_cache: Dict[str, Any] = {"ledger": None, "profile": None}
+
+
+def _ledger_profile(ledger: Ledger) -> Dict[str, Any]:
+    """Known invoice IDs and per-vendor total statistics, memoised per ledger object."""
+    with _profile_lock:
+        if _profile_cache["ledger"] is ledger:
+            return _profile_cache["profile"]
+    invoices = ledger.invoices
+    totals = invoices.groupby("vendor_id")["total"].agg(["count", "mean", "std"])
+    profile = {
+        "invoice_ids": set(invoices["invoice_id"].astype(str).str.upper()),
+        "vendors": {vendor_name(v): row for v, row in totals.iterrows()},
+    }
+    with _profile_lock:
+        _profile_cache.update(ledger=ledger, profile=profile)
+    return profile
+
+
+def rule_risk(fields: Dict[str, Any], ledger: Optional[Ledger] = None) -> Tuple[float, str, List[str]]:
+    """(risk_score, risk_label, reasons) from the extracted fields and the ledger."""
+    score, reasons = 0.1, []
+    if ledger is not None and not ledger.invoices.empty:
+        profile = _ledger_profile(ledger)
+        if str(fields.get("invoice_id", "")).upper() in profile["invoice_ids"]:
+            score += 0.4
+            reasons.append("DUPLICATE_INVOICE_ID")
+        stats = profile["vendors"].get(fields.get("vendor_name"))
+        if stats is None:
+            score += 0.2
+            reasons.append("UNKNOWN_VENDOR")
+        elif isinstance(fields.get("amount"), (int, float)) and stats["count"] >= 3 and stats["std"] > 0:
+            if abs(fields["amount"] - stats["mean"]) / stats["std"] >= 3:
+                score += 0.3
+                reasons.append("AMOUNT_OUTLIER")
+    issue, due = _parse_date(fields.get("issue_date")), _parse_date(fields.get("due_date"))
+    if issue and due and due < issue:
+        score += 0.2
+        reasons.append("DUE_BEFORE_ISSUE")
+    if any(f not in fields for f in EXTRACTED_FIELDS):
+        score += 0.1
+        reasons.append("INCOMPLETE")
+    score = float(np.clip(score, 0.0, 1.0))
+    label = "HIGH" if score >= 0.7 else "MEDIUM" if score >= 0.4 else "LOW"
+    return round(score, 2), label, reasons
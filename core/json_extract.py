@@ -0,0 +1,284 @@
+"""Single-pass, tolerant extraction of the first JSON value in SLM output.
+
+The scanner walks the text once: at each `{` or `[` it first lets the C
+decoder (`json.JSONDecoder.raw_decode`) try a strict parse, and only if that
+fails runs a tolerant recursive-descent parser from the same position. A
+candidate that cannot be parsed (e.g. prose like "[see below]") is abandoned
+at the point of failure and scanning resumes there, so brackets in surrounding
+prose never produce a mismatched span. A failed C parse costs O(position)
+(JSONDecodeError counts lines), so after a few net misses per text the scanner
+stops trying it and the tolerant parser, which is linear, does the work.
+
+Answers are objects or arrays of objects, so a value of the wrong shape (a
+scalar-only array such as the "[1]" of a footnote, or not the caller's
+`expect`ed type) is skipped in favour of a later one that has it, and only
+returned when nothing better follows; scanning resumes after its end.
+
+Repairs the tolerant parser applies (reported by name):
+
+- trailing_commas:  `[1, 2,]`, `{"a": 1,}`
+- missing_commas:   `{"a": 1} {"b": 2}` inside an array, `"a": 1 "b": 2`
+- single_quotes:    `{'a': 'b'}`
+- unquoted_keys:    `{a: 1}`
+- python_literals:  `True`, `False`, `None`
+- truncated:        output cut off mid-string/-value; open containers are closed
+                    and an incomplete trailing member is dropped
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+_DECODER = json.JSONDecoder()
+_OPENERS = re.compile(r"[\[{]")
+_WHITESPACE = re.compile(r"\s*")
+_DOUBLE_QUOTED = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SINGLE_QUOTED = re.compile(r"'(?:[^'\\]|\\.)*'", re.DOTALL)
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_IDENTIFIER = re.compile(r"[A-Za-z_$][A-Za-z0-9_$\-]*")
+_LITERALS = {"true": True, "false": False, "null": None}
+_PYTHON_LITERALS = {"True": True, "False": False, "None": None}
+# Net C-decoder misses tolerated (per text) before the scanner stops trying it.
+_C_MISS_SLACK = 8
+
+
+@dataclass
+class JsonExtraction:
+    """The decoded value, its [start, end) span in the text and the repairs applied."""
+    value: Any
+    start: int
+    end: int
+    repairs: List[str] = field(default_factory=list)
+
+
+class _Truncated(Exception):
+    """Input ended inside a value."""
+
+
+class _Invalid(Exception):
+    def __init__(self, pos: int):
+        super().__init__(pos)
+        self.pos = pos
+
+
+class _TolerantParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.n = len(text)
+        self.repairs: List[str] = []
+        # Misses of the C decoder on nested values. A failing raw_decode costs
+        # O(pos) (JSONDecodeError counts lines), so stop trying once it keeps
+        # missing, i.e. the whole document is written in a non-JSON style.
+        self._c_hits = 0
+        self._c_misses = 0
+
+    def _repair(self, name: str) -> None:
+        if name not in self.repairs:
+            self.repairs.append(name)
+
+    def _ws(self, i: int) -> int:
+        return _WHITESPACE.match(self.text, i).end()
+
+    def parse(self, i: int) -> Tuple[Any, int]:
+        """Parse the value at i (an opener); returns (value, end)."""
+        stack: List[list] = []  # open containers as [container, pending key]
+        try:
+            return self._value(i, stack)
+        except _Truncated:
+            self._repair("truncated")
+            return self._close(stack), self.n
+
+    @staticmethod
+    def _close(stack: List[list]) -> Any:
+        """Close every open container after a truncation, innermost first.
+
+        An object cut off while being an array element is dropped as incomplete.
+        """
+        if not stack:
+            return None
+        if len(stack) > 1 and isinstance(stack[-1][0], dict) and isinstance(stack[-2][0], list):
+            stack.pop()
+        for depth in range(len(stack) - 1, 0, -1):
+            child, (parent, key) = stack[depth][0], stack[depth - 1]
+            if isinstance(parent, list):
+                parent.append(child)
+            else:
+                parent[key] = child
+        return stack[0][0]
+
+    def _value(self, i: int, stack: List[Any]) -> Tuple[Any, int]:
+        i = self._ws(i)
+        if i >= self.n:
+            raise _Truncated()
+        ch = self.text[i]
+        if ch == "{" or ch == "[" or ch == '"':
+            # Well-formed members of a damaged document still go through the C decoder.
+            decoded = self._c_decode(i)
+            if decoded is not None:
+                return decoded
+            if ch == "{":
+                return self._object(i, stack)
+            if ch == "[":
+                return self._array(i, stack)
+        if ch == '"' or ch == "'":
+            return self._string(i)
+        match = _NUMBER.match(self.text, i)
+        if match:
+            end = match.end()
+            if end == self.n:
+                raise _Truncated()
+            number = match.group(0)
+            return (float(number) if any(c in number for c in ".eE") else int(number)), end
+        match = _IDENTIFIER.match(self.text, i)
+        if match:
+            word = match.group(0)
+            if word in _LITERALS:
+                return _LITERALS[word], match.end()
+            if word in _PYTHON_LITERALS:
+                self._repair("python_literals")
+                return _PYTHON_LITERALS[word], match.end()
+            if match.end() == self.n and any(lit.startswith(word) for lit in _LITERALS):
+                raise _Truncated()
+        raise _Invalid(i)
+
+    def _c_decode(self, i: int) -> Optional[Tuple[Any, int]]:
+        if self._c_misses > self._c_hits + _C_MISS_SLACK:
+            return None
+        try:
+            decoded = _DECODER.raw_decode(self.text, i)
+        except ValueError:
+            self._c_misses += 1
+            return None
+        self._c_hits += 1
+        return decoded
+
+    def _string(self, i: int) -> Tuple[str, int]:
+        quote = self.text[i]
+        match = (_DOUBLE_QUOTED if quote == '"' else _SINGLE_QUOTED).match(self.text, i)
+        if match is None:
+            raise _Truncated()
+        raw = match.group(0)
+        if quote == "'":
+            self._repair("single_quotes")
+            raw = '"' + raw[1:-1].replace("\\'", "'").replace('"', '\\"') + '"'
+        try:
+            return json.loads(raw, strict=False), match.end()
+        except ValueError:
+            raise _Invalid(i)
+
+    def _key(self, i: int) -> Tuple[str, int]:
+        ch = self.text[i]
+        if ch == '"' or ch == "'":
+            return self._string(i)
+        match = _IDENTIFIER.match(self.text, i)
+        if match is None:
+            raise _Invalid(i)
+        if match.end() == self.n:
+            raise _Truncated()
+        self._repair("unquoted_keys")
+        return match.group(0), match.end()
+
+    def _object(self, i: int, stack: List[Any]) -> Tuple[dict, int]:
+        obj: dict = {}
+        frame = [obj, None]
+        stack.append(frame)
+        i = self._ws(i + 1)
+        expect_member = True
+        while True:
+            if i >= self.n:
+                raise _Truncated()
+            ch = self.text[i]
+            if ch == "}":
+                stack.pop()
+                return obj, i + 1
+            if ch == ",":
+                j = self._ws(i + 1)
+                if j < self.n and self.text[j] == "}":
+                    self._repair("trailing_commas")
+                i, expect_member = j, True
+                continue
+            if not expect_member:
+                self._repair("missing_commas")
+            key, i = self._key(i)
+            i = self._ws(i)
+            if i >= self.n:
+                raise _Truncated()
+            if self.text[i] != ":":
+                raise _Invalid(i)
+            frame[1] = key
+            value, i = self._value(i + 1, stack)
+            obj[key] = value  # only complete members are kept on truncation
+            i = self._ws(i)
+            expect_member = False
+
+    def _array(self, i: int, stack: List[Any]) -> Tuple[list, int]:
+        arr: list = []
+        stack.append([arr, None])
+        i = self._ws(i + 1)
+        expect_element = True
+        while True:
+            if i >= self.n:
+                raise _Truncated()
+            ch = self.text[i]
+            if ch == "]":
+                stack.pop()
+                return arr, i + 1
+            if ch == ",":
+                j = self._ws(i + 1)
+                if j < self.n and self.text[j] == "]":
+                    self._repair("trailing_commas")
+                i, expect_element = j, True
+                continue
+            if not expect_element:
+                self._repair("missing_commas")
+            value, i = self._value(i, stack)
+            arr.append(value)
+            i = self._ws(i)
+            expect_element = False
+
+
+def _has_shape(value: Any, expect: Optional[type]) -> bool:
+    """An object, or an array holding objects or arrays, of the `expect`ed type if given."""
+    if expect is not None and not isinstance(value, expect):
+        return False
+    return isinstance(value, dict) or any(isinstance(v, (dict, list)) for v in value)
+
+
+def extract_json(text: str, expect: Optional[type] = None) -> Optional[JsonExtraction]:
+    """First balanced (or repairable) JSON object/array in `text` with the expected shape, or None.
+
+    `expect` (dict or list) is the top-level type the caller wants. Without a value of
+    the expected shape, the first value found is returned.
+    """
+    if not text:
+        return None
+    parser = _TolerantParser(text)  # shared, so the C-decoder miss budget is per text
+    fallback: Optional[JsonExtraction] = None
+    pos = 0
+    while True:
+        match = _OPENERS.search(text, pos)
+        if match is None:
+            return fallback
+        start = match.start()
+        parser.repairs = []
+        decoded = parser._c_decode(start)
+        if decoded is not None:
+            value, end = decoded
+        else:
+            try:
+                value, end = parser.parse(start)
+            except _Invalid as exc:
+                pos = max(exc.pos, start + 1)
+                continue
+            except RecursionError:
+                pos = start + 1
+                continue
+            if value is None:
+                pos = start + 1
+                continue
+        found = JsonExtraction(value, start, end, parser.repairs)
+        if _has_shape(value, expect):
+            return found
+        fallback = fallback or found
+        pos = end
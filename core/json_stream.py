@@ -0,0 +1,101 @@
+"""Incremental parser for a JSON array streamed token by token.
+
+The SLM answers dashboard/anomaly prompts with a JSON array of objects. Fed
+the raw chunks as they arrive, `JsonArrayStream` returns every element object
+of the first array as soon as its closing brace is seen, so callers can render
+rows long before the model finishes. The array is the first `[` whose next
+non-space character is `{`, `[` or `]`; text before it (code fences,
+preambles, bracketed prose like "[the graph]", a wrapping `{"rows": ...}`
+object) is skipped.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayStream:
+    """Feed chunks, collect the completed objects of the first JSON array."""
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0  # next character of _buffer to scan
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._array_depth: Optional[int] = None  # stack depth inside the target array
+        self._object_start: Optional[int] = None
+        self.closed = False  # the target array has ended
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume `chunk` and return the element objects it completed."""
+        if self.closed or not chunk:
+            return []
+        self._buffer += chunk
+        completed: List[Dict[str, Any]] = []
+        buffer, i = self._buffer, self._pos
+        while i < len(buffer):
+            ch = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif self._array_depth is None:
+                if ch == "[":
+                    j = i + 1
+                    while j < len(buffer) and buffer[j].isspace():
+                        j += 1
+                    if j == len(buffer):
+                        break  # the next chunk decides whether this bracket opens the array
+                    if buffer[j] in "{[]":
+                        self._stack.append(ch)
+                        self._array_depth = len(self._stack)
+            elif ch in "[{":
+                self._stack.append(ch)
+                if ch == "{" and len(self._stack) == self._array_depth + 1:
+                    self._object_start = i
+            elif ch in "]}":
+                if self._stack:
+                    self._stack.pop()
+                if ch == "}" and self._object_start is not None and len(self._stack) == self._array_depth:
+                    item = self._decode(buffer[self._object_start:i + 1])
+                    if item is not None:
+                        completed.append(item)
+                    self._object_start = None
+                elif ch == "]" and len(self._stack) < self._array_depth:
+                    self.closed = True
+                    break
+            i += 1
+
+        # Drop everything no open element still needs.
+        keep_from = self._object_start if self._object_start is not None else i
+        self._buffer = buffer[keep_from:]
+        self._pos = i - keep_from
+        if self._object_start is not None:
+            self._object_start = 0
+        return completed
+
+    @staticmethod
+    def _decode(text: str) -> Optional[Dict[str, Any]]:
+        try:
+            item = json.loads(text)
+        except ValueError as exc:
+            logger.debug("JsonArrayStream: skipping malformed element (%s): %.200s", exc, text)
+            return None
+        return item if isinstance(item, dict) else None
+
+
+def iter_json_array(chunks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield each object of the first JSON array in a stream of text chunks."""
+    parser = JsonArrayStream()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.closed:
+            return
@@ -0,0 +1,193 @@
+"""Tabular access to the invoice / transaction ledger.
+
+Loads the same CSVs that `cognee-minihack/initial_graph_creation.py` feeds into
+the graph (`data/invoices.csv`, `data/transactions.csv`, each with its optional
+enrichment file) into pandas DataFrames with parsed line items, so that
+deterministic engines can work over the full ledger instead of a handful of
+retrieved triplets.
+"""
+
+import ast
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_MINIHACK = Path(__file__).resolve().parent.parent / "cognee-minihack"
+DEFAULT_DATA_DIR = _MINIHACK / "data"
+ENRICHMENT_DIR = _MINIHACK / "optional_data_for_enrichment"
+DEFAULT_CURRENCY = "EUR"
+
+_INVOICE_COLUMNS = ["invoice_number", "date", "due_date", "vendor_id", "total", "items"]
+_TRANSACTION_COLUMNS = ["transaction_id", "date", "vendor_id", "amount", "items", "discount"]
+
+
+@dataclass
+class Ledger:
+    """Invoices, transactions and their exploded line items."""
+    invoices: pd.DataFrame
+    transactions: pd.DataFrame
+    invoice_items: pd.DataFrame
+    transaction_items: pd.DataFrame
+
+    @property
+    def is_empty(self) -> bool:
+        return self.invoices.empty and self.transactions.empty
+
+
+def vendor_name(vendor_id) -> str:
+    """Vendor display name, matching the graph's "Vendor <id>" node naming."""
+    return f"Vendor {vendor_id}"
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    with open(path) as f:
+        header = f.readline()
+    # transactions.csv is ';'-separated, the enrichment copy uses ','.
+    sep = ";" if header.count(";") > header.count(",") else ","
+    return pd.read_csv(path, sep=sep)
+
+
+# Fast path for the generator's repr() format; anything else falls back to ast.literal_eval.
+_ITEM_RE = re.compile(
+    r"""'product':\s*(?P<q>['"])(?P<product>.*?)(?P=q),\s*'sku':\s*'(?P<sku>[^']*)',\s*"""
+    r"""'qty':\s*(?P<qty>[-\d.]+),\s*'price':\s*(?P<price>[-\d.eE+]+),\s*'total':\s*(?P<total>[-\d.eE+]+)"""
+)
+
+
+def _parse_item_list(value) -> List[tuple]:
+    if not isinstance(value, str):
+        return []
+    found = _ITEM_RE.findall(value)
+    if len(found) == value.count("'sku'"):
+        return [(product, sku, qty, price, total) for _, product, sku, qty, price, total in found]
+    try:
+        items = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    if not isinstance(items, list):
+        return []
+    return [
+        (i.get("product"), i.get("sku"), i.get("qty"), i.get("price"), i.get("total"))
+        for i in items
+        if isinstance(i, dict)
+    ]
+
+
+def _explode_items(df: pd.DataFrame, id_col: str) -> pd.DataFrame:
+    """One row per line item: id, vendor_id, date, sku, product, qty, price, line_total."""
+    parsed = [_parse_item_list(value) for value in df["items"]] if "items" in df else [[] for _ in range(len(df))]
+    lengths = np.fromiter((len(items) for items in parsed), dtype=np.int64, count=len(df))
+    flat = [item for items in parsed for item in items]
+    items = pd.DataFrame.from_records(flat, columns=["product", "sku", "qty", "price", "line_total"])
+    items.insert(0, id_col, np.repeat(df[id_col].to_numpy(), lengths))
+    items.insert(1, "vendor_id", np.repeat(df["vendor_id"].to_numpy(), lengths))
+    items.insert(2, "date", np.repeat(df["date"].to_numpy(), lengths))
+    items["sku"] = items["sku"].astype(str)
+    items["qty"] = pd.to_numeric(items["qty"], errors="coerce").fillna(0).astype(np.int64)
+    items["price"] = pd.to_numeric(items["price"], errors="coerce").astype(float)
+    items["line_total"] = pd.to_numeric(items["line_total"], errors="coerce").astype(float)
+    return items
+
+
+def _items_keys(items: pd.DataFrame, id_col: str, ids: pd.Series) -> pd.Series:
+    """Order-independent hash of the SKU/quantity multiset per document (0 = no items).
+
+    Quantities of repeated SKU lines are summed first, so 9 + 6 monitors equals 15.
+    """
+    if items.empty:
+        return pd.Series(np.zeros(len(ids), dtype=np.uint64), index=ids.index)
+    per_sku = items.groupby([id_col, "sku"], sort=False)["qty"].sum().reset_index()
+    per_sku["h"] = pd.util.hash_pandas_object(per_sku[["sku", "qty"]], index=False).to_numpy()
+    keys = per_sku.groupby(id_col, sort=False)["h"].sum()
+    # reindex with a fill value keeps uint64; map() would go through float64 for documents
+    # without items and round the 64-bit hashes.
+    return pd.Series(keys.reindex(ids.to_numpy(), fill_value=0).to_numpy(dtype=np.uint64), index=ids.index)
+
+
+def _prepare(df: pd.DataFrame, id_col: str, amount_col: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    df = df.copy()
+    df["vendor_id"] = pd.to_numeric(df["vendor_id"], errors="coerce").astype("Int64")
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df[amount_col] = pd.to_numeric(df[amount_col], errors="coerce").astype(float)
+    items = _explode_items(df, id_col)
+    df["items_total"] = df[id_col].map(items.groupby(id_col)["line_total"].sum()).fillna(0.0)
+    df["items_key"] = _items_keys(items, id_col, df[id_col])
+    return df, items
+
+
+def _empty_ledger() -> Ledger:
+    return build_ledger(pd.DataFrame(columns=_INVOICE_COLUMNS), pd.DataFrame(columns=_TRANSACTION_COLUMNS))
+
+
+def ledger_files(data_dir: Optional[Path] = None, include_enrichment: bool = True) -> Dict[str, List[Path]]:
+    """Existing invoice/transaction CSV paths for the configured data directory.
+
+    The enrichment files extend the base `invoices.csv` / `transactions.csv` and are
+    only included alongside them: without the base data the ledger stays empty, so
+    callers fall back to the graph instead of reconciling the enrichment sample alone.
+    """
+    data_dir = Path(data_dir or os.environ.get("FINANCE_DATA_DIR", DEFAULT_DATA_DIR))
+    files: Dict[str, List[Path]] = {}
+    for kind, enrichment in (("invoices", "new_invoices.csv"), ("transactions", "new_transactions.csv")):
+        base = data_dir / f"{kind}.csv"
+        files[kind] = [base] if base.exists() else []
+        if files[kind] and include_enrichment and (ENRICHMENT_DIR / enrichment).exists():
+            files[kind].append(ENRICHMENT_DIR / enrichment)
+    return files
+
+
+def build_ledger(invoices: pd.DataFrame, transactions: pd.DataFrame) -> Ledger:
+    """Normalise raw invoice/transaction frames (CSV schema) into a Ledger."""
+    invoices = invoices.rename(columns={"invoice_number": "invoice_id"})
+    invoices = invoices.drop_duplicates("invoice_id", keep="last").reset_index(drop=True)
+    transactions = transactions.drop_duplicates("transaction_id", keep="last").reset_index(drop=True)
+    if "discount" not in transactions:
+        transactions["discount"] = 0.0
+
+    invoices, invoice_items = _prepare(invoices, "invoice_id", "total")
+    invoices["due_date"] = pd.to_datetime(invoices.get("due_date"), errors="coerce")
+    transactions, transaction_items = _prepare(transactions, "transaction_id", "amount")
+    transactions["discount"] = pd.to_numeric(transactions["discount"], errors="coerce").fillna(0.0)
+    return Ledger(invoices, transactions, invoice_items, transaction_items)
+
+
+_cache_lock = threading.Lock()
+_cache: Dict[tuple, Ledger] = {}
+
+
+def load_ledger(data_dir: Optional[Path] = None, include_enrichment: bool = True) -> Ledger:
+    """Load (and memoise by file mtimes) the ledger; empty when no CSVs are present."""
+    files = ledger_files(data_dir, include_enrichment)
+    signature = tuple(
+        (str(p), p.stat().st_mtime_ns) for kind in ("invoices", "transactions") for p in files[kind]
+    )
+    with _cache_lock:
+        if signature in _cache:
+            return _cache[signature]
+
+    if not files["invoices"] and not files["transactions"]:
+        logger.debug("load_ledger: no ledger CSVs found")
+        ledger = _empty_ledger()
+    else:
+        invoices = pd.concat(
+            [pd.DataFrame(columns=_INVOICE_COLUMNS)] + [_read_csv(p) for p in files["invoices"]], ignore_index=True
+        )
+        transactions = pd.concat(
+            [pd.DataFrame(columns=_TRANSACTION_COLUMNS)] + [_read_csv(p) for p in files["transactions"]], ignore_index=True
+        )
+        ledger = build_ledger(invoices, transactions)
+        logger.debug("load_ledger invoices=%d transactions=%d", len(ledger.invoices), len(ledger.transactions))
+
+    with _cache_lock:
+        _cache.clear()
+        _cache[signature] = ledger
+    return ledger
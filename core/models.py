@@ -1,6 +1,16 @@
+from dataclasses import dataclass, asdict, field
+from typing import List, Dict, Any, Optional
 
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Any
+# Allowed values, exposed to the LLM as JSON-schema enums (see core.schemas).
+MATCH_STATUSES = ("MATCHED", "UNMATCHED", "PARTIAL", "SUSPICIOUS")
+MATCH_TYPES = ("EXACT", "APPROX", "ONE_TO_MANY", "MANY_TO_ONE", "NONE")
+SEVERITIES = ("NONE", "LOW", "MEDIUM", "HIGH")
+CATEGORIES = ("SOFTWARE", "MARKETING", "TRAVEL", "HARDWARE", "SERVICES", "OTHER")
+TRIAGE_STATUSES = ("READY_FOR_RECON", "NEEDS_REVIEW")
+
+
+def _enum(values) -> Dict[str, Any]:
+    return {"enum": list(values)}
 
 
 @dataclass
@@ -10,9 +20,9 @@ class DashboardRow:
     vendor_name: str
     amount: float
     currency: str
-    match_status: str
-    match_type: str
-    anomaly_severity: str
+    match_status: str = field(metadata=_enum(MATCH_STATUSES))
+    match_type: str = field(metadata=_enum(MATCH_TYPES))
+    anomaly_severity: str = field(metadata=_enum(SEVERITIES))
     short_explanation: str
 
     def to_dict(self) -> Dict[str, Any]:
@@ -28,10 +38,10 @@ class ConciergeResult:
     currency: str
     issue_date: str
     due_date: str
-    category: str
-    risk_score: float
-    risk_label: str
-    triage_status: str
+    category: str = field(metadata=_enum(CATEGORIES))
+    risk_score: float = field(metadata={"minimum": 0.0, "maximum": 1.0})
+    risk_label: str = field(metadata=_enum(SEVERITIES[1:]))
+    triage_status: str = field(metadata=_enum(TRIAGE_STATUSES))
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -42,10 +52,59 @@ class AnomalyCard:
     """One anomaly card for the right-hand panel (Financial Anomaly Mini-Detective)."""
     invoice_id: str
     vendor_name: str
-    severity: str
+    severity: str = field(metadata=_enum(SEVERITIES[1:]))
     reason_codes: List[str]
     human_explanation: str
     recommendation: str
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
+
+
+# --- Missing Invoice Detective (shape of prompts/missing_invoice_prompt.txt) ---
+
+
+@dataclass
+class EvidenceFound:
+    invoices_in_period: int = 0
+    payments_in_period: int = 0
+    linked_po_or_contract_signals: str = field(default="none", metadata=_enum(("none", "weak", "strong")))
+
+
+@dataclass
+class ExpectedInvoicePattern:
+    pattern_type: str = field(default="unknown", metadata=_enum(("observed", "inferred", "unknown")))
+    cadence: str = field(default="unknown", metadata=_enum(("monthly", "weekly", "irregular", "unknown")))
+    typical_amount_range: Optional[str] = None
+    basis: str = ""
+
+
+@dataclass
+class SuspectedMissingInvoice:
+    suspected_invoice_window: str
+    expected_amount_hint: Optional[str] = None
+    reason: str = ""
+    supporting_graph_signals: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RiskFlag:
+    type: str = field(metadata=_enum(("missing_invoice", "late_invoice", "unmatched_payment", "gap_in_sequence")))
+    evidence: str = ""
+
+
+@dataclass
+class MissingInvoiceReport:
+    """Missing Invoice Detective answer for one vendor and period."""
+    vendor: str
+    period: str
+    evidence_found: EvidenceFound = field(default_factory=EvidenceFound)
+    expected_invoice_pattern: ExpectedInvoicePattern = field(default_factory=ExpectedInvoicePattern)
+    missing_or_suspected_missing_invoices: List[SuspectedMissingInvoice] = field(default_factory=list)
+    risk_flags: List[RiskFlag] = field(default_factory=list)
+    recommended_next_actions: List[str] = field(default_factory=list)
+    confidence: str = field(default="low", metadata=_enum(("low", "medium", "high")))
+    notes: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
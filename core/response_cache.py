@@ -0,0 +1,166 @@
+"""Two-tier cache for Cognee responses.
+
+Tier 1 is an in-process LRU; tier 2 is a SQLite file so answers survive
+Streamlit restarts. Keys combine the prompt hash, the model name and the graph
+version fingerprint, so a re-import or cognify run naturally misses the cache.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_PATH = Path(__file__).resolve().parent.parent / ".cache" / "cognee_responses.sqlite"
+
+
+def make_cache_key(prompt: str, model: str, graph_version: str) -> str:
+    """Stable key for a prompt answered by `model` against graph `graph_version`."""
+    digest = hashlib.sha256()
+    for part in (model, graph_version, prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """In-process LRU in front of a size-bounded SQLite store, both with a TTL."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = _DEFAULT_PATH,
+        ttl_seconds: float = 3600.0,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 5000,
+    ):
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "memory_evictions": 0, "disk_evictions": 0}
+        if self.path is not None:
+            self._open()
+
+    def _open(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed_at)")
+            self._conn.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Response cache disk tier disabled (%s): %s", self.path, exc)
+            self._conn = None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None and not self._expired(row[1], now):
+                        self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._remember(key, row[1], row[0])
+                        self._stats["disk_hits"] += 1
+                        return row[0]
+                    if row is not None:
+                        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._conn.commit()
+                except sqlite3.Error as exc:
+                    logger.debug("Response cache read failed: %s", exc)
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            self._stats["writes"] += 1
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                overflow = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_disk_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                        (overflow,),
+                    )
+                    self._stats["disk_evictions"] += overflow
+                self._conn.commit()
+            except sqlite3.Error as exc:
+                logger.debug("Response cache write failed: %s", exc)
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        stats["path"] = str(self.path) if self._conn is not None else None
+        return stats
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide cache configured from env, or None when disabled."""
+    global _cache
+    if os.environ.get("COGNEE_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache(
+                path=Path(os.environ.get("COGNEE_CACHE_PATH", str(_DEFAULT_PATH))),
+                ttl_seconds=float(os.environ.get("COGNEE_CACHE_TTL", "3600")),
+                max_memory_entries=int(os.environ.get("COGNEE_CACHE_MEMORY_ENTRIES", "256")),
+                max_disk_entries=int(os.environ.get("COGNEE_CACHE_DISK_ENTRIES", "5000")),
+            )
+        return _cache
@@ -0,0 +1,169 @@
+"""JSON schemas derived from the core.models dataclasses.
+
+The schemas are passed to the Ollama/OpenAI-compatible endpoint as a
+`response_format` constraint, so the SLM can only emit tokens that form a
+valid document of the expected shape: no prose to throw away, no malformed
+JSON to repair or retry. `from_json` validates (and lightly coerces) the
+decoded answer back into the dataclass.
+
+Field types map as str -> string, float -> number, int -> integer,
+bool -> boolean, List[T] -> array, Optional[T] -> T or null and nested
+dataclasses -> object; `field(metadata={"enum": [...]})` (or any other JSON
+schema keyword) is copied onto the property.
+"""
+
+import dataclasses
+import json
+import os
+import typing
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Type, TypeVar
+
+T = TypeVar("T")
+
+# Send schemas as response_format; set LLM_STRUCTURED_OUTPUT=false for endpoints without support.
+STRUCTURED_OUTPUT = os.environ.get("LLM_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+
+_SCALARS = {str: "string", float: "number", int: "integer", bool: "boolean"}
+
+
+class SchemaValidationError(ValueError):
+    """An LLM answer does not fit the dataclass it was constrained to."""
+
+
+def _type_schema(tp: Any) -> Dict[str, Any]:
+    origin, args = typing.get_origin(tp), typing.get_args(tp)
+    if origin is typing.Union and type(None) in args:
+        inner = [a for a in args if a is not type(None)]
+        return {"anyOf": [_type_schema(inner[0]), {"type": "null"}]}
+    if origin in (list, Sequence, tuple):
+        return {"type": "array", "items": _type_schema(args[0]) if args else {}}
+    if dataclasses.is_dataclass(tp):
+        return json_schema(tp)
+    if tp in _SCALARS:
+        return {"type": _SCALARS[tp]}
+    raise TypeError(f"No JSON schema mapping for {tp!r}")
+
+
+@lru_cache(maxsize=None)
+def _object_schema(cls: type, fields: Optional[Tuple[str, ...]]) -> str:
+    hints = typing.get_type_hints(cls)
+    properties = {}
+    for f in dataclasses.fields(cls):
+        if fields is not None and f.name not in fields:
+            continue
+        properties[f.name] = {**_type_schema(hints[f.name]), **dict(f.metadata)}
+    schema = {
+        "title": cls.__name__,
+        "type": "object",
+        "properties": properties,
+        # Constrained decoding only guarantees keys that are required.
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+    return json.dumps(schema)
+
+
+def json_schema(cls: type, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Object schema for dataclass `cls`, optionally restricted to `fields`."""
+    return json.loads(_object_schema(cls, tuple(fields) if fields is not None else None))
+
+
+def array_schema(items: Dict[str, Any]) -> Dict[str, Any]:
+    return {"title": f"{items.get('title', 'Item')}List", "type": "array", "items": items}
+
+
+def mapping_schema(values: Dict[str, Any], title: str = "Mapping") -> Dict[str, Any]:
+    """Object with arbitrary keys (e.g. invoice IDs) whose values all match `values`."""
+    return {"title": title, "type": "object", "additionalProperties": values}
+
+
+def response_format(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """OpenAI-style `response_format` for `schema` (Ollama accepts it on /v1 as well)."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.get("title", "Response"), "schema": schema},
+    }
+
+
+def _coerce(tp: Any, value: Any, path: str) -> Any:
+    origin, args = typing.get_origin(tp), typing.get_args(tp)
+    if origin is typing.Union and type(None) in args:
+        if value is None:
+            return None
+        return _coerce(next(a for a in args if a is not type(None)), value, path)
+    if origin in (list, Sequence, tuple):
+        if not isinstance(value, list):
+            raise SchemaValidationError(f"{path}: expected an array, got {type(value).__name__}")
+        return [_coerce(args[0], v, f"{path}[{i}]") for i, v in enumerate(value)] if args else list(value)
+    if dataclasses.is_dataclass(tp):
+        return from_json(tp, value, path=path)
+    if tp is str:
+        if isinstance(value, (dict, list)) or value is None:
+            raise SchemaValidationError(f"{path}: expected a string, got {type(value).__name__}")
+        return str(value)
+    if tp in (float, int):
+        if isinstance(value, bool):
+            raise SchemaValidationError(f"{path}: expected a number, got a boolean")
+        try:
+            number = float(str(value).replace(",", "")) if isinstance(value, str) else float(value)
+        except (TypeError, ValueError):
+            raise SchemaValidationError(f"{path}: expected a number, got {value!r}") from None
+        return int(number) if tp is int else number
+    if tp is bool:
+        if not isinstance(value, bool):
+            raise SchemaValidationError(f"{path}: expected a boolean, got {value!r}")
+        return value
+    return value
+
+
+def coerce_fields(cls: type, data: Dict[str, Any], fields: Iterable[str], path: str = "$") -> Dict[str, Any]:
+    """Validate the given subset of `cls` fields present in `data`; returns the coerced values."""
+    hints = typing.get_type_hints(cls)
+    meta = {f.name: f.metadata for f in dataclasses.fields(cls)}
+    out: Dict[str, Any] = {}
+    for name in fields:
+        if name not in data:
+            continue
+        value = _coerce(hints[name], data[name], f"{path}.{name}")
+        allowed = meta[name].get("enum")
+        if allowed is not None and value is not None:
+            value = _match_enum(value, allowed, f"{path}.{name}")
+        out[name] = value
+    return out
+
+
+def _match_enum(value: Any, allowed: Sequence[Any], path: str) -> Any:
+    if value in allowed:
+        return value
+    if isinstance(value, str):
+        # Unconstrained answers often differ only in case ("Matched", "high").
+        folded = {str(a).lower(): a for a in allowed}
+        if value.strip().lower() in folded:
+            return folded[value.strip().lower()]
+    raise SchemaValidationError(f"{path}: {value!r} is not one of {list(allowed)}")
+
+
+def from_json(cls: Type[T], data: Any, defaults: Optional[Dict[str, Any]] = None, path: str = "$") -> T:
+    """Validate decoded JSON into dataclass `cls`.
+
+    Missing fields fall back to `defaults`, then to the dataclass defaults; unknown
+    keys are ignored. Raises SchemaValidationError naming the offending path.
+    """
+    if not isinstance(data, dict):
+        raise SchemaValidationError(f"{path}: expected an object, got {type(data).__name__}")
+    merged = dict(defaults or {})
+    # An explicit null only overrides fields without a default.
+    merged.update({k: v for k, v in data.items() if v is not None or k not in merged})
+    hints = typing.get_type_hints(cls)
+    names, missing = [], []
+    for f in dataclasses.fields(cls):
+        names.append(f.name)
+        has_default = f.default is not dataclasses.MISSING or f.default_factory is not dataclasses.MISSING
+        if has_default and merged.get(f.name, 0) is None and type(None) not in typing.get_args(hints[f.name]):
+            del merged[f.name]
+        if f.name not in merged and not has_default:
+            missing.append(f.name)
+    if missing:
+        raise SchemaValidationError(f"{path}: missing {', '.join(missing)}")
+    return cls(**coerce_fields(cls, merged, names, path))
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+for path in (_ROOT, _ROOT / "cognee-minihack"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import pandas as pd
+import pytest
+
+
+def items(*lines):
+    """CSV `items` cell for (sku, qty, price) lines, in the generator's repr() format."""
+    return repr([
+        {"product": sku.title(), "sku": sku, "qty": qty, "price": float(price), "total": float(qty * price)}
+        for sku, qty, price in lines
+    ])
+
+
+@pytest.fixture
+def make_ledger():
+    """Ledger from invoice rows (id, vendor, date, total, items[, due]) and transaction rows
+    (id, vendor, date, amount, items[, discount])."""
+    from core.ledger import build_ledger
+
+    def build(invoices=(), transactions=()):
+        inv = pd.DataFrame(
+            [(i[0], i[2], i[5] if len(i) > 5 else None, i[1], i[3], i[4]) for i in invoices],
+            columns=["invoice_number", "date", "due_date", "vendor_id", "total", "items"],
+        )
+        tx = pd.DataFrame(
+            [(t[0], t[2], t[1], t[3], t[4], t[5] if len(t) > 5 else 0.0) for t in transactions],
+            columns=["transaction_id", "date", "vendor_id", "amount", "items", "discount"],
+        )
+        return build_ledger(inv, tx)
+
+    return build
@@ -0,0 +1,57 @@
+import logging
+
+import core.agents as agents
+
+
+def test_vendor_shards_come_from_the_ledger(make_ledger, monkeypatch):
+    ledger = make_ledger([("INV-1", 2, "2025-01-01", 1.0, None), ("INV-2", 1, "2025-02-01", 1.0, None)])
+    monkeypatch.setattr(agents, "load_ledger", lambda: ledger)
+    monkeypatch.setattr(agents, "graph_vendor_names", lambda: ["Vendor 9"])
+    assert agents._shard_keys("vendor", None) == ["Vendor 1", "Vendor 2"]
+    assert agents._shard_keys("month", None) == ["2025-01", "2025-02"]
+    assert agents._shard_keys("vendor", ["Vendor 5"]) == ["Vendor 5"]
+    assert agents._shard_keys(None, None) == []
+
+
+def test_empty_ledger_uses_graph_vendors_and_warns_otherwise(make_ledger, monkeypatch, caplog):
+    monkeypatch.setattr(agents, "load_ledger", lambda: make_ledger())
+    monkeypatch.setattr(agents, "graph_vendor_names", lambda: ["Vendor 1", "Vendor 3"])
+    assert agents._shard_keys("vendor", None) == ["Vendor 1", "Vendor 3"]
+
+    monkeypatch.setattr(agents, "graph_vendor_names", lambda: [])
+    with caplog.at_level(logging.WARNING, logger="core.agents"):
+        assert agents._shard_keys("vendor", None) == []
+        assert agents._shard_keys("month", None) == []
+    assert [r.levelno for r in caplog.records] == [logging.WARNING, logging.WARNING]
+
+
+def test_auto_dashboard_without_data_uses_the_llm_and_graph_vendors(tmp_path, monkeypatch):
+    monkeypatch.setenv("FINANCE_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setattr(agents, "graph_vendor_names", lambda: ["Vendor 1"])
+    prompts = []
+
+    def llm_rows(limit, use_cache, wire_format, scope=None):
+        prompts.append(scope)
+        return []
+
+    monkeypatch.setattr(agents, "_llm_dashboard_rows", llm_rows)
+    assert agents.get_reconciliation_dashboard() == []
+    assert agents.get_reconciliation_dashboard(shard_by="vendor") == []
+    assert prompts == [None, "invoices of Vendor 1 (only this vendor)"]
+
+
+def test_concierge_sources_directory_single_text_and_long_text(tmp_path):
+    (tmp_path / "b.txt").write_text("Invoice INV-2")
+    (tmp_path / "a.txt").write_text("Invoice INV-1")
+    expected = [("a.txt", "Invoice INV-1"), ("b.txt", "Invoice INV-2")]
+    assert list(agents._concierge_sources(tmp_path)) == expected
+    assert list(agents._concierge_sources(str(tmp_path))) == expected
+    assert list(agents._concierge_sources("Invoice INV-1 total 10 EUR")) == [("0", "Invoice INV-1 total 10 EUR")]
+    for long_text in ("Invoice INV-1 " + "x" * 300, "Invoice INV-1 " + "x" * 5000):  # over the file name limit
+        assert list(agents._concierge_sources(long_text)) == [("0", long_text)]
+    assert list(agents._concierge_sources(["one", "two"])) == [("0", "one"), ("1", "two")]
+
+
+def test_concierge_batch_on_a_single_text_runs_once(monkeypatch):
+    monkeypatch.setattr(agents, "run_concierge_on_invoice_text", lambda text, use_cache, llm_risk: text.upper())
+    assert list(agents.run_concierge_batch("Invoice INV-1")) == [("0", "INVOICE INV-1")]
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import ann_index
+from ann_index import AnnIndex, IVFIndex, _normalize, _normalized
+
+
+def _vectors(rows, seed=0):
+    return _normalize(np.random.default_rng(seed).standard_normal((rows, 16)).astype(np.float32))
+
+
+@pytest.fixture
+def version(monkeypatch):
+    current = {"version": "v1"}
+    monkeypatch.setattr(ann_index, "get_graph_version", lambda: current["version"])
+    return current
+
+
+def test_flat_index_search_is_exact():
+    vectors = _vectors(200)
+    index = IVFIndex.build([str(i) for i in range(200)], vectors, quantization="none")
+    query = vectors[7]
+    exact = np.argsort(-(vectors @ query))[:5]
+    assert [row_id for row_id, _ in index.search(query, 5)] == [str(i) for i in exact]
+    assert index.farthest(query) == pytest.approx(1.0 - float((vectors @ query).min()), abs=1e-6)
+
+
+def test_covers_requires_the_current_graph_version(tmp_path, version):
+    ann = AnnIndex(tmp_path, {"Entity_name": IVFIndex.build(["a", "b"], _vectors(2), quantization="none")})
+    ann.save()
+    loaded = AnnIndex.load(tmp_path)
+    assert loaded.graph_version == "v1" and loaded.covers(["Entity_name"])
+    assert not loaded.covers(["Entity_name", "EdgeType_relationship_name"])
+    version["version"] = "v2"
+    assert not loaded.covers(["Entity_name"])
+
+
+def test_index_without_a_recorded_version_is_not_current(tmp_path, version):
+    assert not AnnIndex(tmp_path, indexed=["Entity_name"]).covers(["Entity_name"])
+
+
+def test_candidate_scores_are_normalised_over_the_collection_range():
+    distances = np.asarray([0.2, 0.3], dtype=np.float32)
+    # Over the candidates alone the second one would score 1.0, as if it were the farthest row.
+    assert _normalized(distances, high=1.2).tolist() == pytest.approx([0.0, 0.1])
+    assert _normalized(np.asarray([0.5, 0.5], dtype=np.float32), high=0.5).tolist() == [0.0, 0.0]
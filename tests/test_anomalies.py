@@ -0,0 +1,52 @@
+from conftest import items
+
+from core.anomalies import anomaly_candidates, score_anomalies
+
+
+def _codes(scored):
+    return {doc: set(codes) for doc, codes in zip(scored["document_id"], scored["reason_codes"])}
+
+
+def test_reconciliation_findings(make_ledger):
+    basket = items(("LAP-1", 1, 1000))
+    ledger = make_ledger(
+        [("INV-OK", 1, "2025-01-01", 1000.0, basket), ("INV-OVER", 2, "2025-01-01", 1000.0, basket),
+         ("INV-OPEN", 3, "2025-01-01", 1000.0, basket)],
+        [("TX-OK", 1, "2025-01-05", 1000.0, basket), ("TX-OVER", 2, "2025-01-05", 1500.0, basket),
+         ("TX-ORPHAN", 4, "2025-01-05", 80.0, None)],
+    )
+    codes = _codes(score_anomalies(ledger))
+    assert "INV-OK" not in codes
+    assert "OVERPAID" in codes["INV-OVER"]
+    assert "NO_MATCH" in codes["INV-OPEN"]
+    assert codes["TX-ORPHAN"] == {"UNMATCHED_PAYMENT"}
+
+
+def test_price_outlier_total_mismatch_and_early_payment(make_ledger):
+    invoices = [(f"INV-{i}", 1, "2025-01-01", 100.0, items(("SSD-1", 1, 100))) for i in range(12)]
+    invoices.append(("INV-PRICEY", 1, "2025-01-01", 1000.0, items(("SSD-1", 1, 1000))))
+    invoices.append(("INV-SUM", 2, "2025-01-01", 900.0, items(("MON-1", 2, 500))))
+    invoices.append(("INV-LATE", 3, "2025-03-01", 50.0, items(("KEY-1", 1, 50))))
+    ledger = make_ledger(invoices, [("TX-EARLY", 3, "2025-02-01", 50.0, items(("KEY-1", 1, 50)))])
+    codes = _codes(score_anomalies(ledger))
+    assert "PRICE_OUTLIER" in codes["INV-PRICEY"]
+    assert "PRICE_OUTLIER" not in codes.get("INV-0", set())
+    assert "TOTAL_MISMATCH" in codes["INV-SUM"]
+    assert "PAID_BEFORE_ISSUE" in codes["INV-LATE"]
+
+
+def test_scores_are_ranked_and_cards_built(make_ledger):
+    basket = items(("LAP-1", 1, 1000))
+    ledger = make_ledger(
+        [("INV-OVER", 2, "2025-01-01", 1000.0, basket), ("INV-OPEN", 3, "2025-01-01", 1000.0, basket)],
+        [("TX-OVER", 2, "2025-01-05", 1500.0, basket)],
+    )
+    scored = score_anomalies(ledger)
+    assert list(scored["score"]) == sorted(scored["score"], reverse=True)
+    cards = anomaly_candidates(scored, limit=1)
+    assert len(cards) == 1 and cards[0].invoice_id == scored["document_id"][0]
+    assert cards[0].vendor_name.startswith("Vendor ") and cards[0].recommendation
+
+
+def test_empty_ledger(make_ledger):
+    assert score_anomalies(make_ledger()).empty
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from core.cadence import build_cadence_index, missing_invoice_sweep
+
+
+def _monthly(vendor, months, skip=()):
+    return [(f"INV-{vendor}-{m}", vendor, f"2025-{m:02d}-05", 100.0, None) for m in months if m not in skip]
+
+
+def test_cadence_classification(make_ledger):
+    irregular = [(f"INV-9-{d}", 9, d, 100.0, None) for d in ("2025-01-01", "2025-01-04", "2025-03-20", "2025-04-01")]
+    ledger = make_ledger(_monthly(1, range(1, 7)) + irregular + _monthly(5, [1, 2]))
+    index = build_cadence_index(ledger)
+    assert index[1].cadence == "monthly" and index[1].is_regular
+    assert index[9].cadence == "irregular"
+    assert index[5].cadence == "unknown"  # too few invoices
+
+
+def test_expected_dates_step_the_median_gap(make_ledger):
+    index = build_cadence_index(make_ledger(_monthly(1, range(1, 5))))
+    expected = index[1].expected_dates(pd.Timestamp("2025-05-01"), pd.Timestamp("2025-05-31"))
+    assert len(expected) == 1 and expected[0].month == 5
+
+
+def test_sweep_flags_the_missing_month(make_ledger):
+    ledger = make_ledger(_monthly(1, range(1, 8), skip=(4,)))
+    findings = {f.period: f for f in missing_invoice_sweep(ledger, "2025-02-01", "2025-06-30")}
+    assert findings["2025-04"].status == "MISSING" and findings["2025-04"].missing_windows
+    assert findings["2025-03"].status == "OK"
+
+
+def test_unclaimed_payment_without_cadence_is_ambiguous(make_ledger):
+    ledger = make_ledger(_monthly(2, [1]), [("TX-1", 2, "2025-03-10", 80.0, None)])
+    findings = {f.period: f for f in missing_invoice_sweep(ledger, "2025-03-01", "2025-03-31",
+                                                          unclaimed_transaction_ids=["TX-1"])}
+    assert findings["2025-03"].status == "AMBIGUOUS"
+    plain = missing_invoice_sweep(ledger, "2025-03-01", "2025-03-31")
+    assert plain[0].status == "NO_EVIDENCE"
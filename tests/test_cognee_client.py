@@ -0,0 +1,111 @@
+import json
+import sys
+import threading
+
+import pytest
+
+import core.cognee_client as cognee_client
+
+
+class _Backend:
+    def __init__(self):
+        self.calls = []
+
+    def completion(self, prompt, response_format=None, use_cache=True):
+        self.calls.append(("completion", use_cache))
+        return "answer"
+
+    def completion_stream(self, prompt, response_format=None, use_cache=True):
+        self.calls.append(("stream", use_cache))
+        yield "ans"
+        yield "wer"
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    fake = _Backend()
+    monkeypatch.setenv("COGNEE_CACHE_DISABLED", "1")
+    monkeypatch.setattr(cognee_client, "_backend", fake)
+    return fake
+
+
+def test_use_cache_reaches_the_pipeline(backend):
+    cognee_client.ask_cognee_raw("q")
+    cognee_client.ask_cognee_raw("q", use_cache=False)
+    assert "".join(cognee_client.ask_cognee_stream("q", use_cache=False)) == "answer"
+    assert backend.calls == [("completion", True), ("completion", False), ("stream", False)]
+
+
+def test_refresh_skips_the_response_cache(monkeypatch, tmp_path, backend):
+    monkeypatch.delenv("COGNEE_CACHE_DISABLED")
+    monkeypatch.setenv("COGNEE_CACHE_PATH", str(tmp_path / "responses.sqlite"))
+    monkeypatch.setattr("core.response_cache._cache", None)
+    assert cognee_client.ask_cognee_raw("q") == "answer"
+    assert cognee_client.ask_cognee_raw("q") == "answer"
+    cognee_client.ask_cognee_raw("q", use_cache=False)
+    assert backend.calls == [("completion", True), ("completion", False)]
+
+
+def test_unavailable_backend_returns_error_json(monkeypatch):
+    monkeypatch.setenv("COGNEE_CACHE_DISABLED", "1")
+    monkeypatch.setattr(cognee_client, "_load_backend", lambda: None)
+    assert "error" in json.loads(cognee_client.ask_cognee_raw("q"))
+
+
+def test_graph_vendor_names_degrades_to_empty(monkeypatch, backend):
+    backend.vendor_names = lambda: ["Vendor 1"]
+    assert cognee_client.graph_vendor_names() == ["Vendor 1"]
+
+    def fail():
+        raise RuntimeError("graph engine down")
+
+    backend.vendor_names = fail
+    assert cognee_client.graph_vendor_names() == []
+    monkeypatch.setattr(cognee_client, "_load_backend", lambda: None)
+    assert cognee_client.graph_vendor_names() == []
+
+
+@pytest.fixture
+def failing_import(monkeypatch):
+    """solution_q_and_a that fails to import; returns the list of attempts."""
+    attempts = []
+
+    class _Finder:
+        def find_spec(self, name, path=None, target=None):
+            if name == "solution_q_and_a":
+                attempts.append(name)
+                raise ImportError("no cognee here")
+            return None
+
+    monkeypatch.setattr(cognee_client, "_backend", None)
+    monkeypatch.setattr(cognee_client, "_status", cognee_client.BackendStatus())
+    monkeypatch.delitem(sys.modules, "solution_q_and_a", raising=False)
+    monkeypatch.setattr(sys, "meta_path", [_Finder(), *sys.meta_path])
+    return attempts
+
+
+def test_failed_import_is_retried_after_the_cooldown_or_a_reset(monkeypatch, failing_import):
+    monkeypatch.setattr(cognee_client, "COGNEE_RETRY_S", 3600.0)
+    assert cognee_client._load_backend() is None
+    assert cognee_client._load_backend() is None
+    assert len(failing_import) == 1 and cognee_client.readiness()["state"] == "failed"
+
+    cognee_client.reset()
+    assert cognee_client.readiness()["state"] == "not_loaded"
+    assert cognee_client._load_backend() is None and len(failing_import) == 2
+
+    monkeypatch.setattr(cognee_client, "COGNEE_RETRY_S", 0.0)
+    assert cognee_client._load_backend() is None and len(failing_import) == 3
+
+
+def test_prewarm_does_not_wait_for_an_import_in_progress(monkeypatch):
+    monkeypatch.setattr(cognee_client, "COGNEE_PREWARM", True)
+    monkeypatch.setattr(cognee_client, "_backend", None)
+    monkeypatch.setattr(cognee_client, "_prewarm_thread", None)
+    monkeypatch.setattr(cognee_client, "_prewarm", lambda: None)
+    with cognee_client._backend_lock:  # as the prewarm thread holds it during the import
+        caller = threading.Thread(target=cognee_client.prewarm, daemon=True)
+        caller.start()
+        caller.join(2)
+        assert not caller.is_alive()
+    cognee_client._prewarm_thread.join(5)
@@ -0,0 +1,67 @@
+from core.compact import compact_format, enum_codes
+from core.models import AnomalyCard, DashboardRow
+from core.schemas import from_json
+
+ROWS = [
+    {"invoice_id": "INV-1", "vendor_name": "Vendor 1", "amount": "10.00", "currency": "EUR",
+     "match_status": "MATCHED", "match_type": "MANY_TO_ONE", "anomaly_severity": "MEDIUM",
+     "short_explanation": "two invoices, one payment"},
+    {"invoice_id": "INV-2", "vendor_name": "Vendor 2", "amount": "5.50", "currency": "USD",
+     "match_status": "UNMATCHED", "match_type": "NONE", "anomaly_severity": "HIGH",
+     "short_explanation": "no payment"},
+]
+
+
+def test_encode_parse_round_trip():
+    fmt = compact_format(DashboardRow)
+    text = fmt.encode(ROWS)
+    assert text.splitlines()[0] == fmt.header
+    assert fmt.parse(text) == ROWS
+    assert [from_json(DashboardRow, row).amount for row in fmt.parse(text)] == [10.0, 5.5]
+
+
+def test_enum_codes_shortest_unique_prefix():
+    assert enum_codes(["MATCHED", "MANY_TO_ONE", "MEDIUM", "LOW"]) == {
+        "MATCHED": "MAT", "MANY_TO_ONE": "MAN", "MEDIUM": "ME", "LOW": "L",
+    }
+
+
+def test_codes_are_unique_across_the_legend():
+    for cls in (DashboardRow, AnomalyCard):
+        meaning = {}
+        for codes in compact_format(cls).codes.values():
+            for value, code in codes.items():
+                assert meaning.setdefault(code, value) == value, (cls.__name__, code)
+    codes = compact_format(DashboardRow).codes
+    assert codes["match_type"]["NONE"] == codes["anomaly_severity"]["NONE"]
+
+
+def test_instructions_list_every_code():
+    fmt = compact_format(DashboardRow)
+    text = fmt.instructions()
+    for name, codes in fmt.codes.items():
+        assert all(f"{code}={value}" in text for value, code in codes.items())
+
+
+def test_header_reorders_and_noise_is_skipped():
+    fmt = compact_format(AnomalyCard)
+    codes = fmt.codes["severity"]
+    text = (
+        "```\n"
+        "vendor_name\tinvoice_id\tseverity\treason_codes\thuman_explanation\trecommendation\n"
+        f"Vendor 1\tINV-1\t{codes['HIGH']}\tPRICE_OUTLIER, TOTAL_MISMATCH\tprice\twith a\ttab\n"
+        "short\tline\n"
+        "```"
+    )
+    assert fmt.parse(text) == [{
+        "vendor_name": "Vendor 1", "invoice_id": "INV-1", "severity": "HIGH",
+        "reason_codes": ["PRICE_OUTLIER", "TOTAL_MISMATCH"], "human_explanation": "price",
+        "recommendation": "with a tab",
+    }]
+
+
+def test_stream_yields_rows_as_lines_end():
+    fmt = compact_format(DashboardRow)
+    text = fmt.encode(ROWS)
+    chunks = [text[i:i + 5] for i in range(0, len(text), 5)]
+    assert list(fmt.iter_stream(chunks)) == ROWS
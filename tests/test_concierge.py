@@ -0,0 +1,87 @@
+from core.concierge import EXTRACTED_FIELDS, pre_extract, rule_risk
+
+from conftest import items
+
+INVOICE = """INVOICE
+Invoice No: INV-V3-M05-123456
+Vendor: 3
+Invoice date: 2025-05-02
+Due: 2025-06-01
+1x Laptop Pro 14   1,200.00 EUR
+Total: 1,250.50 EUR
+"""
+
+
+def test_pre_extract_reads_labelled_fields():
+    fields = pre_extract(INVOICE)
+    assert fields == {
+        "invoice_id": "INV-V3-M05-123456",
+        "vendor_name": "Vendor 3",
+        "amount": 1250.50,
+        "currency": "EUR",
+        "issue_date": "2025-05-02",
+        "due_date": "2025-06-01",
+        "category": "HARDWARE",
+    }
+
+
+def test_pre_extract_european_dates_and_labelled_id():
+    fields = pre_extract("Rechnung Nr. R-2025/77\nDatum 03.04.2025\nZahlbar bis 17.04.2025\nCHF")
+    assert fields["invoice_id"] == "R-2025/77"
+    assert fields["issue_date"] == "2025-04-03" and fields["due_date"] == "2025-04-17"
+    assert fields["currency"] == "CHF"
+
+
+def test_pre_extract_empty_text():
+    assert pre_extract("") == {}
+    assert pre_extract(None) == {}
+
+
+def test_rule_risk_without_ledger():
+    score, label, reasons = rule_risk(pre_extract(INVOICE))
+    assert (score, label, reasons) == (0.1, "LOW", [])
+    _, _, reasons = rule_risk({"issue_date": "2025-05-02", "due_date": "2025-04-01"})
+    assert reasons == ["DUE_BEFORE_ISSUE", "INCOMPLETE"]
+
+
+def test_rule_risk_against_the_ledger(make_ledger):
+    basket = items(("SKU-LAP", 1, 100))
+    ledger = make_ledger([
+        (f"INV-V3-M0{m}-00000{m}", 3, f"2025-0{m}-01", 100.0 + m, basket) for m in range(1, 6)
+    ])
+    fields = dict.fromkeys(EXTRACTED_FIELDS, "x")
+
+    duplicate = dict(fields, invoice_id="inv-v3-m01-000001", vendor_name="Vendor 3", amount=102.0)
+    score, label, reasons = rule_risk(duplicate, ledger)
+    assert reasons == ["DUPLICATE_INVOICE_ID"] and label == "MEDIUM" and score == 0.5
+
+    outlier = dict(fields, invoice_id="INV-NEW", vendor_name="Vendor 3", amount=10_000.0)
+    assert rule_risk(outlier, ledger)[2] == ["AMOUNT_OUTLIER"]
+
+    unknown = dict(fields, invoice_id="INV-NEW", vendor_name="Vendor 99", amount=100.0)
+    assert rule_risk(unknown, ledger)[2] == ["UNKNOWN_VENDOR"]
+
+
+def test_total_ignores_amount_paid():
+    fields = pre_extract("Total 99.50 USD\nAmount paid: 0.00")
+    assert fields["amount"] == 99.50 and fields["currency"] == "USD"
+
+
+def test_total_prefers_the_most_specific_label():
+    text = "Amount due: 120.00\nTotal: 100.00\nTax total: 20.00\nDiscount amount 5.00\nAmount 7.00"
+    assert pre_extract(text)["amount"] == 120.00
+    text = "Subtotal 100.00\nSub-total 100.00\nVAT 19.00\nTotal (incl. VAT): 119.00\nPayment received: 50.00"
+    assert pre_extract(text)["amount"] == 119.00
+
+
+def test_total_european_format():
+    fields = pre_extract("Rechnung Nr. R-1\nMwSt 19%: 197,11\nGesamtbetrag 1.234,56 €")
+    assert fields["amount"] == 1234.56 and fields["currency"] == "EUR"
+
+
+def test_due_before_issue_compares_dates_not_strings():
+    base = dict.fromkeys(EXTRACTED_FIELDS, "x")
+    # Lexically "15.05.2025" < "2025-05-01", but it is the later date.
+    assert rule_risk(dict(base, issue_date="2025-05-01", due_date="15.05.2025"))[2] == []
+    assert rule_risk(dict(base, issue_date="15.05.2025", due_date="2025-05-01"))[2] == ["DUE_BEFORE_ISSUE"]
+    assert rule_risk(dict(base, issue_date="2025-05-01", due_date="UNKNOWN"))[2] == []
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from context_compaction import _approx_counts, compact_context, node_fragment
+
+
+def _node(node_id, **attributes):
+    return SimpleNamespace(id=node_id, attributes=attributes)
+
+
+def _triplet(a, relation, b):
+    return SimpleNamespace(node1=a, node2=b, attributes={"relationship_type": relation})
+
+
+INV = _node("inv", name="INV-1", description="Invoice INV-1 from Vendor 1")
+VENDOR = _node("vendor", name="Vendor 1", description="A vendor")
+ITEM = _node("item", name="Item 1", description="1x laptop")
+
+
+def test_node_fragment_prefers_chunk_text():
+    assert node_fragment({"text": "one two three four"}) == ("one two three...", "one two three four")
+    assert node_fragment({"name": "X"}) == ("X", "X")
+
+
+def test_nodes_once_and_parallel_edges_collapsed():
+    triplets = [
+        _triplet(INV, "issued_by", VENDOR),
+        _triplet(INV, "billed_by", VENDOR),
+        _triplet(INV, "contains_item", ITEM),
+    ]
+    result = compact_context(triplets, budget=10_000, count=_approx_counts)
+    assert result.text.count("Node: INV-1") == 1
+    assert "INV-1 --[issued_by, billed_by]--> Vendor 1" in result.text
+    assert result.edges_in == result.edges_kept == 3
+    assert result.tokens_kept < result.tokens_in
+
+
+def test_shared_descriptions_become_references():
+    twin = _node("inv-copy", name="INV-1 (copy)", description="Invoice INV-1 from Vendor 1")
+    result = compact_context([_triplet(INV, "issued_by", VENDOR), _triplet(twin, "issued_by", VENDOR)],
+                             budget=10_000, count=_approx_counts)
+    assert "(same as INV-1)" in result.text
+    assert result.text.count("Invoice INV-1 from Vendor 1") == 1
+
+
+def test_budget_is_respected_and_extras_come_last():
+    triplets = [_triplet(_node(f"n{i}", name=f"N{i}", description="word " * 20), "rel", VENDOR) for i in range(20)]
+    result = compact_context(triplets, extra_connections=["A --[x]--> B", "A --[x]--> B"], budget=200,
+                             count=_approx_counts)
+    assert result.tokens_kept <= 200 and 0 < result.edges_kept < result.edges_in
+    full = compact_context(triplets[:1], extra_connections=["A --[x]--> B", "A --[x]--> B"], budget=10_000,
+                           count=_approx_counts)
+    assert full.text.endswith("A --[x]--> B") and full.text.count("A --[x]--> B") == 1
+
+
+def test_oversized_top_ranked_chunk_is_cut_to_the_budget_not_dropped():
+    chunk = _node("chunk", text=" ".join(f"word{i}" for i in range(3000)))
+    triplets = [_triplet(chunk, "mentions", VENDOR), _triplet(INV, "issued_by", VENDOR)]
+    result = compact_context(triplets, budget=300, count=_approx_counts)
+    assert result.tokens_kept <= 300
+    assert "word0 word1" in result.text and "word2999" not in result.text and "[...]" in result.text
+    assert "Node: Vendor 1" in result.text and "--[mentions]--> Vendor 1" in result.text
@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from context_compaction import _approx_counts
+from fragment_store import FragmentStore
+
+
+def _node(node_id, **attributes):
+    return SimpleNamespace(id=node_id, attributes=attributes)
+
+
+def test_entry_renders_nodes_whose_attributes_changed_since_the_sync(tmp_path):
+    store = FragmentStore(tmp_path / "fragments.sqlite", count=_approx_counts)
+    store.sync([("inv", {"name": "INV-1", "description": "old total 100"})], [])
+    assert store.entry(_node("inv", name="INV-1", description="old total 100")) == ("INV-1", "old total 100")
+    assert store.entry(_node("inv", name="INV-1", description="new total 120")) == ("INV-1", "new total 120")
+    assert store.stats()["node_hits"] == 1 and store.stats()["node_misses"] == 1
+
+
+def test_sync_persists_changes_and_drops_removed_nodes(tmp_path):
+    path = tmp_path / "fragments.sqlite"
+    store = FragmentStore(path, count=_approx_counts)
+    first = store.sync([("a", {"name": "A"}), ("b", {"name": "B"})], [("a", "b", "rel", {})])
+    assert first["changed"] == 2 and first["lines_counted"] == 1
+    second = store.sync([("a", {"name": "A"})], [])
+    assert second["changed"] == 0 and second["removed"] == 1
+    assert len(FragmentStore(path, count=_approx_counts)) == 1
+
+
+def test_token_counts_are_capped_and_pruned_on_sync(tmp_path):
+    store = FragmentStore(tmp_path / "fragments.sqlite", count=_approx_counts, max_tokens=4)
+    store.count([f"query-time piece {i}" for i in range(10)])
+    assert store.stats()["token_counts"] == 4
+    assert store.count(["one more piece"]) == _approx_counts(["one more piece"])
+    changes = store.sync([("a", {"name": "A"})], [])
+    assert changes["tokens_pruned"] == 4
+    assert store.stats()["token_counts"] == 1
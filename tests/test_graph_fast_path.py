@@ -0,0 +1,46 @@
+import pytest
+
+import graph_fast_path
+from graph_fast_path import GraphQueryResult, Intent, detect_intent
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("list all payments to Vendor 2", Intent("payments_to_vendor", {"vendor": "vendor 2"})),
+    ("Vendor 4's invoices", Intent("invoices_from_vendor", {"vendor": "vendor 4"})),
+    ("did we pay for SKU PTD-LAP-003", Intent("documents_with_sku", {"sku": "ptd-lap-003"})),
+    ("show INV‐V3‐M04‐277438", Intent("document_details", {"document": "inv-v3-m04-277438"})),
+    ("did we pay Vendor 3 for a laptop", None),
+    ("compare INV-V1-M01-1 and INV-V1-M02-2", None),
+    ("payments to Vendor 2 and Vendor 3", None),
+    ("x" * 400 + " payments to Vendor 2", None),
+])
+def test_detect_intent(question, intent):
+    assert detect_intent(question) == intent
+
+
+@pytest.fixture
+def fast_path(monkeypatch):
+    pytest.importorskip("cognee")
+    import solution_q_and_a
+
+    async def run_intent(intent):
+        return GraphQueryResult(intent, ["transaction", "details"], [["TX-1", "paid 10.00"]])
+
+    async def summary(**kwargs):
+        return "One payment."
+
+    async def summary_stream(**kwargs):
+        yield "One "
+        yield "payment."
+
+    monkeypatch.setattr(graph_fast_path, "run_intent", run_intent)
+    monkeypatch.setattr(solution_q_and_a, "generate_completion_with_user_prompt", summary)
+    monkeypatch.setattr(solution_q_and_a, "stream_completion_with_user_prompt", summary_stream)
+    return solution_q_and_a
+
+
+def test_stream_gives_the_fast_path_answer(fast_path):
+    question = "payments to Vendor 2"
+    chunks = list(fast_path.completion_stream(question, timeout=10))
+    assert chunks[-1].endswith("| TX-1 | paid 10.00 |")
+    assert "".join(chunks) == fast_path.completion(question, timeout=10)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from graph_projection import GraphProjection
+
+NODES = [
+    ("inv", {"name": "INV-1", "type": "Invoice"}),
+    ("item", {"name": "Item 1", "type": "LineItem", "description": "1x laptop"}),
+    ("sku", {"name": "SKU-LAP", "type": "Product"}),
+    ("qty", {"name": "Quantity 1", "type": "Quantity"}),
+    ("vendor", {"name": "Vendor 1", "type": "Vendor"}),
+    ("lonely", {}),
+]
+EDGES = [
+    ("inv", "item", "contains_item", {}),
+    ("sku", "item", "refers_to", {}),  # reversed by the extractor; hop follows both directions
+    ("item", "qty", "has_quantity", {}),
+    ("inv", "vendor", "issued_by", {}),
+    ("inv", "missing", "contains_item", {}),  # dangling edges are dropped
+]
+
+
+def _projection():
+    return GraphProjection.from_graph_data(NODES, EDGES, version="v1")
+
+
+def test_csr_layout():
+    projection = _projection()
+    assert projection.num_nodes == 6 and projection.num_edges == 4
+    assert projection.relation_names == ["contains_item", "refers_to", "has_quantity", "issued_by"]
+    inv = projection.index["inv"]
+    out = projection.out_edges[projection.out_ptr[inv]:projection.out_ptr[inv + 1]]
+    assert sorted(projection.dst[out].tolist()) == [projection.index["item"], projection.index["vendor"]]
+    assert projection.nbytes > 0 and projection.version == "v1"
+
+
+def test_hop_filters_relations_and_follows_both_directions():
+    projection = _projection()
+    item = np.array([projection.index["item"]], dtype=np.int32)
+    assert len(projection.hop(item)) == 3
+    assert projection.relation_names[projection.relations[projection.hop(item, ["refers_to"])[0]]] == "refers_to"
+    assert projection.hop(item, ["unknown"]).size == 0
+    assert projection.hop(np.array([projection.index["lonely"]], dtype=np.int32)).size == 0
+
+
+def test_expand_follows_the_default_hops():
+    projection = _projection()
+    lines = projection.to_text(projection.expand(["inv"])).splitlines()
+    assert lines == [
+        "INV-1 --[contains_item]--> Item 1",
+        "SKU-LAP --[refers_to]--> Item 1",
+        "Item 1 --[has_quantity]--> Quantity 1",
+    ]
+    assert len(projection.expand(["inv"], max_edges=1)) == 1
+    assert projection.expand(["unknown"]) == []
+    assert projection.to_text(projection.expand(["inv"], hops=[("issued_by",)])) == "INV-1 --[issued_by]--> Vendor 1"
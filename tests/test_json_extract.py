@@ -0,0 +1,64 @@
+from core.json_extract import extract_json
+
+
+def test_strict_json_after_prose():
+    text = 'Here you go: {"a": [1, 2]} thanks'
+    found = extract_json(text)
+    assert found.value == {"a": [1, 2]} and found.repairs == []
+    assert text[found.start:found.end] == '{"a": [1, 2]}'
+
+
+def test_brackets_in_prose_are_skipped():
+    found = extract_json('I checked [the graph] and {see below}: [{"id": 1}]')
+    assert found.value == [{"id": 1}]
+
+
+def test_repairs():
+    cases = {
+        "[1, 2,]": ([1, 2], "trailing_commas"),
+        "{'a': 'b'}": ({"a": "b"}, "single_quotes"),
+        "{a: 1}": ({"a": 1}, "unquoted_keys"),
+        "{\"a\": True, \"b\": None}": ({"a": True, "b": None}, "python_literals"),
+        '[{"a": 1} {"b": 2}]': ([{"a": 1}, {"b": 2}], "missing_commas"),
+    }
+    for text, (value, repair) in cases.items():
+        found = extract_json(text)
+        assert found.value == value and repair in found.repairs, text
+
+
+def test_truncated_output_is_closed():
+    found = extract_json('[{"id": 1, "ok": true}, {"id": 2, "na')
+    assert found.value == [{"id": 1, "ok": True}] and "truncated" in found.repairs
+    assert extract_json('{"a": {"b": 1, "c": "unfinish').value == {"a": {"b": 1}}
+
+
+def test_nothing_to_extract():
+    assert extract_json("") is None
+    assert extract_json("plain text [and brackets]") is None
+
+
+def test_scalar_arrays_in_prose_give_way_to_the_answer():
+    assert extract_json('See note [1]. Result: [{"a": 1}]').value == [{"a": 1}]
+    assert extract_json('Totals [1, 2] and {"b": 2}').value == {"b": 2}
+    assert extract_json("Only a footnote [1].").value == [1]
+
+
+def test_expected_type_is_preferred():
+    text = 'Summary {"count": 2} rows: [{"id": 1}, {"id": 2}]'
+    assert extract_json(text).value == {"count": 2}
+    assert extract_json(text, list).value == [{"id": 1}, {"id": 2}]
+    assert extract_json('[{"id": 1}]', dict).value == [{"id": 1}]
+
+
+def test_bracket_heavy_prose_is_scanned_in_linear_time():
+    import time
+
+    def seconds(n):
+        text = "see [x] and {y} " * n + '[{"a": 1}]'
+        start = time.perf_counter()
+        assert extract_json(text).value == [{"a": 1}]
+        return time.perf_counter() - start
+
+    seconds(1000)  # warm up
+    small, large = seconds(5_000), seconds(40_000)
+    assert large < 8 * small * 3  # 8x the text; quadratic would be ~64x
@@ -0,0 +1,44 @@
+from core.json_stream import JsonArrayStream, iter_json_array
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_objects_are_returned_as_they_close():
+    parser = JsonArrayStream()
+    assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(': "x]}"}') == [{"b": "x]}"}]
+    assert not parser.closed
+    assert parser.feed("]") == [] and parser.closed
+    assert parser.feed('[{"c": 3}]') == []
+
+
+def test_any_chunking_gives_the_same_rows():
+    text = '```json\n{"rows": [{"id": 1, "tags": ["a", "b"]}, {"id": 2, "nested": {"k": "\\"}"}}]}\n```'
+    expected = [{"id": 1, "tags": ["a", "b"]}, {"id": 2, "nested": {"k": '"}'}}]
+    for size in (1, 2, 3, 7, len(text)):
+        assert list(iter_json_array(_chunks(text, size))) == expected
+
+
+def test_malformed_elements_and_scalars_are_skipped():
+    assert list(iter_json_array(['[{"a": 1,}, 5, "s", {"b": 2}]'])) == [{"b": 2}]
+
+
+def test_bracketed_prose_before_the_array_is_skipped():
+    text = 'I checked [the graph]: [ {"a": 1}, {"b": [2]} ]'
+    for size in (1, 2, 5, len(text)):
+        assert list(iter_json_array(_chunks(text, size))) == [{"a": 1}, {"b": [2]}]
+    assert list(iter_json_array(['{"tags": ["x"], "rows": [{"a": 1}]}'])) == [{"a": 1}]
+
+
+def test_bracket_at_chunk_end_waits_for_the_next_chunk():
+    parser = JsonArrayStream()
+    assert parser.feed("See [") == []
+    assert parser.feed("  ") == []
+    assert parser.feed('note] [{"a": 1}') == [{"a": 1}]
+    assert not parser.closed
+
+
+def test_no_array():
+    assert list(iter_json_array(["no json here", " {}"])) == []
@@ -0,0 +1,22 @@
+from core.ledger import ENRICHMENT_DIR, ledger_files, load_ledger
+
+from conftest import items
+
+
+def test_without_a_data_directory_the_ledger_is_empty(tmp_path):
+    missing = tmp_path / "data"
+    assert ledger_files(missing) == {"invoices": [], "transactions": []}
+    assert load_ledger(missing).is_empty
+
+
+def test_enrichment_files_extend_the_base_files_only(tmp_path):
+    (tmp_path / "invoices.csv").write_text(
+        "invoice_number,date,due_date,vendor_id,total,items\n"
+        f'INV-1,2025-01-01,2025-01-31,1,10.0,"{items(("sku-a", 1, 10))}"\n'
+    )
+    files = ledger_files(tmp_path)
+    assert files["invoices"] == [tmp_path / "invoices.csv", ENRICHMENT_DIR / "new_invoices.csv"]
+    assert files["transactions"] == []
+    ledger = load_ledger(tmp_path)
+    assert "INV-1" in set(ledger.invoices["invoice_id"]) and len(ledger.invoices) > 1
+    assert ledger.transactions.empty
@@ -0,0 +1,18 @@
+import numpy as np
+
+from quantization import BinaryQuantizer, Int8Quantizer
+
+
+def test_binary_scores_are_negated_hamming_distances():
+    rng = np.random.default_rng(0)
+    vectors, query = rng.standard_normal((50, 64)), rng.standard_normal(64)
+    quantizer = BinaryQuantizer().fit(vectors)
+    hamming = ((vectors > 0) != (query > 0)).sum(axis=1)
+    assert quantizer.scores(quantizer.encode(vectors), query).tolist() == (-hamming).tolist()
+
+
+def test_int8_scores_approximate_the_dot_product():
+    rng = np.random.default_rng(1)
+    vectors, query = rng.standard_normal((50, 64)).astype(np.float32), rng.standard_normal(64).astype(np.float32)
+    quantizer = Int8Quantizer().fit(vectors)
+    np.testing.assert_allclose(quantizer.scores(quantizer.encode(vectors), query), vectors @ query, atol=0.5)
@@ -0,0 +1,73 @@
+from conftest import items
+
+from core.reconciliation import build_dashboard_rows, match_invoices
+
+BASKET = items(("LAP-1", 2, 500))
+OTHER = items(("MON-1", 1, 200))
+
+
+def _by_invoice(matches):
+    return matches.set_index("invoice_id")
+
+
+def test_exact_match_on_amount_and_items(make_ledger):
+    ledger = make_ledger([("INV-1", 1, "2025-01-01", 1000.0, BASKET)], [("TX-1", 1, "2025-01-05", 1000.0, BASKET)])
+    row = _by_invoice(match_invoices(ledger)).loc["INV-1"]
+    assert (row["tier"], row["match_status"], row["match_type"]) == (0, "MATCHED", "EXACT")
+    assert row["transaction_id"] == "TX-1" and row["basis"] == "net"
+
+
+def test_discounted_payment_matches_on_gross(make_ledger):
+    ledger = make_ledger([("INV-1", 1, "2025-01-01", 1000.0, BASKET)],
+                         [("TX-1", 1, "2025-01-05", 950.0, BASKET, 50.0)])
+    row = _by_invoice(match_invoices(ledger)).loc["INV-1"]
+    assert row["tier"] == 0 and row["basis"] == "gross"
+
+
+def test_same_items_small_difference_is_approx(make_ledger):
+    ledger = make_ledger([("INV-1", 1, "2025-01-01", 1000.0, BASKET)], [("TX-1", 1, "2025-01-05", 990.0, BASKET)])
+    row = _by_invoice(match_invoices(ledger)).loc["INV-1"]
+    assert (row["tier"], row["match_status"], row["match_type"]) == (1, "MATCHED", "APPROX")
+    assert row["delta"] == -10.0
+
+
+def test_same_amount_different_items_is_partial(make_ledger):
+    ledger = make_ledger([("INV-1", 1, "2025-01-01", 1000.0, BASKET)], [("TX-1", 1, "2025-01-05", 1000.0, OTHER)])
+    row = _by_invoice(match_invoices(ledger)).loc["INV-1"]
+    assert (row["tier"], row["match_status"]) == (2, "PARTIAL")
+
+
+def test_under_and_overpayment(make_ledger):
+    ledger = make_ledger(
+        [("INV-1", 1, "2025-01-01", 1000.0, BASKET), ("INV-2", 2, "2025-01-01", 1000.0, BASKET)],
+        [("TX-1", 1, "2025-01-05", 500.0, BASKET), ("TX-2", 2, "2025-01-05", 1500.0, BASKET)],
+    )
+    matches = _by_invoice(match_invoices(ledger))
+    assert (matches.loc["INV-1", "tier"], matches.loc["INV-1", "match_status"]) == (3, "PARTIAL")
+    assert (matches.loc["INV-2", "tier"], matches.loc["INV-2", "match_status"]) == (4, "SUSPICIOUS")
+
+
+def test_payments_never_cross_vendors(make_ledger):
+    ledger = make_ledger([("INV-1", 1, "2025-01-01", 1000.0, BASKET)], [("TX-1", 2, "2025-01-05", 1000.0, BASKET)])
+    row = _by_invoice(match_invoices(ledger)).loc["INV-1"]
+    assert (row["tier"], row["match_status"], row["transaction_id"]) == (5, "UNMATCHED", None)
+
+
+def test_repeated_baskets_pair_one_to_one(make_ledger):
+    invoices = [(f"INV-{i}", 1, f"2025-0{i}-01", 1000.0, BASKET) for i in range(1, 4)]
+    transactions = [(f"TX-{i}", 1, f"2025-0{i}-03", 1000.0, BASKET) for i in range(1, 3)]
+    matches = match_invoices(make_ledger(invoices, transactions))
+    paid = matches["transaction_id"].dropna()
+    assert sorted(paid) == ["TX-1", "TX-2"]
+    assert (matches["tier"] == 5).sum() == 1
+
+
+def test_dashboard_rows_most_severe_first(make_ledger):
+    ledger = make_ledger(
+        [("INV-1", 1, "2025-01-01", 1000.0, BASKET), ("INV-2", 1, "2025-01-02", 300.0, OTHER)],
+        [("TX-1", 1, "2025-01-05", 1000.0, BASKET)],
+    )
+    rows = build_dashboard_rows(match_invoices(ledger), explanations={"INV-1": "custom"})
+    assert [r.invoice_id for r in rows] == ["INV-2", "INV-1"]
+    assert rows[0].vendor_name == "Vendor 1" and rows[0].anomaly_severity == "MEDIUM"
+    assert rows[1].short_explanation == "custom"
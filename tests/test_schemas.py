@@ -0,0 +1,58 @@
+import pytest
+
+from core.models import AnomalyCard, DashboardRow, MissingInvoiceReport
+from core.schemas import SchemaValidationError, coerce_fields, from_json, json_schema
+
+ROW = {
+    "invoice_id": "INV-1", "vendor_name": "Vendor 1", "amount": "1,200.50", "currency": "EUR",
+    "match_status": "matched", "match_type": "EXACT", "anomaly_severity": "NONE",
+    "short_explanation": "ok", "unexpected": "ignored",
+}
+
+
+def test_json_schema_requires_every_property_and_copies_enums():
+    schema = json_schema(DashboardRow)
+    assert schema["required"] == list(schema["properties"]) and schema["additionalProperties"] is False
+    assert schema["properties"]["match_type"]["enum"][0] == "EXACT"
+    assert list(json_schema(DashboardRow, ["amount"])["properties"]) == ["amount"]
+
+
+def test_from_json_coerces_numbers_and_enum_case():
+    row = from_json(DashboardRow, ROW)
+    assert row.amount == 1200.5 and row.match_status == "MATCHED"
+
+
+def test_from_json_defaults_and_nested_dataclasses():
+    report = from_json(MissingInvoiceReport, {
+        "vendor": "Vendor 2", "period": "2025-04", "confidence": None,
+        "evidence_found": {"invoices_in_period": "0", "payments_in_period": 1.0},
+        "risk_flags": [{"type": "missing_invoice"}],
+    })
+    assert report.confidence == "low"  # null falls back to the dataclass default
+    assert report.evidence_found.invoices_in_period == 0 and report.evidence_found.payments_in_period == 1
+    assert report.risk_flags[0].type == "missing_invoice" and report.notes == ""
+    card = from_json(AnomalyCard, {"invoice_id": "INV-1"}, defaults={
+        "vendor_name": "Vendor 1", "severity": "HIGH", "reason_codes": [], "human_explanation": "",
+        "recommendation": "",
+    })
+    assert card.severity == "HIGH"
+
+
+@pytest.mark.parametrize("data, message", [
+    ([], "$: expected an object"),
+    ({"invoice_id": "INV-1"}, "$: missing vendor_name"),
+    (dict(ROW, amount="lots"), "$.amount: expected a number"),
+    (dict(ROW, amount=True), "$.amount: expected a number, got a boolean"),
+    (dict(ROW, match_type="FUZZY"), "$.match_type: 'FUZZY' is not one of"),
+    (dict(ROW, vendor_name={"id": 1}), "$.vendor_name: expected a string"),
+])
+def test_from_json_errors_name_the_path(data, message):
+    with pytest.raises(SchemaValidationError, match=message.replace("$", r"\$").replace("(", r"\(")):
+        from_json(DashboardRow, data)
+
+
+def test_coerce_fields_validates_only_the_subset_present():
+    out = coerce_fields(DashboardRow, {"amount": "3", "match_status": "partial"}, ["amount", "match_status", "currency"])
+    assert out == {"amount": 3.0, "match_status": "PARTIAL"}
+    with pytest.raises(SchemaValidationError, match=r"\$\.risk_flags\[0\]\.type"):
+        coerce_fields(MissingInvoiceReport, {"risk_flags": [{"type": "late"}]}, ["risk_flags"])
@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from semantic_cache import SemanticCache
+
+
+async def _embed(texts):
+    return [np.ones(4) + len(t) % 3 * np.eye(4)[0] for t in texts]
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_identical_query_hits():
+    cache = SemanticCache(embed_fn=_embed)
+    _run(cache.store("payments to Vendor 2", "old answer"))
+    assert _run(cache.lookup("payments to Vendor 2")) == "old answer"
+
+
+def test_different_identifiers_never_share_an_answer():
+    cache = SemanticCache(embed_fn=_embed)
+    _run(cache.store("payments to Vendor 2", "answer about 2"))
+    assert _run(cache.lookup("payments to Vendor 3")) is None
+
+
+@pytest.fixture
+def retriever(monkeypatch):
+    pytest.importorskip("cognee")
+    import custom_retriever
+
+    async def fake_completion(**kwargs):
+        return "fresh answer"
+
+    async def fake_stream(**kwargs):
+        yield "fresh "
+        yield "answer"
+
+    monkeypatch.setattr(custom_retriever, "generate_completion_with_user_prompt", fake_completion)
+    monkeypatch.setattr(custom_retriever, "stream_completion_with_user_prompt", fake_stream)
+    retriever = custom_retriever.GraphCompletionRetrieverWithUserPrompt(
+        user_prompt_filename="user_prompt.txt", semantic_cache=SemanticCache(embed_fn=_embed)
+    )
+
+    async def no_context(query):
+        return []
+
+    async def context_text(triplets):
+        return ""
+
+    monkeypatch.setattr(retriever, "get_context", no_context)
+    monkeypatch.setattr(retriever, "_context_text", context_text)
+    return retriever
+
+
+def test_refresh_bypasses_semantic_lookup_but_stores(retriever):
+    namespace = retriever._semantic_namespace(None)
+    _run(retriever.semantic_cache.store("payments to Vendor 2", "stale answer", namespace=namespace))
+
+    assert _run(retriever.get_completion("payments to Vendor 2")) == ["stale answer"]
+    assert _run(retriever.get_completion("payments to Vendor 2", use_cache=False)) == ["fresh answer"]
+    assert _run(retriever.get_completion("payments to Vendor 2")) == ["fresh answer"]
+
+
+def test_refresh_bypasses_semantic_lookup_when_streaming(retriever):
+    namespace = retriever._semantic_namespace(None)
+    _run(retriever.semantic_cache.store("payments to Vendor 2", "stale answer", namespace=namespace))
+
+    async def collect(**kwargs):
+        return "".join([chunk async for chunk in retriever.stream_completion("payments to Vendor 2", **kwargs)])
+
+    assert _run(collect()) == "stale answer"
+    assert _run(collect(use_cache=False)) == "fresh answer"
+
+
+def test_active_session_skips_semantic_cache_when_streaming(retriever, monkeypatch):
+    monkeypatch.setattr(type(retriever), "_session_save", staticmethod(lambda: True))
+    namespace = retriever._semantic_namespace(None)
+    _run(retriever.semantic_cache.store("payments to Vendor 2", "stale answer", namespace=namespace))
+
+    async def collect():
+        return "".join([chunk async for chunk in retriever.stream_completion("payments to Vendor 2")])
+
+    assert _run(collect()) == "fresh answer"
+    monkeypatch.setattr(type(retriever), "_session_save", staticmethod(lambda: False))
+    assert _run(collect()) == "stale answer"  # the session answer was not stored either
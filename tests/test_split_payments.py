@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from core import split_payments
+from core.reconciliation import match_invoices
+from core.split_payments import (
+    apply_split_matches,
+    claimed_transaction_ids,
+    find_split_payments,
+    find_subset_sum,
+    find_subset_sums,
+    unmatched_documents,
+)
+
+
+def _sum(values, found):
+    return sum(values[i] for i in found)
+
+
+def test_pair():
+    values = [700, 120, 300, 55]
+    found = find_subset_sum(np.array(values), 1000)
+    assert sorted(found) == [0, 2]
+
+
+def test_three_and_four_parts():
+    values = [410, 250, 90, 345, 7, 180]
+    assert _sum(values, find_subset_sum(np.array(values), 410 + 90 + 7)) == 507
+    assert len(find_subset_sum(np.array(values), 250 + 90 + 7 + 180)) == 4
+
+
+def test_many_candidates_use_pair_sums():
+    rng = np.random.default_rng(0)
+    values = rng.integers(10_000, 50_000, size=40) * 10 + 1
+    values[[3, 17, 29]] = [100_000, 200_003, 300_000]
+    found = find_subset_sum(values, 600_003)
+    assert found is not None and _sum(values, found) == 600_003 and len(found) <= 4
+
+
+def test_tolerance_and_no_solution():
+    assert find_subset_sum(np.array([500, 499]), 1000, tolerance=1) == [0, 1]
+    assert find_subset_sum(np.array([500, 490]), 1000, tolerance=1) is None
+    assert find_subset_sum(np.array([1000, 1]), 1000) is None  # a single document is not a split
+
+
+def test_max_parts_is_respected():
+    assert find_subset_sum(np.array([100] * 6), 500, max_parts=4) is None
+    assert len(find_subset_sum(np.array([100] * 6), 400, max_parts=4)) == 4
+
+
+def test_find_subset_sums_returns_distinct_subsets_up_to_limit():
+    values = np.array([600, 400, 300, 700, 150])
+    found = find_subset_sums(values, 1000, limit=5)
+    assert sorted(map(tuple, found)) == [(0, 1), (2, 3)]
+    assert len(find_subset_sums(values, 1000, limit=1)) == 1
+
+
+def _frames(invoices, transactions):
+    inv = pd.DataFrame(invoices, columns=["invoice_id", "vendor_id", "date", "total"])
+    tx = pd.DataFrame(transactions, columns=["transaction_id", "vendor_id", "date", "amount"])
+    inv["date"], tx["date"] = pd.to_datetime(inv["date"]), pd.to_datetime(tx["date"])
+    return inv, tx
+
+
+def test_one_to_many_and_many_to_one():
+    inv, tx = _frames(
+        [("INV-1", 1, "2025-01-01", 1000.0), ("INV-2", 1, "2025-03-01", 200.0), ("INV-3", 1, "2025-03-02", 300.0)],
+        [("TX-1", 1, "2025-01-10", 600.0), ("TX-2", 1, "2025-01-20", 400.0), ("TX-3", 1, "2025-03-05", 500.0)],
+    )
+    splits = {s.match_type: s for s in find_split_payments(inv, tx)}
+    assert sorted(splits["ONE_TO_MANY"].transaction_ids) == ["TX-1", "TX-2"]
+    assert splits["ONE_TO_MANY"].invoice_ids == ["INV-1"]
+    assert sorted(splits["MANY_TO_ONE"].invoice_ids) == ["INV-2", "INV-3"]
+    assert splits["MANY_TO_ONE"].paid == 500.0
+
+
+def test_parts_outside_the_window_or_vendor_are_ignored():
+    inv, tx = _frames(
+        [("INV-1", 1, "2025-01-01", 1000.0)],
+        [("TX-1", 1, "2025-01-10", 600.0), ("TX-2", 1, "2025-06-01", 400.0), ("TX-3", 2, "2025-01-10", 400.0)],
+    )
+    assert find_split_payments(inv, tx, window_days=45) == []
+
+
+def test_ambiguous_target_stays_unmatched():
+    # Both 600+400 and 700+300 settle INV-1: the amounts cannot tell which, so neither is taken.
+    inv, tx = _frames(
+        [("INV-1", 1, "2025-01-01", 1000.0)],
+        [("TX-1", 1, "2025-01-10", 600.0), ("TX-2", 1, "2025-01-11", 400.0),
+         ("TX-3", 1, "2025-01-12", 700.0), ("TX-4", 1, "2025-01-13", 300.0)],
+    )
+    assert find_split_payments(inv, tx) == []
+
+
+def test_crowded_window_is_left_for_review(monkeypatch):
+    rng = np.random.default_rng(0)
+    cents = rng.integers(100, 500_000, size=300)
+    inv, tx = _frames(
+        [("INV-1", 1, "2025-01-01", (cents[0] + cents[1]) / 100)],
+        [(f"TX-{i}", 1, "2025-01-10", c / 100) for i, c in enumerate(cents)],
+    )
+    # TX-0 + TX-1 is the only pair that settles INV-1, but among 300 candidates a
+    # coincidental one was too likely (about 0.16 expected), so it is left for review.
+    assert find_split_payments(inv, tx, max_parts=2) == []
+    monkeypatch.setattr(split_payments, "MAX_COINCIDENCES", 1.0)
+    assert [s.transaction_ids for s in find_split_payments(inv, tx, max_parts=2)] == [["TX-0", "TX-1"]]
+
+
+def test_apply_split_matches_marks_every_covered_invoice(make_ledger):
+    ledger = make_ledger(
+        [("INV-1", 1, "2025-01-01", 1000.0, None)],
+        [("TX-1", 1, "2025-01-10", 600.0, None), ("TX-2", 1, "2025-01-20", 400.0, None)],
+    )
+    matches = match_invoices(ledger)
+    splits = find_split_payments(*unmatched_documents(ledger, matches))
+    applied = apply_split_matches(matches, splits).set_index("invoice_id")
+    assert applied.loc["INV-1", "match_type"] == "ONE_TO_MANY"
+    assert applied.loc["INV-1", "tier"] == 6
+    # Amount-only evidence: flagged for review, not reported as a clean match.
+    assert applied.loc["INV-1", "match_status"] == "PARTIAL"
+    assert applied.loc["INV-1", "anomaly_severity"] == "MEDIUM"
+    assert claimed_transaction_ids(applied.reset_index()) == {"TX-1", "TX-2"}